@@ -0,0 +1,143 @@
+import re
+import time
+from YOLO_SERVER.config import (
+    ADMISSION_MAX_INFLIGHT, ADMISSION_MAX_INFLIGHT_BYTES, ADMISSION_MAX_MESSAGE_BYTES,
+    ADMISSION_RETRY_AFTER_MS, WEBCAM_RATE_LIMIT_FPS, WEBCAM_RATE_LIMIT_BURST
+)
+
+# Görüntü taşıyan (bellek/çıkarım maliyeti yüksek) mesaj türleri
+ADMISSION_CONTROLLED_TYPES = ('image', 'webcam', 'image_batch')
+
+# İstemciler "type" ve "request_id" alanlarını base64 verisinden önce gönderir;
+# JSON'u ayrıştırmadan bu alanları okumak için mesajın başına bakmak yeterli
+_PEEK_BYTES = 512
+_TYPE_PATTERN = re.compile(r'"type"\s*:\s*"([A-Za-z_]+)"')
+_REQUEST_ID_PATTERN = re.compile(r'"request_id"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+)')
+
+def peek_message_fields(message):
+    """
+    Read "type" and "request_id" from the head of a raw message without parsing the payload
+    TR: Büyük base64 verisini ayrıştırmadan mesajın başından tür ve istek kimliğini okur.
+    Bulunamazsa None döner (mesaj normal yoldan ayrıştırılır).
+    """
+    if not isinstance(message, str):
+        return None, None
+    head = message[:_PEEK_BYTES]
+    type_match = _TYPE_PATTERN.search(head)
+    request_match = _REQUEST_ID_PATTERN.search(head)
+    request_id = None
+    if request_match:
+        raw = request_match.group(1)
+        request_id = raw[1:-1] if raw.startswith('"') else int(raw)
+    return (type_match.group(1) if type_match else None), request_id
+
+class Rejection(Exception):
+    """Kabul kontrolü reddi (yeniden deneme süresi ile)"""
+
+    def __init__(self, reason, retry_after_ms):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_ms = int(retry_after_ms)
+
+class TokenBucket:
+    """Klasik token bucket: saniyede rate token dolar, en fazla burst token birikir"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def try_consume(self, tokens=1.0):
+        """Token varsa harca ve 0 döndür; yoksa bir sonraki token için beklenecek süre (s)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+        return (tokens - self.tokens) / self.rate if self.rate > 0 else float('inf')
+
+class AdmissionTicket:
+    """Kabul edilen isteğin tuttuğu bütçe; işlem bitince release() çağrılır"""
+
+    def __init__(self, controller, size):
+        self.controller = controller
+        self.size = size
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller._release(self.size)
+
+class AdmissionController:
+    """
+    Bounded global in-flight budget plus per-client token buckets for webcam frames
+    TR: Genel eşzamanlı istek/bayt bütçesi ve istemci başına webcam kare hız limiti.
+    Bütçe dolduğunda istek, görüntü çözülmeden hızlıca reddedilir.
+    """
+
+    def __init__(self, max_inflight=ADMISSION_MAX_INFLIGHT, max_inflight_bytes=ADMISSION_MAX_INFLIGHT_BYTES,
+                 max_message_bytes=ADMISSION_MAX_MESSAGE_BYTES, webcam_rate=WEBCAM_RATE_LIMIT_FPS,
+                 webcam_burst=WEBCAM_RATE_LIMIT_BURST):
+        self.max_inflight = max_inflight
+        self.max_inflight_bytes = max_inflight_bytes
+        self.max_message_bytes = max_message_bytes
+        self.webcam_rate = webcam_rate
+        self.webcam_burst = webcam_burst
+        self.inflight = 0
+        self.inflight_bytes = 0
+        self.buckets = {}
+        self.admitted = 0
+        self.shed = {'too_large': 0, 'inflight': 0, 'bytes': 0, 'rate_limit': 0}
+
+    def admit(self, client_key, message_type, size):
+        """İsteği kabul et (AdmissionTicket) veya Rejection fırlat"""
+        if size > self.max_message_bytes:
+            self.shed['too_large'] += 1
+            raise Rejection('too_large', 0)
+
+        if message_type == 'webcam' and self.webcam_rate > 0:
+            bucket = self.buckets.get(client_key)
+            if bucket is None:
+                bucket = self.buckets[client_key] = TokenBucket(self.webcam_rate, self.webcam_burst)
+            wait = bucket.try_consume()
+            if wait > 0:
+                self.shed['rate_limit'] += 1
+                raise Rejection('rate_limit', wait * 1000)
+
+        if self.inflight >= self.max_inflight:
+            self.shed['inflight'] += 1
+            raise Rejection('inflight', ADMISSION_RETRY_AFTER_MS)
+
+        if self.inflight_bytes + size > self.max_inflight_bytes and self.inflight > 0:
+            self.shed['bytes'] += 1
+            raise Rejection('bytes', ADMISSION_RETRY_AFTER_MS)
+
+        self.inflight += 1
+        self.inflight_bytes += size
+        self.admitted += 1
+        return AdmissionTicket(self, size)
+
+    def _release(self, size):
+        self.inflight -= 1
+        self.inflight_bytes -= size
+
+    def forget_client(self, client_key):
+        """Bağlantı kapanınca istemcinin token bucket'ını sil"""
+        self.buckets.pop(client_key, None)
+
+    def metrics(self):
+        return {
+            'admitted': self.admitted,
+            'shed': dict(self.shed),
+            'shed_total': sum(self.shed.values()),
+            'inflight': self.inflight,
+            'inflight_bytes': self.inflight_bytes,
+            'max_inflight': self.max_inflight,
+            'max_inflight_bytes': self.max_inflight_bytes
+        }
+
+# Süreç genelinde tek kabul kontrolcüsü
+ADMISSION = AdmissionController()
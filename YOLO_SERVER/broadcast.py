@@ -0,0 +1,88 @@
+import json
+import asyncio
+import websockets
+from YOLO_SERVER.config import CATALOG_BROADCAST_QUEUE_SIZE
+
+class _Subscriber:
+    """
+    Tek bir aboneye giden olay kuyruğu ve gönderici görevi.
+    Yavaş abone yazanı bloklamaz: kuyruk dolarsa bekleyen olaylar atılır ve
+    yerine tek bir "catalog_resync" mesajı konur (istemci listeyi yeniden ister).
+    """
+
+    def __init__(self, websocket, queue_size):
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflows = 0
+        self.task = asyncio.create_task(self._pump())
+
+    def offer(self, message, version):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflows += 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(json.dumps({'success': True, 'type': 'catalog_resync', 'version': version}))
+
+    async def _pump(self):
+        try:
+            while True:
+                message = await self.queue.get()
+                await self.websocket.send(message)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    def close(self):
+        self.task.cancel()
+
+class CatalogBroadcaster:
+    """
+    Push catalog changes to subscribed clients
+    TR: Katalog değişikliklerini abone istemcilere iter.
+    Her olay bir kez serileştirilir ve tüm abonelerin kuyruğuna bırakılır.
+    """
+
+    def __init__(self, queue_size=CATALOG_BROADCAST_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.version = 0
+        self.subscribers = {}
+        self.published = 0
+
+    def subscribe(self, websocket):
+        """İstemciyi abone yap (zaten aboneyse değişiklik yok)"""
+        if websocket not in self.subscribers:
+            self.subscribers[websocket] = _Subscriber(websocket, self.queue_size)
+
+    def unsubscribe(self, websocket):
+        subscriber = self.subscribers.pop(websocket, None)
+        if subscriber is not None:
+            subscriber.close()
+
+    def publish(self, event_type, data, version, exclude=None):
+        """
+        Olayı, değişikliği içeren katalog sürümüyle (food_changes günlüğü) yayınla.
+        exclude: olayı tetikleyen istemci (doğrudan yanıtını zaten aldı)
+        """
+        self.version = max(self.version, version)
+        self.published += 1
+        message = json.dumps({
+            'success': True,
+            'type': event_type,
+            'version': self.version,
+            'data': data
+        })
+        for websocket, subscriber in list(self.subscribers.items()):
+            if websocket is not exclude:
+                subscriber.offer(message, self.version)
+
+    def metrics(self):
+        return {
+            'version': self.version,
+            'subscribers': len(self.subscribers),
+            'published': self.published,
+            'overflows': sum(subscriber.overflows for subscriber in self.subscribers.values())
+        }
+
+# Süreç genelinde tek yayıncı
+CATALOG_BROADCASTER = CatalogBroadcaster()
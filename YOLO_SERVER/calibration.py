@@ -0,0 +1,152 @@
+import time
+import threading
+import statistics
+from collections import deque
+import cv2
+import numpy as np
+from YOLO_SERVER.config import (
+    REFERENCE_OBJECTS, CALIBRATION_WINDOW, CALIBRATION_MIN_SAMPLES, CALIBRATION_STABLE_TOLERANCE,
+    CALIBRATION_RECHECK_FRAMES, CALIBRATION_ASPECT_TOLERANCE, CALIBRATION_SAVE_INTERVAL
+)
+from YOLO_SERVER.database import get_database_manager
+
+def measure_reference_scale(detection):
+    """
+    Scale factor (cm²/pixel²) from a single utensil mask polygon
+    TR: Tek bir çatal/kaşık maskesinin döndürülmüş en küçük dikdörtgeninden ölçek faktörü.
+    Sınırlayıcı kutudan farklı olarak nesnenin açısından etkilenmez. En/boy oranı beklenenden
+    çok farklıysa (kısmen görünen veya kapanan nesne) None döner.
+    """
+    reference = REFERENCE_OBJECTS.get(detection.get('class'))
+    polygon = detection.get('segments')
+    if reference is None or not polygon or len(polygon) < 3:
+        return None
+
+    _, (width, height), _ = cv2.minAreaRect(np.asarray(polygon, dtype=np.float32))
+    long_side, short_side = max(width, height), min(width, height)
+    if short_side <= 0:
+        return None
+
+    expected_aspect = reference['length'] / reference['width']
+    if abs(long_side / short_side - expected_aspect) / expected_aspect > CALIBRATION_ASPECT_TOLERANCE:
+        return None
+
+    return reference['area'] / (long_side * short_side)
+
+class ScaleCalibrator:
+    """
+    Rolling scale calibration for one fixed camera
+    TR: Sabit bir kamera için kayan medyan ölçek kalibrasyonu.
+    Ölçek kararlı hale geldikten sonra referans nesneler sadece ara sıra ölçülür ve
+    çatal/kaşık görünmeyen karelerde de son kalibrasyon kullanılır.
+    """
+
+    def __init__(self, camera_id, window=CALIBRATION_WINDOW, persisted_scale=None, persisted_samples=0):
+        self.camera_id = camera_id
+        self.samples = deque(maxlen=window)
+        self.persisted_scale = persisted_scale
+        self.persisted_samples = persisted_samples
+        self.saved_scale = persisted_scale
+        self.saved_at = 0.0
+        self.frames_since_check = 0
+        self.lock = threading.Lock()
+
+    def _is_stable(self):
+        if len(self.samples) < CALIBRATION_MIN_SAMPLES:
+            # Henüz ölçüm yoksa kayıtlı kalibrasyon kararlı kabul edilir
+            return not self.samples and self.persisted_scale is not None and \
+                self.persisted_samples >= CALIBRATION_MIN_SAMPLES
+        median = statistics.median(self.samples)
+        deviation = statistics.median(abs(sample - median) for sample in self.samples)
+        return deviation / median <= CALIBRATION_STABLE_TOLERANCE
+
+    @property
+    def scale_factor(self):
+        """Kullanılacak ölçek (yeterli ölçüm yoksa kayıtlı değer, o da yoksa None)"""
+        with self.lock:
+            if len(self.samples) >= CALIBRATION_MIN_SAMPLES:
+                return statistics.median(self.samples)
+            return self.persisted_scale
+
+    def needs_reference_pass(self):
+        """Bu karede referans nesneler ölçülmeli mi? (kararlıyken her CALIBRATION_RECHECK_FRAMES karede bir)"""
+        with self.lock:
+            if not self._is_stable():
+                return True
+            self.frames_since_check += 1
+            if self.frames_since_check >= CALIBRATION_RECHECK_FRAMES:
+                self.frames_since_check = 0
+                return True
+            return False
+
+    def observe(self, reference_objects):
+        """Karedeki çatal/kaşık maskelerinden ölçüm ekle, eklenen ölçüm sayısını döndür"""
+        measurements = [measure_reference_scale(detection) for detection in reference_objects]
+        measurements = [scale for scale in measurements if scale is not None]
+        if not measurements:
+            return 0
+
+        with self.lock:
+            self.samples.extend(measurements)
+            should_save = self._should_save()
+            if should_save:
+                self.saved_scale = statistics.median(self.samples)
+                self.saved_at = time.monotonic()
+                scale, samples = self.saved_scale, len(self.samples)
+
+        if should_save:
+            if _async_store is not None:
+                # Sunucuda: event loop'u bloklamadan yazma iş parçacığında kaydedilir
+                _async_store.save_camera_calibration_nowait(self.camera_id, scale, samples)
+            else:
+                get_database_manager().save_camera_calibration(self.camera_id, scale, samples)
+        return len(measurements)
+
+    def _should_save(self):
+        if not self._is_stable() or len(self.samples) < CALIBRATION_MIN_SAMPLES:
+            return False
+        if time.monotonic() - self.saved_at < CALIBRATION_SAVE_INTERVAL:
+            return False
+        median = statistics.median(self.samples)
+        return self.saved_scale is None or abs(median - self.saved_scale) / self.saved_scale > 0.01
+
+    def reset(self):
+        """Kamera yeri değiştiyse ölçümleri sıfırla"""
+        with self.lock:
+            self.samples.clear()
+            self.persisted_scale = None
+            self.persisted_samples = 0
+            self.frames_since_check = 0
+
+# Kamera kimliği -> kalibratör (süreç başına)
+_calibrators = {}
+_calibrators_lock = threading.Lock()
+# attach_async_store sonrası: önceden yüklenen kayıtlar ve yazmalar için AsyncDatabaseManager
+_async_store = None
+_preloaded = {}
+
+async def attach_async_store(db):
+    """
+    Kayıtlı kalibrasyonları okuma havuzunda önceden yükle ve kayıtları yazma iş parçacığına yönlendir
+    Sonrasında get_calibrator ve observe event loop üzerinde veritabanına erişmez.
+    """
+    global _async_store, _preloaded
+    _preloaded = await db.get_camera_calibrations()
+    _async_store = db
+
+def get_calibrator(camera_id):
+    """Kameranın kalibratörü; ilk kullanımda kayıtlı kalibrasyon yüklenir (önceden yüklendiyse bellekten)"""
+    with _calibrators_lock:
+        calibrator = _calibrators.get(camera_id)
+        if calibrator is None:
+            if _async_store is not None:
+                stored = _preloaded.get(camera_id)
+            else:
+                stored = get_database_manager().get_camera_calibration(camera_id)
+            calibrator = ScaleCalibrator(
+                camera_id,
+                persisted_scale=stored['scale_factor'] if stored else None,
+                persisted_samples=stored['samples'] if stored else 0
+            )
+            _calibrators[camera_id] = calibrator
+        return calibrator
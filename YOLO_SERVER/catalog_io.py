@@ -0,0 +1,164 @@
+import csv
+import io
+
+# CSV sütunları: foods tablosu + besin değerleri; liste alanları ';' ile ayrılır
+CSV_FIELDS = [
+    'id', 'name', 'price', 'calories', 'portion_based', 'food_category',
+    'base_height_cm', 'density_g_per_cm3', 'reference_mass_g', 'volume_method',
+    'protein', 'carbs', 'fat', 'fiber', 'ingredients', 'allergens'
+]
+NUTRITION_FIELDS = ('protein', 'carbs', 'fat', 'fiber')
+FLOAT_FIELDS = ('price', 'base_height_cm', 'density_g_per_cm3', 'reference_mass_g')
+LIST_SEPARATOR = ';'
+
+class ImportFormatError(ValueError):
+    """İçe aktarılan katalog verisi geçersiz"""
+    pass
+
+def parse_foods_json(payload):
+    """
+    JSON içe aktarma verisini {id: yemek} sözlüğüne çevir
+    Kabul edilen biçimler: foodsDB.json gibi {id: yemek} veya 'id' alanı olan yemek listesi
+    """
+    if isinstance(payload, dict):
+        foods = payload
+    elif isinstance(payload, list):
+        foods = {}
+        for index, food in enumerate(payload):
+            if not isinstance(food, dict) or not food.get('id'):
+                raise ImportFormatError(f"{index}. kayıtta 'id' alanı yok")
+            foods[food['id']] = food
+    else:
+        raise ImportFormatError("JSON verisi nesne veya liste olmalı")
+
+    checked = {}
+    for food_id, food in foods.items():
+        if not isinstance(food, dict):
+            raise ImportFormatError(f"{food_id}: yemek kaydı nesne olmalı")
+        try:
+            checked[food_id] = _json_food(food)
+        except ValueError as e:
+            raise ImportFormatError(f"{food_id}: {e}")
+    return checked
+
+def _json_food(food):
+    """JSON yemek kaydının alan türlerini denetle (CSV ile aynı kurallar, yanlış tür ValueError)"""
+    def number(value, name):
+        # bool, int'in alt sınıfı olduğu için ayrıca reddedilir
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"'{name}' sayı olmalı")
+        return value
+
+    def text(name):
+        value = food.get(name)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"'{name}' metin olmalı")
+        return value
+
+    def string_list(name):
+        value = food.get(name)
+        if value is None:
+            return []
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ValueError(f"'{name}' metin listesi olmalı")
+        return value
+
+    def nutrient(value, name):
+        # Katalog besin değerlerini "12g" gibi metin olarak da tutar (CSV ile aynı)
+        if value is None or isinstance(value, str):
+            return value
+        return number(value, name)
+
+    # Veritabanı satırları ve dışa aktarma 0/1 döndürür
+    portion_based = food.get('portion_based', False)
+    if portion_based not in (True, False, 0, 1) or isinstance(portion_based, float):
+        raise ValueError("'portion_based' true/false veya 0/1 olmalı")
+
+    checked = dict(food)
+    checked.update({
+        'name': text('name') or '',
+        'price': float(number(food.get('price'), 'price') or 0),
+        'calories': int(number(food.get('calories'), 'calories') or 0),
+        'portion_based': bool(portion_based),
+        'food_category': text('food_category'),
+        'volume_method': text('volume_method'),
+        'ingredients': string_list('ingredients'),
+        'allergens': string_list('allergens')
+    })
+    for name in FLOAT_FIELDS[1:]:
+        checked[name] = number(food.get(name), name)
+
+    nutrition = food.get('nutrition')
+    if nutrition is not None:
+        if not isinstance(nutrition, dict):
+            raise ValueError("'nutrition' nesne olmalı")
+        checked['nutrition'] = {name: nutrient(nutrition.get(name), f'nutrition.{name}') for name in NUTRITION_FIELDS}
+    return checked
+
+def parse_foods_csv(text):
+    """CSV metnini (CSV_FIELDS başlıklı) {id: yemek} sözlüğüne çevir"""
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or 'id' not in reader.fieldnames:
+        raise ImportFormatError("CSV başlığında 'id' sütunu yok")
+
+    foods = {}
+    for line_number, row in enumerate(reader, start=2):
+        food_id = (row.get('id') or '').strip()
+        if not food_id:
+            raise ImportFormatError(f"{line_number}. satırda 'id' boş")
+        try:
+            foods[food_id] = _csv_row_to_food(row)
+        except ValueError as e:
+            raise ImportFormatError(f"{line_number}. satır: {e}")
+    return foods
+
+def _csv_row_to_food(row):
+    def text(name):
+        value = (row.get(name) or '').strip()
+        return value or None
+
+    food = {
+        'id': text('id'),
+        'name': text('name') or '',
+        'price': float(text('price') or 0),
+        'calories': int(float(text('calories') or 0)),
+        'portion_based': (text('portion_based') or '').lower() in ('1', 'true', 'yes', 'evet'),
+        'food_category': text('food_category'),
+        'volume_method': text('volume_method')
+    }
+    for name in FLOAT_FIELDS[1:]:
+        value = text(name)
+        food[name] = float(value) if value is not None else None
+
+    nutrition = {name: text(name) for name in NUTRITION_FIELDS}
+    if any(value is not None for value in nutrition.values()):
+        food['nutrition'] = nutrition
+
+    food['ingredients'] = _split_list(text('ingredients'))
+    food['allergens'] = _split_list(text('allergens'))
+    return food
+
+def _split_list(value):
+    if not value:
+        return []
+    return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+
+def foods_to_csv(foods, include_header=False):
+    """{id: yemek} sözlüğünü CSV metnine çevir (parse_foods_csv ile geri okunabilir)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, lineterminator='\n')
+    if include_header:
+        writer.writeheader()
+    for food_id, food in foods.items():
+        nutrition = food.get('nutrition') or {}
+        row = {name: food.get(name) for name in CSV_FIELDS}
+        row['id'] = food_id
+        row['portion_based'] = 1 if food.get('portion_based') else 0
+        for name in NUTRITION_FIELDS:
+            row[name] = nutrition.get(name)
+        row['ingredients'] = LIST_SEPARATOR.join(food.get('ingredients', []))
+        row['allergens'] = LIST_SEPARATOR.join(food.get('allergens', []))
+        writer.writerow(row)
+    return buffer.getvalue()
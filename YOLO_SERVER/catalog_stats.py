@@ -0,0 +1,112 @@
+UNCATEGORIZED = 'uncategorized'
+
+class CatalogStats:
+    """
+    Incrementally maintained catalog statistics
+    TR: Katalog istatistiklerini her değişiklikte artımlı günceller; okuma O(1)'dir.
+    get_database_stats() ile aynı alanları ve kategori bazlı dağılımı üretir.
+    Min/max değerleri, sadece uç değeri tutan yemek silinir/değişirse yeniden hesaplanır.
+    """
+
+    def __init__(self, foods=None):
+        self.entries = {}
+        self.total = 0
+        self.portion_based = 0
+        self.categories = {}
+        self.price_range = [None, None]
+        self.calorie_range = [None, None]
+        self.ranges_dirty = False
+        self.snapshot_cache = None
+        if foods:
+            self.apply(foods, [])
+
+    def apply(self, changed, deleted):
+        """Değişen (id -> yemek) ve silinen yemekleri uygula"""
+        for food_id, food in changed.items():
+            self._remove(food_id)
+            self._add(food_id, food)
+        for food_id in deleted:
+            self._remove(food_id)
+        self.snapshot_cache = None
+
+    def _add(self, food_id, food):
+        price = food.get('price') or 0
+        calories = food.get('calories') or 0
+        portion_based = bool(food.get('portion_based'))
+        category = food.get('food_category') or UNCATEGORIZED
+        self.entries[food_id] = (price, calories, portion_based, category)
+
+        self.total += 1
+        self.portion_based += portion_based
+        bucket = self.categories.setdefault(category, {'count': 0, 'portion_based': 0, 'price_sum': 0.0})
+        bucket['count'] += 1
+        bucket['portion_based'] += portion_based
+        bucket['price_sum'] += price
+
+        if not self.ranges_dirty:
+            _extend(self.price_range, price)
+            _extend(self.calorie_range, calories)
+
+    def _remove(self, food_id):
+        entry = self.entries.pop(food_id, None)
+        if entry is None:
+            return
+        price, calories, portion_based, category = entry
+
+        self.total -= 1
+        self.portion_based -= portion_based
+        bucket = self.categories[category]
+        bucket['count'] -= 1
+        bucket['portion_based'] -= portion_based
+        bucket['price_sum'] -= price
+        if bucket['count'] == 0:
+            del self.categories[category]
+
+        # Uç değer gittiyse aralıklar bir sonraki okumada yeniden hesaplanır
+        if price in self.price_range or calories in self.calorie_range:
+            self.ranges_dirty = True
+
+    def _recompute_ranges(self):
+        self.price_range = [None, None]
+        self.calorie_range = [None, None]
+        for price, calories, _, _ in self.entries.values():
+            _extend(self.price_range, price)
+            _extend(self.calorie_range, calories)
+        self.ranges_dirty = False
+
+    def snapshot(self):
+        """İstatistik sözlüğü (değişiklik olmadıkça aynı nesne döner, değiştirilmemeli)"""
+        if self.snapshot_cache is None:
+            if self.ranges_dirty:
+                self._recompute_ranges()
+            self.snapshot_cache = {
+                'total_foods': self.total,
+                'portion_based_foods': self.portion_based,
+                'non_portion_foods': self.total - self.portion_based,
+                'price_range': {
+                    'min': self.price_range[0],
+                    'max': self.price_range[1]
+                },
+                'calorie_range': {
+                    'min': self.calorie_range[0],
+                    'max': self.calorie_range[1]
+                },
+                'categories': {
+                    category: {
+                        'count': bucket['count'],
+                        'portion_based': bucket['portion_based'],
+                        'avg_price': round(bucket['price_sum'] / bucket['count'], 2) + 0.0  # -0.0 yerine 0.0
+                    }
+                    for category, bucket in sorted(self.categories.items())
+                }
+            }
+        return self.snapshot_cache
+
+def _extend(value_range, value):
+    """[min, max] aralığını genişlet (get_database_stats gibi sadece pozitif değerler sayılır)"""
+    if value <= 0:
+        return
+    if value_range[0] is None or value < value_range[0]:
+        value_range[0] = value
+    if value_range[1] is None or value > value_range[1]:
+        value_range[1] = value
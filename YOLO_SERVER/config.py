@@ -4,11 +4,34 @@ import os
 HOST = "localhost"
 PORT = 8765
 
+# Çok süreçli sunucu: her işçi kendi modelini yükler, port SO_REUSEPORT ile paylaşılır
+SERVER_WORKERS = int(os.environ.get("FOOD_SERVER_WORKERS", 1))
+CATALOG_POLL_INTERVAL = 1.0  # Diğer işçilerin katalog değişikliklerini kontrol etme aralığı (s)
+CATALOG_BROADCAST_QUEUE_SIZE = 32  # Abone başına bekleyen katalog olayı; dolarsa istemciye catalog_resync gönderilir
+
+# Ayrı çıkarım süreçleri: WebSocket süreci kareleri paylaşımlı bellek halkası ile işçilere aktarır
+INFERENCE_PROCESSES = int(os.environ.get("FOOD_INFERENCE_PROCESSES", 0))  # 0 = süreç içi çıkarım
+FRAME_RING_SLOTS = 8                            # Önceden ayrılmış kare slotu sayısı
+FRAME_RING_MAX_FRAME_BYTES = 1920 * 1080 * 3    # Slot başına en büyük BGR kare (1080p)
+FRAME_RING_ACQUIRE_TIMEOUT = 0.5                # Halka doluyken slot bekleme süresi (s)
+INFERENCE_WORKER_START_TIMEOUT = 120.0          # İşçilerin modeli yükleyip hazır bildirmesi için en uzun süre (s)
+INFERENCE_REQUEST_TIMEOUT = 30.0                # Tek karenin sonucu bu sürede gelmezse işçi takılmış sayılır ve yeniden başlatılır (s)
+INFERENCE_WORKER_RESTART_DELAY = 2.0            # Sonlanan işçiyi yeniden başlatmadan önce beklenecek süre (s)
+
+# İşçi başına torch/OpenCV iş parçacığı (varsayılan: çekirdekler / işçi sayısı)
+WORKER_THREADS = int(os.environ.get(
+    "FOOD_WORKER_THREADS",
+    max(1, (os.cpu_count() or 1) // max(SERVER_WORKERS, INFERENCE_PROCESSES, 1))
+))
+
 # Current directory path - updated to point to parent directory
 CURRENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # SQLite database path (ana veritabanı)
 SQLITE_DB_PATH = os.path.join(CURRENT_DIR, 'foods.db')
+DB_READ_WORKERS = 4  # Event loop dışında eşzamanlı okuma yapan iş parçacığı sayısı (yazmalar tek iş parçacığında sıralanır)
+EXPORT_PAGE_SIZE = 200  # export_foods / get_all_foods sayfa boyutu (sayfa başına 4 sorgu)
+IMPORT_MAX_FOODS = 5000  # Tek import_foods mesajındaki en fazla yemek
 
 # JSON database path (sadece migration için)
 FOOD_DB_PATH = os.path.join(CURRENT_DIR, 'foodsDB.json')
@@ -17,6 +40,64 @@ FOOD_DB_PATH = os.path.join(CURRENT_DIR, 'foodsDB.json')
 DEFAULT_CONFIDENCE_THRESHOLD = 0.5
 DEFAULT_IOU_THRESHOLD = 0.45
 DEFAULT_IMAGE_SIZE = 640
+MAX_DETECTIONS = 50  # Görüntü başına en fazla tespit (model içinde, maske çözülmeden önce uygulanır)
+REDUCED_DECODE_ENABLED = True  # Büyük JPEG'leri DEFAULT_IMAGE_SIZE'dan küçük olmayan 1/2, 1/4, 1/8 ölçekte çöz
+
+# Öncelikli zamanlayıcı: düşük "priority" değeri önce çalışır
+# concurrency: sınıf başına eşzamanlı istek, max_queue: bekleyen istek sınırı
+# droppable: kuyruk dolunca en eski istek düşürülür (gerçek zamanlı önizleme kareleri)
+SCHEDULER_CLASSES = {
+    'checkout': {'priority': 0, 'concurrency': 4, 'max_queue': 64, 'droppable': False},
+    'admin':    {'priority': 1, 'concurrency': 1, 'max_queue': 64, 'droppable': False},
+    'batch':    {'priority': 2, 'concurrency': 1, 'max_queue': 8, 'droppable': False},
+    'realtime': {'priority': 3, 'concurrency': 2, 'max_queue': 2, 'droppable': True},
+}
+INFERENCE_CONCURRENCY = 1  # Süreç içi model için eşzamanlı çıkarım (ultralytics modeli thread-safe değil)
+
+# Kabul kontrolü (aşırı yükte görüntüler çözülmeden "busy" yanıtı)
+ADMISSION_MAX_INFLIGHT = 32                     # Aynı anda işlenen/kuyrukta bekleyen görüntü mesajı
+ADMISSION_MAX_INFLIGHT_BYTES = 64 * 1024 * 1024  # Bekleyen base64 yüklerinin toplam boyutu
+ADMISSION_MAX_MESSAGE_BYTES = 16 * 1024 * 1024   # Tek mesaj için üst sınır
+# WebSocket taşıma sınırı (websockets max_size): kabul sınırından biraz büyük tutulur ki sınırı aşan mesaja
+# bağlantı 1009 ile kopmadan "busy"/too_large yanıtı verilebilsin; bunun da üstündeki mesajlar bağlantıyı kapatır
+WEBSOCKET_MAX_MESSAGE_BYTES = ADMISSION_MAX_MESSAGE_BYTES + 4 * 1024 * 1024
+ADMISSION_RETRY_AFTER_MS = 250                  # Bütçe dolduğunda önerilen bekleme
+WEBCAM_RATE_LIMIT_FPS = 5.0                     # İstemci başına webcam karesi/saniye
+WEBCAM_RATE_LIMIT_BURST = 3                     # Token bucket kapasitesi
+
+# İstemcilere bağlantıda bildirilen kare yakalama profili (capture_profile mesajı)
+CAPTURE_MAX_DIMENSION = DEFAULT_IMAGE_SIZE  # Uzun kenar; model zaten bu boyuta küçültür
+CAPTURE_ENCODING = 'image/jpeg'
+CAPTURE_JPEG_QUALITY = 0.85                 # canvas.toDataURL kalite değeri (0-1)
+CAPTURE_JPEG_QUALITY_BUSY = 0.7             # Sunucu yüklüyken daha küçük kareler
+CAPTURE_BUSY_LOAD = 0.5                     # Bu yük oranının üstü "yüklü" sayılır
+
+# Gerçek zamanlı kare hızı: webcam yanıtlarındaki next_frame_delay_ms
+PACER_TARGET_UTILIZATION = 0.8  # Gerçek zamanlı karelerin hedeflediği çıkarım kullanımı
+PACER_EWMA_ALPHA = 0.2          # Aşama gecikmesi ortalamasının yumuşatma katsayısı
+PACER_MIN_DELAY_MS = 0
+PACER_MAX_DELAY_MS = 5000
+PACER_STATION_TIMEOUT = 5.0     # Bu süre kare göndermeyen istemci aktif istasyon sayılmaz (s)
+
+# Ham tespit önbelleği: "image" yanıtları image_id taşır, güven eşiği değişince "refilter" ile yeniden süzülür
+DETECTION_CACHE_FLOOR_CONFIDENCE = 0.25  # Model bu eşikte çalışır; daha düşük eşikle refilter önbellekten yanıtlanamaz
+DETECTION_CACHE_MAX_ENTRIES = 64         # 0 = önbellek kapalı
+DETECTION_CACHE_TTL = 300.0              # Kayıt ömrü (s)
+
+# Aynı görüntünün tekrar gönderimi (yeniden bağlanma, çift tıklama) için yanıt önbelleği
+RESULT_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Saklanan JSON yanıtlarının toplam boyutu; 0 = kapalı
+
+# Yaşam döngüsü: SIGTERM/SIGINT ile "draining" durumuna geçilir, yeni kareler reddedilir, süren istekler bitirilir
+DRAIN_TIMEOUT = 20.0          # Süren isteklerin bitmesi için en uzun bekleme (s)
+DRAIN_RETRY_AFTER_MS = 1000   # draining yanıtında önerilen bekleme (istemci bu sürede yeniden bağlanır)
+HEALTH_HOST = "127.0.0.1"     # Sağlık ucu sadece yerel erişime açık
+HEALTH_PORT = int(os.environ.get("FOOD_HEALTH_PORT", 8766))  # 0 = kapalı; çok işçili modda işçi sırası eklenir
+
+# Toplu görüntü işleme (image_batch mesajı)
+BATCH_INFERENCE_SIZE = 8   # Modelden tek seferde geçen görüntü sayısı
+BATCH_MAX_IMAGES = 64      # Tek mesajda kabul edilen en fazla görüntü
+BATCH_MAX_BYTES = 12 * 1024 * 1024  # Tek mesajdaki base64 görüntü verisinin toplamı (çözülen karelerin belleğini de sınırlar)
+DECODE_WORKERS = 4         # Paralel base64/JPEG çözme iş parçacığı sayısı
 
 # Referans nesne boyutları (cm cinsinden)
 REFERENCE_OBJECTS = {
@@ -32,8 +113,39 @@ REFERENCE_OBJECTS = {
     }
 }
 
+# Sabit kameralar için ölçek kalibrasyonu (config.cameraId gönderildiğinde)
+CALIBRATION_WINDOW = 50                # Kayan medyan için saklanan son ölçüm sayısı
+CALIBRATION_MIN_SAMPLES = 5            # Kalibrasyonun kullanılması için gereken ölçüm
+CALIBRATION_STABLE_TOLERANCE = 0.05    # Göreli medyan mutlak sapma bu değerin altındaysa kararlı
+CALIBRATION_RECHECK_FRAMES = 30        # Kararlıyken referans nesneler her N karede bir ölçülür
+CALIBRATION_ASPECT_TOLERANCE = 0.5     # Beklenen en/boy oranından sapma (kısmen görünen çatal/kaşık elenir)
+CALIBRATION_SAVE_INTERVAL = 30.0       # Kalibrasyonu veritabanına yazma aralığı (s)
+
 
 # Default food properties when not found in database
 DEFAULT_FOOD_HEIGHT_CM = 2.0
 DEFAULT_FOOD_DENSITY = 0.8
-DEFAULT_PORTION_MASS = 150  # grams 
\ No newline at end of file
+DEFAULT_PORTION_MASS = 150  # grams 
+
+# Model backend ayarları
+# "yolo": gerçek Ultralytics modeli, "stub": ağırlık dosyası gerektirmeyen deterministik sahte model
+MODEL_PATH = os.environ.get("FOOD_MODEL_PATH", "my_yolo_model.pt")
+MODEL_BACKEND = os.environ.get("FOOD_MODEL_BACKEND", "yolo")
+MODEL_RELEASE_TIMEOUT = 30.0  # reload_model: eski modeli kullanan isteklerin bitmesi için beklenecek en uzun süre (s)
+
+# Gerçek zamanlı kaskad: küçük tespit modeli her webcam karesinde çalışır, segmentasyon modeli (MODEL_PATH)
+# sadece yeni sınıf, yeni çatal/kaşık veya belirgin kutu değişikliği görüldüğünde çalışır; ödeme görüntüleri her zaman tam modelden geçer
+CASCADE_DETECTOR_PATH = os.environ.get("FOOD_CASCADE_DETECTOR_PATH", "")  # Boş = kaskad kapalı
+CASCADE_DETECTOR_CONFIDENCE = 0.25  # Ön tespit eşiği (düşük tutulur, sınırdaki nesneler her karede tam modeli tetiklemesin)
+CASCADE_DETECTOR_IMAGE_SIZE = 320   # Ön tespit giriş boyutu
+CASCADE_CHANGE_IOU = 0.6            # Aynı sınıftan eşleşen kutunun IoU'su bunun altındaysa nesne yer değiştirmiş sayılır
+CASCADE_MAX_SKIPPED_FRAMES = 15     # Değişiklik olmasa da bu kadar karede bir tam model çalışır
+CASCADE_MAX_STREAMS = 64            # Son tam sonucu saklanan akış (istemci) sayısı
+CASCADE_STREAM_TTL = 30.0           # Kare gelmeyen akışın unutulma süresi (s)
+
+# Stub model ayarları (benchmark ve profil çıkarma için)
+STUB_SEED = 42
+STUB_FOOD_COUNT = 4        # Her tepside porsiyon bazlı yemek sayısı
+STUB_UTENSIL_COUNT = 1     # Her tepside çatal/kaşık sayısı
+STUB_LATENCY_MS = 0.0      # Yapay çıkarım gecikmesi (ms)
+STUB_POLYGON_POINTS = 120  # Her segment poligonundaki nokta sayısı
@@ -1,9 +1,12 @@
 import sqlite3
 import json
 import os
-from typing import Dict, List, Optional, Any
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 from contextlib import contextmanager
-from YOLO_SERVER.config import CURRENT_DIR, SQLITE_DB_PATH
+from YOLO_SERVER.config import CURRENT_DIR, SQLITE_DB_PATH, DB_READ_WORKERS, EXPORT_PAGE_SIZE
+from YOLO_SERVER.catalog_io import parse_foods_json
 
 class DatabaseManager:
     """
@@ -32,6 +35,9 @@ class DatabaseManager:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
+            # WAL: okumalar, devam eden bir yazmayı beklemeden çalışabilir
+            cursor.execute('PRAGMA journal_mode=WAL')
+            
             # Ana yemekler tablosu
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS foods (
@@ -83,12 +89,70 @@ class DatabaseManager:
                 )
             ''')
             
+            # Katalog değişiklik günlüğü: her satır bir katalog sürümüdür (delta senkronizasyonu için)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS food_changes (
+                    version INTEGER PRIMARY KEY AUTOINCREMENT,
+                    food_id TEXT NOT NULL,
+                    op TEXT NOT NULL CHECK (op IN ('upsert', 'delete')),
+                    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Günlük tetikleyicilerle tutulur; INSERT OR REPLACE de bir upsert kaydı üretir
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_foods_insert AFTER INSERT ON foods
+                BEGIN
+                    INSERT INTO food_changes (food_id, op) VALUES (NEW.id, 'upsert');
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_foods_update AFTER UPDATE ON foods
+                BEGIN
+                    UPDATE foods SET updated_at = CURRENT_TIMESTAMP
+                    WHERE id = NEW.id AND NEW.updated_at IS OLD.updated_at;
+                    INSERT INTO food_changes (food_id, op)
+                    SELECT OLD.id, 'delete' WHERE OLD.id IS NOT NEW.id;
+                    INSERT INTO food_changes (food_id, op) VALUES (NEW.id, 'upsert');
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_foods_delete AFTER DELETE ON foods
+                BEGIN
+                    INSERT INTO food_changes (food_id, op) VALUES (OLD.id, 'delete');
+                END
+            ''')
+            
+            # Kamera başına ölçek kalibrasyonu (sabit kiosk kameraları için cm²/piksel²)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS camera_calibration (
+                    camera_id TEXT PRIMARY KEY,
+                    scale_factor REAL NOT NULL,
+                    samples INTEGER NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Günlükten önce var olan yemekler için başlangıç kayıtları
+            cursor.execute('''
+                INSERT INTO food_changes (food_id, op)
+                SELECT id, 'upsert' FROM foods
+                WHERE NOT EXISTS (SELECT 1 FROM food_changes)
+            ''')
+            
+            # Günlüğü sıkıştır: yemek başına sadece son kayıt (silme kayıtları dahil) delta için yeterlidir
+            cursor.execute('''
+                DELETE FROM food_changes
+                WHERE version NOT IN (SELECT MAX(version) FROM food_changes GROUP BY food_id)
+            ''')
+            
             # İndeksler
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_foods_name ON foods (name)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_foods_portion_based ON foods (portion_based)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_nutrition_food_id ON nutrition (food_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_ingredients_food_id ON ingredients (food_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_allergens_food_id ON allergens (food_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_food_changes_food_id ON food_changes (food_id)')
             
             conn.commit()
     
@@ -103,68 +167,10 @@ class DatabaseManager:
         
         try:
             with open(json_path, 'r', encoding='utf-8') as f:
-                foods_data = json.load(f)
+                foods_data = parse_foods_json(json.load(f))
             
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                for food_id, food_data in foods_data.items():
-                    # Ana yemek bilgisini ekle
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO foods (
-                            id, name, price, calories, portion_based, food_category,
-                            base_height_cm, density_g_per_cm3, reference_mass_g,
-                            volume_method
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        food_id,
-                        food_data.get('name', ''),
-                        food_data.get('price', 0.0),
-                        food_data.get('calories', 0),
-                        food_data.get('portion_based', False),
-                        food_data.get('food_category'),
-                        food_data.get('base_height_cm'),
-                        food_data.get('density_g_per_cm3'),
-                        food_data.get('reference_mass_g'),
-                        food_data.get('volume_method')
-                    ))
-                    
-                    # Eski nutrition, ingredients, allergens kayıtlarını sil
-                    cursor.execute('DELETE FROM nutrition WHERE food_id = ?', (food_id,))
-                    cursor.execute('DELETE FROM ingredients WHERE food_id = ?', (food_id,))
-                    cursor.execute('DELETE FROM allergens WHERE food_id = ?', (food_id,))
-                    
-                    # Besin değerlerini ekle
-                    nutrition = food_data.get('nutrition', {})
-                    if nutrition:
-                        cursor.execute('''
-                            INSERT INTO nutrition (food_id, protein, carbs, fat, fiber)
-                            VALUES (?, ?, ?, ?, ?)
-                        ''', (
-                            food_id,
-                            nutrition.get('protein'),
-                            nutrition.get('carbs'),
-                            nutrition.get('fat'),
-                            nutrition.get('fiber')
-                        ))
-                    
-                    # Malzemeleri ekle
-                    ingredients = food_data.get('ingredients', [])
-                    for ingredient in ingredients:
-                        cursor.execute('''
-                            INSERT INTO ingredients (food_id, ingredient)
-                            VALUES (?, ?)
-                        ''', (food_id, ingredient))
-                    
-                    # Alerjenleri ekle
-                    allergens = food_data.get('allergens', [])
-                    for allergen in allergens:
-                        cursor.execute('''
-                            INSERT INTO allergens (food_id, allergen)
-                            VALUES (?, ?)
-                        ''', (food_id, allergen))
-                
-                conn.commit()
+            # Tek işlemde toplu yazma
+            self.bulk_upsert_foods(foods_data)
             
             print(f"Migration başarılı: {len(foods_data)} yemek SQLite'a aktarıldı")
             return True
@@ -173,6 +179,179 @@ class DatabaseManager:
             print(f"Migration hatası: {e}")
             return False
     
+    def bulk_upsert_foods(self, foods: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Birden çok yemeği tek işlemde ekle veya güncelle (executemany)
+        Mevcut yemeklerin created_at değeri korunur. Hata olursa hiçbir değişiklik yazılmaz.
+        Yazılan yemek sayısını döndürür.
+        """
+        if not foods:
+            return 0
+        
+        with self.get_connection() as conn:
+            written = self._upsert_foods(conn.cursor(), foods)
+            conn.commit()
+        return written
+    
+    def _upsert_foods(self, cursor, foods: Dict[str, Dict[str, Any]]) -> int:
+        """Yemekleri verilen cursor üzerinde yaz (commit çağıran tarafa bırakılır)"""
+        food_ids = [(food_id,) for food_id in foods]
+        food_rows = []
+        nutrition_rows = []
+        ingredient_rows = []
+        allergen_rows = []
+        for food_id, food_data in foods.items():
+            food_rows.append((
+                food_id,
+                food_data.get('name', ''),
+                food_data.get('price', 0.0),
+                food_data.get('calories', 0),
+                food_data.get('portion_based', False),
+                food_data.get('food_category'),
+                food_data.get('base_height_cm'),
+                food_data.get('density_g_per_cm3'),
+                food_data.get('reference_mass_g'),
+                food_data.get('volume_method')
+            ))
+            nutrition = food_data.get('nutrition', {})
+            if nutrition:
+                nutrition_rows.append((
+                    food_id,
+                    nutrition.get('protein'),
+                    nutrition.get('carbs'),
+                    nutrition.get('fat'),
+                    nutrition.get('fiber')
+                ))
+            ingredient_rows.extend((food_id, ingredient) for ingredient in food_data.get('ingredients', []))
+            allergen_rows.extend((food_id, allergen) for allergen in food_data.get('allergens', []))
+        
+        cursor.executemany('''
+            INSERT INTO foods (
+                id, name, price, calories, portion_based, food_category,
+                base_height_cm, density_g_per_cm3, reference_mass_g,
+                volume_method
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                name = excluded.name, price = excluded.price, calories = excluded.calories,
+                portion_based = excluded.portion_based, food_category = excluded.food_category,
+                base_height_cm = excluded.base_height_cm, density_g_per_cm3 = excluded.density_g_per_cm3,
+                reference_mass_g = excluded.reference_mass_g, volume_method = excluded.volume_method,
+                updated_at = CURRENT_TIMESTAMP
+        ''', food_rows)
+        
+        # İlişkili verileri sil ve yeniden ekle
+        cursor.executemany('DELETE FROM nutrition WHERE food_id = ?', food_ids)
+        cursor.executemany('DELETE FROM ingredients WHERE food_id = ?', food_ids)
+        cursor.executemany('DELETE FROM allergens WHERE food_id = ?', food_ids)
+        
+        cursor.executemany('''
+            INSERT INTO nutrition (food_id, protein, carbs, fat, fiber)
+            VALUES (?, ?, ?, ?, ?)
+        ''', nutrition_rows)
+        cursor.executemany('INSERT INTO ingredients (food_id, ingredient) VALUES (?, ?)', ingredient_rows)
+        cursor.executemany('INSERT INTO allergens (food_id, allergen) VALUES (?, ?)', allergen_rows)
+        
+        return len(food_rows)
+    
+    def bulk_delete_foods(self, food_ids: List[str]) -> int:
+        """Birden çok yemeği tek işlemde sil, silinen yemek sayısını döndür"""
+        if not food_ids:
+            return 0
+        
+        with self.get_connection() as conn:
+            deleted = self._delete_foods(conn.cursor(), food_ids)
+            conn.commit()
+        return deleted
+    
+    def _delete_foods(self, cursor, food_ids: List[str]) -> int:
+        """Yemekleri verilen cursor üzerinde sil (commit çağıran tarafa bırakılır)"""
+        rows = [(food_id,) for food_id in food_ids]
+        cursor.executemany('DELETE FROM nutrition WHERE food_id = ?', rows)
+        cursor.executemany('DELETE FROM ingredients WHERE food_id = ?', rows)
+        cursor.executemany('DELETE FROM allergens WHERE food_id = ?', rows)
+        cursor.executemany('DELETE FROM foods WHERE id = ?', rows)
+        return cursor.rowcount
+    
+    def bulk_import_foods(self, foods: Dict[str, Dict[str, Any]], delete_ids: List[str]) -> Tuple[int, int]:
+        """
+        Yemekleri ekle/güncelle ve silinecekleri sil; hepsi tek bağlantıda tek işlemde
+        Herhangi bir adım hata verirse ne eklemeler ne silmeler yazılır.
+        (yazılan, silinen) sayılarını döndürür.
+        """
+        if not foods and not delete_ids:
+            return 0, 0
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            written = self._upsert_foods(cursor, foods) if foods else 0
+            deleted = self._delete_foods(cursor, delete_ids) if delete_ids else 0
+            conn.commit()
+        return written, deleted
+    
+    def iter_food_pages(self, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[Dict[str, Dict[str, Any]]]:
+        """
+        Yemekleri id sırasıyla sayfa sayfa getir (her sayfa {id: yemek})
+        İlişkili kayıtlar sayfa başına IN (...) sorgusuyla toplu okunur (yemek başına sorgu yok).
+        Her sayfa kendi bağlantısını açar; sayfalar arasında bağlantı tutulmaz.
+        """
+        last_id = None
+        while True:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                if last_id is None:
+                    cursor.execute('SELECT * FROM foods ORDER BY id LIMIT ?', (page_size,))
+                else:
+                    cursor.execute('SELECT * FROM foods WHERE id > ? ORDER BY id LIMIT ?', (last_id, page_size))
+                food_rows = cursor.fetchall()
+                if not food_rows:
+                    return
+                
+                page = {row['id']: dict(row) for row in food_rows}
+                placeholders = ','.join('?' * len(page))
+                food_ids = list(page)
+                
+                # Besin değerleri
+                nutrition_by_food = {}
+                cursor.execute(f'SELECT * FROM nutrition WHERE food_id IN ({placeholders})', food_ids)
+                for row in cursor.fetchall():
+                    nutrition_by_food[row['food_id']] = {
+                        'protein': row['protein'],
+                        'carbs': row['carbs'],
+                        'fat': row['fat'],
+                        'fiber': row['fiber']
+                    }
+                
+                # Malzemeler ve alerjenler (get_food_by_id ile aynı sırada)
+                ingredients_by_food = {food_id: [] for food_id in food_ids}
+                cursor.execute(
+                    f'SELECT food_id, ingredient FROM ingredients WHERE food_id IN ({placeholders}) ORDER BY food_id, id',
+                    food_ids
+                )
+                for row in cursor.fetchall():
+                    ingredients_by_food[row['food_id']].append(row['ingredient'])
+                
+                allergens_by_food = {food_id: [] for food_id in food_ids}
+                cursor.execute(
+                    f'SELECT food_id, allergen FROM allergens WHERE food_id IN ({placeholders}) ORDER BY food_id, id',
+                    food_ids
+                )
+                for row in cursor.fetchall():
+                    allergens_by_food[row['food_id']].append(row['allergen'])
+            
+            for food_id, food in page.items():
+                if food_id in nutrition_by_food:
+                    food['nutrition'] = nutrition_by_food[food_id]
+                food['ingredients'] = ingredients_by_food[food_id]
+                food['allergens'] = allergens_by_food[food_id]
+                
+                # Gereksiz alanları temizle
+                for key in ['created_at', 'updated_at']:
+                    food.pop(key, None)
+            
+            yield page
+            last_id = food_ids[-1]
+    
     def get_food_by_id(self, food_id: str) -> Optional[Dict[str, Any]]:
         """ID'ye göre yemek bilgisini getir"""
         with self.get_connection() as conn:
@@ -216,19 +395,50 @@ class DatabaseManager:
     
     def get_all_foods(self) -> Dict[str, Dict[str, Any]]:
         """Tüm yemekleri dict formatında getir (JSON uyumluluğu için)"""
+        foods_dict = {}
+        for page in self.iter_food_pages():
+            foods_dict.update(page)
+        
+        return foods_dict
+    
+    def get_catalog_version(self) -> int:
+        """Katalog sürümü (son değişiklik günlüğü kaydının numarası, monoton artar)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'food_changes'")
+            row = cursor.fetchone()
+            return row['seq'] if row else 0
+    
+    def get_changes_since(self, version: int) -> Dict[str, Any]:
+        """
+        Verilen katalog sürümünden sonra değişen ve silinen yemekler
+        {'version': güncel sürüm, 'changed': {id: yemek}, 'deleted': [id, ...]}
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'food_changes'")
+            row = cursor.fetchone()
+            current_version = row['seq'] if row else 0
             
-            cursor.execute('SELECT id FROM foods')
-            food_ids = [row['id'] for row in cursor.fetchall()]
-            
-            foods_dict = {}
-            for food_id in food_ids:
-                food_data = self.get_food_by_id(food_id)
-                if food_data:
-                    foods_dict[food_id] = food_data
-            
-            return foods_dict
+            # MAX() ile seçilen satırın op değeri döner (yemek başına son işlem)
+            cursor.execute('''
+                SELECT food_id, op, MAX(version) AS version FROM food_changes
+                WHERE version > ?
+                GROUP BY food_id
+                ORDER BY version
+            ''', (version,))
+            changes = cursor.fetchall()
+        
+        changed = {}
+        deleted = []
+        for change in changes:
+            food = self.get_food_by_id(change['food_id']) if change['op'] == 'upsert' else None
+            if food:
+                changed[change['food_id']] = food
+            else:
+                deleted.append(change['food_id'])
+        
+        return {'version': current_version, 'changed': changed, 'deleted': deleted}
     
     def search_foods_by_name(self, name: str) -> List[Dict[str, Any]]:
         """İsme göre yemek ara"""
@@ -395,8 +605,210 @@ class DatabaseManager:
             print(f"Yemek silme hatası: {e}")
             return False
 
+    def get_camera_calibration(self, camera_id: str) -> Optional[Dict[str, Any]]:
+        """Kameranın kayıtlı ölçek kalibrasyonu"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM camera_calibration WHERE camera_id = ?', (camera_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def get_camera_calibrations(self) -> Dict[str, Dict[str, Any]]:
+        """Tüm kameraların kayıtlı kalibrasyonları {camera_id: kayıt}"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM camera_calibration')
+            return {row['camera_id']: dict(row) for row in cursor.fetchall()}
+    
+    def save_camera_calibration(self, camera_id: str, scale_factor: float, samples: int) -> bool:
+        """Kameranın ölçek kalibrasyonunu kaydet (varsa güncelle)"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO camera_calibration (camera_id, scale_factor, samples)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (camera_id) DO UPDATE SET
+                        scale_factor = excluded.scale_factor,
+                        samples = excluded.samples,
+                        updated_at = CURRENT_TIMESTAMP
+                ''', (camera_id, scale_factor, samples))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Kalibrasyon kaydetme hatası: {e}")
+            return False
+    
+    def get_database_stats(self) -> Dict[str, Any]:
+        """Veritabanı istatistiklerini getir"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+        
+            # Toplam yemek sayısı
+            cursor.execute('SELECT COUNT(*) as total FROM foods')
+            total_foods = cursor.fetchone()['total']
+        
+            # Porsiyon bazlı yemek sayısı
+            cursor.execute('SELECT COUNT(*) as portion_based FROM foods WHERE portion_based = 1')
+            portion_based_foods = cursor.fetchone()['portion_based']
+        
+            # En pahalı ve en ucuz yemekler
+            cursor.execute('SELECT MAX(price) as max_price, MIN(price) as min_price FROM foods WHERE price > 0')
+            price_stats = cursor.fetchone()
+        
+            # Toplam kalori aralığı
+            cursor.execute('SELECT MAX(calories) as max_calories, MIN(calories) as min_calories FROM foods WHERE calories > 0')
+            calorie_stats = cursor.fetchone()
+        
+            # Kategori bazlı dağılım (NULL ve boş kategori CatalogStats gibi 'uncategorized' altında)
+            cursor.execute('''
+                SELECT COALESCE(NULLIF(food_category, ''), 'uncategorized') AS category, COUNT(*) AS count,
+                       SUM(portion_based = 1) AS portion_based, AVG(price) AS avg_price
+                FROM foods
+                GROUP BY category
+                ORDER BY category
+            ''')
+            categories = {
+                row['category']: {
+                    'count': row['count'],
+                    'portion_based': row['portion_based'],
+                    'avg_price': round(row['avg_price'], 2)
+                }
+                for row in cursor.fetchall()
+            }
+        
+            return {
+                'total_foods': total_foods,
+                'portion_based_foods': portion_based_foods,
+                'non_portion_foods': total_foods - portion_based_foods,
+                'price_range': {
+                    'min': price_stats['min_price'],
+                    'max': price_stats['max_price']
+                },
+                'calorie_range': {
+                    'min': calorie_stats['min_calories'],
+                    'max': calorie_stats['max_calories']
+                },
+                'categories': categories
+            }
+
+class CatalogChangeWatcher:
+    """
+    Başka bağlantıların (ör. diğer işçi süreçlerin) yaptığı değişiklikleri tespit eder
+    PRAGMA data_version, sadece başka bağlantılar commit yaptığında değişir; her tablodaki yazmada
+    (ör. kamera kalibrasyonu) değiştiği için ardından katalog sürümü de karşılaştırılır
+    """
+    
+    def __init__(self, db_path: str = None):
+        if db_path is None:
+            db_path = SQLITE_DB_PATH
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.last_version = self._data_version()
+        self.last_catalog_version = self._catalog_version()
+    
+    def _data_version(self) -> int:
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
+    
+    def _catalog_version(self) -> int:
+        row = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'food_changes'").fetchone()
+        return row[0] if row else 0
+    
+    def has_changed(self) -> bool:
+        """Son kontrolden bu yana katalog değişti mi? (katalog dışı yazmalar sayılmaz)"""
+        version = self._data_version()
+        if version == self.last_version:
+            return False
+        self.last_version = version
+        catalog_version = self._catalog_version()
+        if catalog_version == self.last_catalog_version:
+            return False
+        self.last_catalog_version = catalog_version
+        return True
+    
+    def close(self):
+        self.conn.close()
+
+class AsyncDatabaseManager:
+    """
+    Awaitable wrapper around DatabaseManager for use inside the event loop
+    TR: DatabaseManager için event loop'u bloklamayan erişim katmanı.
+    Yazmalar tek bir iş parçacığında sırayla, okumalar ayrı bir havuzda eşzamanlı çalışır.
+    """
+    
+    def __init__(self, manager: DatabaseManager = None, read_workers: int = DB_READ_WORKERS):
+        self.manager = manager or get_database_manager()
+        self.write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+        self.read_executor = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="db-read")
+    
+    async def _read(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.read_executor, func, *args)
+    
+    async def _write(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.write_executor, func, *args)
+    
+    async def get_food_by_id(self, food_id: str) -> Optional[Dict[str, Any]]:
+        return await self._read(self.manager.get_food_by_id, food_id)
+    
+    async def get_all_foods(self) -> Dict[str, Dict[str, Any]]:
+        return await self._read(self.manager.get_all_foods)
+    
+    async def get_catalog_version(self) -> int:
+        return await self._read(self.manager.get_catalog_version)
+    
+    async def get_changes_since(self, version: int) -> Dict[str, Any]:
+        return await self._read(self.manager.get_changes_since, version)
+    
+    async def search_foods_by_name(self, name: str) -> List[Dict[str, Any]]:
+        return await self._read(self.manager.search_foods_by_name, name)
+    
+    async def get_database_stats(self) -> Dict[str, Any]:
+        return await self._read(self.manager.get_database_stats)
+    
+    async def add_food(self, food_id: str, food_data: Dict[str, Any]) -> bool:
+        return await self._write(self.manager.add_food, food_id, food_data)
+    
+    async def update_food(self, food_id: str, food_data: Dict[str, Any]) -> bool:
+        return await self._write(self.manager.update_food, food_id, food_data)
+    
+    async def delete_food(self, food_id: str) -> bool:
+        return await self._write(self.manager.delete_food, food_id)
+    
+    async def bulk_upsert_foods(self, foods: Dict[str, Dict[str, Any]]) -> int:
+        return await self._write(self.manager.bulk_upsert_foods, foods)
+    
+    async def bulk_delete_foods(self, food_ids: List[str]) -> int:
+        return await self._write(self.manager.bulk_delete_foods, food_ids)
+    
+    async def bulk_import_foods(self, foods: Dict[str, Dict[str, Any]], delete_ids: List[str]) -> Tuple[int, int]:
+        return await self._write(self.manager.bulk_import_foods, foods, delete_ids)
+    
+    async def get_camera_calibrations(self) -> Dict[str, Dict[str, Any]]:
+        return await self._read(self.manager.get_camera_calibrations)
+    
+    def save_camera_calibration_nowait(self, camera_id: str, scale_factor: float, samples: int):
+        """Kalibrasyonu yazma iş parçacığına sıraya koy ve beklemeden dön (herhangi bir iş parçacığından çağrılabilir)"""
+        return self.write_executor.submit(self.manager.save_camera_calibration, camera_id, scale_factor, samples)
+    
+    async def iter_food_pages(self, page_size: int = EXPORT_PAGE_SIZE):
+        """Sayfaları okuma havuzunda tek tek getiren async üreteç (tüm katalog bellekte tutulmaz)"""
+        pages = self.manager.iter_food_pages(page_size)
+        while True:
+            page = await self._read(next, pages, None)
+            if page is None:
+                return
+            yield page
+    
+    async def run_read(self, func, *args):
+        """Okuma havuzunda rastgele bir fonksiyon çalıştır (ör. katalog yeniden yükleme)"""
+        return await self._read(func, *args)
+    
+    def close(self):
+        self.write_executor.shutdown(wait=True)
+        self.read_executor.shutdown(wait=True)
+
 # Singleton pattern için global instance
 _db_manager = None
+_async_db_manager = None
 
 def get_database_manager() -> DatabaseManager:
     """Database manager singleton instance"""
@@ -405,6 +817,13 @@ def get_database_manager() -> DatabaseManager:
         _db_manager = DatabaseManager()
     return _db_manager
 
+def get_async_database_manager() -> AsyncDatabaseManager:
+    """Async database manager singleton instance"""
+    global _async_db_manager
+    if _async_db_manager is None:
+        _async_db_manager = AsyncDatabaseManager()
+    return _async_db_manager
+
 def load_food_database_from_sqlite() -> Dict[str, Dict[str, Any]]:
     """
     SQLite'dan yemek veritabanını yükle
@@ -450,38 +869,7 @@ def delete_existing_food(food_id: str) -> bool:
 
 def get_database_stats() -> Dict[str, Any]:
     """
-    Veritabanı istatistiklerini getir
+    Veritabanı istatistiklerini getir (kısayol fonksiyon)
     """
     db_manager = get_database_manager()
-    with db_manager.get_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Toplam yemek sayısı
-        cursor.execute('SELECT COUNT(*) as total FROM foods')
-        total_foods = cursor.fetchone()['total']
-        
-        # Porsiyon bazlı yemek sayısı
-        cursor.execute('SELECT COUNT(*) as portion_based FROM foods WHERE portion_based = 1')
-        portion_based_foods = cursor.fetchone()['portion_based']
-        
-        # En pahalı ve en ucuz yemekler
-        cursor.execute('SELECT MAX(price) as max_price, MIN(price) as min_price FROM foods WHERE price > 0')
-        price_stats = cursor.fetchone()
-        
-        # Toplam kalori aralığı
-        cursor.execute('SELECT MAX(calories) as max_calories, MIN(calories) as min_calories FROM foods WHERE calories > 0')
-        calorie_stats = cursor.fetchone()
-        
-        return {
-            'total_foods': total_foods,
-            'portion_based_foods': portion_based_foods,
-            'non_portion_foods': total_foods - portion_based_foods,
-            'price_range': {
-                'min': price_stats['min_price'],
-                'max': price_stats['max_price']
-            },
-            'calorie_range': {
-                'min': calorie_stats['min_calories'],
-                'max': calorie_stats['max_calories']
-            }
-        } 
\ No newline at end of file
+    return db_manager.get_database_stats()
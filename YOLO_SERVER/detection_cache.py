@@ -0,0 +1,60 @@
+import time
+import uuid
+from collections import OrderedDict
+from YOLO_SERVER.config import DETECTION_CACHE_MAX_ENTRIES, DETECTION_CACHE_TTL
+
+class DetectionCache:
+    """
+    Raw detections of recently analyzed images, for re-thresholding without inference
+    TR: Son analiz edilen görüntülerin ham tespitleri (LRU + TTL).
+    Güven eşiği değiştiğinde "refilter" mesajı çıkarımı tekrarlamadan buradan yanıtlanır.
+    Sadece event loop'tan kullanılır, kilit gerekmez.
+    """
+
+    def __init__(self, max_entries=DETECTION_CACHE_MAX_ENTRIES, ttl=DETECTION_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def put(self, detections, floor, enable_portion_calculation, camera_id=None):
+        """Ham tespitleri sakla ve görüntü kimliğini döndür"""
+        image_id = uuid.uuid4().hex
+        self.entries[image_id] = {
+            'detections': detections,
+            'floor': floor,
+            'enable_portion_calculation': enable_portion_calculation,
+            'camera_id': camera_id,
+            'stored_at': time.monotonic()
+        }
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return image_id
+
+    def get(self, image_id):
+        """Görüntünün kaydı (süresi dolmuşsa veya yoksa None)"""
+        entry = self.entries.get(image_id)
+        if entry is not None and time.monotonic() - entry['stored_at'] > self.ttl:
+            del self.entries[image_id]
+            self.evictions += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(image_id)
+        self.hits += 1
+        return entry
+
+    def metrics(self):
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+# Süreç genelinde tek önbellek (refilter, görüntüyü analiz eden işçi sürecine gelir)
+DETECTION_CACHE = DetectionCache()
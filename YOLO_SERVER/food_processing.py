@@ -1,12 +1,18 @@
 import time
-from YOLO_SERVER.model import predict_with_yolo, extract_polygon_from_mask
+import asyncio
+import functools
+import numpy as np
+from YOLO_SERVER.model import predict_with_yolo, predict_batch_with_yolo, mask_polygon
 from YOLO_SERVER.utils import (
     calculate_segment_area, calculate_scale_factor_from_bbox_area,
-    pixel_area_to_cm2, compute_volume, compute_mass,
-    compute_portion, round_to_nearest_portion, scale_nutrition_values,
-    analyze_segment_geometry, estimate_dynamic_height, compute_advanced_volume
+    scale_nutrition_values, analyze_segment_geometry
 )
-from YOLO_SERVER.config import DEFAULT_FOOD_HEIGHT_CM, DEFAULT_FOOD_DENSITY, DEFAULT_PORTION_MASS
+from YOLO_SERVER.calibration import get_calibrator
+from YOLO_SERVER.portion_engine import get_portion_engine
+from YOLO_SERVER.config import BATCH_INFERENCE_SIZE
+
+# Ölçek referansı olan sınıflar (poligonları kalibrasyon için her zaman çıkarılır)
+REFERENCE_CLASSES = ("catal", "kasik")
 
 def create_generic_food_info(class_name, confidence):
     """
@@ -29,184 +35,345 @@ def create_generic_food_info(class_name, confidence):
     }
 
 # Görüntü işleme ve segmentasyon
-async def process_image(model, image, food_database, confidence_threshold=0.5, filter_classes=None, enable_portion_calculation=True):
+async def process_image(model, image, food_database, confidence_threshold=0.5, filter_classes=None, enable_portion_calculation=True,
+                        camera_id=None, coordinate_scale=None, detection_floor=None):
     """
     Process image to detect and analyze food items
     TR: Görüntüyü tespit edip analiz eder.
+    detection_floor verilirse model bu (daha düşük) eşikte çalışır, sonuç confidence_threshold ile süzülür
+    ve ham tespitler 'raw_detections' alanında döner; eşik değişince çıkarım tekrarlanmaz.
     """
     try:
         start_time = time.time()
         
-        # Run YOLO prediction
-        results = predict_with_yolo(model, image, confidence_threshold)
+        # Run YOLO prediction (event loop dışında, diğer bağlantılar beklemesin)
+        # Sınıf filtresi modele verilir, elenen nesnelerin maskeleri hiç çözülmez
+        # Porsiyon kapalıysa maskeler tam çözünürlüğe büyütülmez (sadece tespit yolu)
+        loop = asyncio.get_running_loop()
+        keep_raw = detection_floor is not None
+        model_confidence = min(detection_floor, confidence_threshold) if keep_raw else confidence_threshold
+        predict = functools.partial(
+            predict_with_yolo, model, image, model_confidence,
+            filter_classes=filter_classes, retina_masks=enable_portion_calculation
+        )
+        results = await loop.run_in_executor(None, predict)
+        
+        response = analyze_results(results, food_database, filter_classes, enable_portion_calculation, camera_id,
+                                   coordinate_scale, confidence_threshold if keep_raw else None, keep_raw)
+        response['processing_time'] = time.time() - start_time
+        return response
+    
+    except Exception as e:
+        print(f"Error processing image: {e}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+async def process_cascaded_frame(cascade, stream_key, config_key, model, image, food_database, confidence_threshold=0.5,
+                                 filter_classes=None, enable_portion_calculation=True, camera_id=None, coordinate_scale=None):
+    """
+    Process a realtime frame through the detector cascade
+    TR: Gerçek zamanlı kareyi önce kaskadın küçük modelinden geçirir; tepside değişiklik yoksa akışın son tam
+    sonucu döner, varsa kare process_image ile segmentasyon modelinden geçer. Yanıtın 'cascade' alanı
+    hangi aşamanın çalıştığını ('detector' / 'full') ve tam model gerekçesini taşır.
+    """
+    start_time = time.time()
+    loop = asyncio.get_running_loop()
+    try:
+        detections, detector_seconds = await loop.run_in_executor(
+            None, functools.partial(cascade.detect, image, filter_classes))
+    except Exception as e:
+        # Ön tespit başarısızsa kare tam modelle işlenir
+        print(f"Cascade detector error: {e}")
+        detections, detector_seconds = None, 0.0
+
+    if detections is not None:
+        reason, cached = cascade.decide(stream_key, detections, config_key, detector_seconds)
+        if reason is None:
+            response = dict(cached)
+            response['processing_time'] = time.time() - start_time
+            response['cascade'] = {'stage': 'detector'}
+            return response
+    else:
+        cascade.forget(stream_key)
+        reason = 'detector_error'
+
+    response = await process_image(model, image, food_database, confidence_threshold, filter_classes,
+                                   enable_portion_calculation, camera_id, coordinate_scale)
+    if response.get('success') and detections is not None:
+        cascade.store(stream_key, dict(response))
+    else:
+        cascade.forget(stream_key)
+    response['processing_time'] = time.time() - start_time
+    response['cascade'] = {'stage': 'full', 'reason': reason}
+    return response
+
+# Toplu görüntü işleme (tek mesajda birden fazla görüntü)
+async def process_image_batch(model, images, food_database, confidence_threshold=0.5, filter_classes=None,
+                              enable_portion_calculation=True, batch_size=BATCH_INFERENCE_SIZE, inference_slot=None,
+                              camera_id=None, coordinate_scales=None):
+    """
+    Run images through the model in real batches and yield (index, result) as each batch finishes
+    TR: Görüntüleri gerçek batch'ler halinde modelden geçirir, her batch bitince sonuçları sırayla üretir.
+    coordinate_scales: görüntü başına analyze_results coordinate_scale değeri (küçültülmüş çözme)
+    """
+    loop = asyncio.get_running_loop()
+    
+    for start in range(0, len(images), batch_size):
+        chunk = images[start:start + batch_size]
+        predict = functools.partial(
+            predict_batch_with_yolo, model, chunk, confidence_threshold,
+            filter_classes=filter_classes, retina_masks=enable_portion_calculation
+        )
+        batch_start = time.time()
+        
+        try:
+            # Çıkarımı event loop dışında çalıştır, böylece önceki sonuçlar gönderilebilir
+            # inference_slot: model erişimini zamanlayıcıdan almak için async context manager üreticisi
+            if inference_slot is not None:
+                async with inference_slot():
+                    results = await loop.run_in_executor(None, predict)
+            else:
+                results = await loop.run_in_executor(None, predict)
+        except Exception as e:
+            print(f"Error processing image batch: {e}")
+            for offset in range(len(chunk)):
+                yield start + offset, {'success': False, 'error': str(e)}
+            continue
+        
+        # Batch çıkarım süresini görüntülere paylaştır
+        inference_share = (time.time() - batch_start) / len(chunk)
         
-        detections = []
-        reference_objects = []
+        for offset, result in enumerate(results):
+            post_start = time.time()
+            try:
+                coordinate_scale = coordinate_scales[start + offset] if coordinate_scales else None
+                response = analyze_results([result], food_database, filter_classes, enable_portion_calculation, camera_id,
+                                           coordinate_scale)
+                response['processing_time'] = inference_share + (time.time() - post_start)
+            except Exception as e:
+                print(f"Error processing image: {e}")
+                response = {'success': False, 'error': str(e)}
+            yield start + offset, response
+
+def extract_segments(masks, index, coordinate_scale=None):
+    """
+    Polygon of one detection's mask in original image coordinates
+    TR: Tek bir tespitin maske poligonu (gerekirse orijinal görüntü koordinatlarına taşınır).
+    masks.xy kullanılmaz: Ultralytics'te ilk erişimde tüm maskeleri dönüştürür, burada sadece bu maske çözülür.
+    """
+    polygon = mask_polygon(masks, index)
+    if coordinate_scale is not None and polygon:
+        polygon = (np.asarray(polygon, dtype=np.float64) * coordinate_scale).tolist()
+    return polygon
+
+def extract_detections(results, food_database, filter_classes=None, enable_portion_calculation=True,
+                       coordinate_scale=None):
+    """
+    Raw detections (class, confidence, bbox and, where needed, segments) from model results
+    TR: Model sonuçlarından ham tespitler: sınıf, güven, kutu ve gerekiyorsa poligon.
+    Yemek bilgisi eklenmez; böylece aynı ham tespitler farklı güven eşikleriyle yeniden özetlenebilir.
+    coordinate_scale: görüntü küçültülerek çözüldüyse (sx, sy); kutu ve poligonlar orijinal
+    koordinatlara taşınır, böylece çizimler ve ölçek faktörü değişmez.
+    """
+    detections = []
+    
+    # Process each detection result (her bir tahmin sonucu için)
+    for result in results:
+        boxes = result.boxes
+        masks = result.masks
         
-        # Process each detection result (her bir tahmin sonucu için)
-        for result in results:
-            boxes = result.boxes
-            masks = result.masks
+        if boxes is None:
+            continue
             
-            if masks is None:
+        for i, box in enumerate(boxes):
+            class_id = int(box.cls.item())
+            class_name = result.names[class_id]
+            confidence = box.conf.item()
+            
+            # Apply class filter if specified (sınıf filtresi uygula)
+            # Model zaten filtreliyor; model dışı sonuçlar için güvence
+            if filter_classes and class_name not in filter_classes:
                 continue
-                
-            for i, (box, mask) in enumerate(zip(boxes, masks.data)):
-                class_id = int(box.cls.item())
-                class_name = result.names[class_id]
-                confidence = box.conf.item()
-                
-                # Apply class filter if specified (sınıf filtresi uygula)
-                if filter_classes and class_name not in filter_classes:
-                    continue
-                
-                # Get bounding box (sınırlayıcı kutu)
-                x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-                bbox = [x1, y1, x2, y2]
-                
-                # Segmentasyon maskesi için polygon koordinatlarını al
-                # Ultralytics YOLO, result.masks.xy ile direkt polygon koordinatlarını sağlıyor
-                polygon = []
-                if hasattr(masks, 'xy') and i < len(masks.xy):
-                    # Direct polygon coordinates from Ultralytics
-                    polygon = masks.xy[i].tolist()
-                else:
-                    # Fallback method
-                    print("DEBUG: ESKİ YÖNTEM KULLANILIYOR DAMNNNNNNNNNNNNNNNNN BUNA BAK ÖNEMLİ")
-                    polygon = extract_polygon_from_mask(mask)
-                
-                # Normalize class name (normalize edilmiş sınıf adı)
-                normalized_class = class_name.lower().replace(' ', '_')
-                
-                # Create detection object (tahmin sonucu objesi)
-                detection = {
-                    'class': class_name,
-                    'confidence': confidence,
-                    'bbox': bbox,
-                    'segments': polygon
-                }
-                
-                # Add food information from database (veritabanından beslenme bilgilerini ekle)
-                if normalized_class in food_database:
-                    food_info = food_database[normalized_class].copy()
-                    detection['food_info'] = food_info
-                else:
-                    print(f"Veritabanında bulunamadı: {normalized_class} random değerler oluşturulacak")
-                    # Veritabanında yoksa genel bilgi oluştur
-                    detection['food_info'] = create_generic_food_info(class_name, confidence)
-                
-                # Add reference objects to separate list (Çatal veya kaşık ise referans nesneleri ayrı listeye ekle)
-                if normalized_class in ["catal", "kasik"]:
-                    reference_objects.append(detection)
-                
-                # Sonuç objesini ekle
-                detections.append(detection)
+            
+            # Get bounding box (sınırlayıcı kutu)
+            xyxy = box.xyxy[0].tolist()
+            if coordinate_scale is not None:
+                sx, sy = coordinate_scale
+                xyxy = [xyxy[0] * sx, xyxy[1] * sy, xyxy[2] * sx, xyxy[3] * sy]
+            x1, y1, x2, y2 = map(int, xyxy)
+            bbox = [x1, y1, x2, y2]
+            
+            # Create detection object (tahmin sonucu objesi)
+            detection = {
+                'class': class_name,
+                'confidence': confidence,
+                'bbox': bbox
+            }
+            
+            # Polygon sadece kullanılacaksa çıkarılır: porsiyon bazlı yemekler (hacim) ve çatal/kaşık (ölçek/kalibrasyon)
+            # Porsiyon kapalıyken ölçek kullanılmaz, çatal/kaşık da maske çözdürmez
+            # Diğer tespitlerde 'segments' alanı yoktur; fiyat ve kalori sınıf/güvene göre hesaplanır
+            normalized_class = class_name.lower().replace(' ', '_')
+            if masks is not None and enable_portion_calculation and (
+                    normalized_class in REFERENCE_CLASSES or
+                    food_database.get(normalized_class, {}).get('portion_based')):
+                detection['segments'] = extract_segments(masks, i, coordinate_scale)
+            
+            detections.append(detection)
+    
+    return detections
+
+def analyze_results(results, food_database, filter_classes=None, enable_portion_calculation=True, camera_id=None,
+                    coordinate_scale=None, confidence_threshold=None, keep_raw=False):
+    """
+    Turn raw model results into detections with food info, portions and totals
+    TR: Ham model sonuçlarını yemek bilgisi, porsiyon ve toplamlarla birlikte tespitlere dönüştürür.
+    keep_raw: ham tespitler yanıtın 'raw_detections' alanında da döner (yeniden süzme önbelleği için).
+    """
+    raw_detections = extract_detections(results, food_database, filter_classes, enable_portion_calculation,
+                                        coordinate_scale)
+    response = summarize_detections(raw_detections, food_database, confidence_threshold, enable_portion_calculation,
+                                    camera_id)
+    if keep_raw:
+        response['raw_detections'] = raw_detections
+    return response
+
+def summarize_detections(raw_detections, food_database, confidence_threshold=None, enable_portion_calculation=True,
+                         camera_id=None, update_calibration=True):
+    """
+    Add food info, portions and totals to raw detections
+    TR: Ham tespitlere yemek bilgisi, porsiyon ve toplamları ekler.
+    confidence_threshold verilirse daha düşük güvenli tespitler atlanır (model gibi: güven > eşik).
+    camera_id verilirse ölçek, o kameranın kalibrasyonundan alınır (çatal/kaşık görünmese de);
+    update_calibration=False ise aynı karenin ölçümleri kalibrasyona ikinci kez eklenmez.
+    """
+    detections = []
+    reference_objects = []
+    
+    for raw_detection in raw_detections:
+        if confidence_threshold is not None and raw_detection['confidence'] <= confidence_threshold:
+            continue
         
-        # Kaşık veya çatal var mı kontrol et
-        has_utensils = len(reference_objects) > 0
+        class_name = raw_detection['class']
+        confidence = raw_detection['confidence']
+        detection = dict(raw_detection)
         
-        # Eğer kaşık/çatal yoksa porsiyon hesaplamayı deaktif et
-        if not has_utensils:
-            enable_portion_calculation = False
-            print("Kaşık veya çatal tespit edilmedi - porsiyon hesaplama deaktif")
+        # Normalize class name (normalize edilmiş sınıf adı)
+        normalized_class = class_name.lower().replace(' ', '_')
         
-        # Ölçek faktörünü hesapla (sadece kaşık/çatal varsa)
-        scale_factor = None
-        if has_utensils:
-            scale_factor = calculate_scale_factor_from_bbox_area(reference_objects)
-            print(f"Hesaplanan ölçek faktörü: {scale_factor}")
+        # Add food information from database (veritabanından beslenme bilgilerini ekle)
+        if normalized_class in food_database:
+            food_info = food_database[normalized_class].copy()
+            detection['food_info'] = food_info
+        else:
+            print(f"Veritabanında bulunamadı: {normalized_class} random değerler oluşturulacak")
+            # Veritabanında yoksa genel bilgi oluştur
+            detection['food_info'] = create_generic_food_info(class_name, confidence)
         
-        # Track total price and calories
-        total_price = 0
-        total_calories = 0
+        # Add reference objects to separate list (Çatal veya kaşık ise referans nesneleri ayrı listeye ekle)
+        if normalized_class in REFERENCE_CLASSES:
+            reference_objects.append(detection)
         
-        # Her bir yiyecek için porsiyon hesapla ve diğer verileri güncelle
-        for detection in detections:
-            
-            # Yiyecek bilgisi
+        # Sonuç objesini ekle
+        detections.append(detection)
+    
+    # Kaşık veya çatal var mı kontrol et
+    has_utensils = len(reference_objects) > 0
+    
+    scale_factor = None
+    if camera_id is not None:
+        # Sabit kamera: kalibrasyon kararlıysa referans nesne ölçümü çoğu karede atlanır
+        calibrator = get_calibrator(camera_id)
+        if update_calibration and has_utensils and calibrator.needs_reference_pass():
+            calibrator.observe(reference_objects)
+        scale_factor = calibrator.scale_factor
+        if scale_factor is None and has_utensils:
+            # Kalibrasyon için henüz yeterli ölçüm yok, bu karenin kutularını kullan
+            scale_factor = calculate_scale_factor_from_bbox_area(reference_objects)
+        print(f"Kamera {camera_id} ölçek faktörü: {scale_factor}")
+    elif has_utensils:
+        # Ölçek faktörünü hesapla (sadece kaşık/çatal varsa)
+        scale_factor = calculate_scale_factor_from_bbox_area(reference_objects)
+        print(f"Hesaplanan ölçek faktörü: {scale_factor}")
+    
+    # Ölçek yoksa (kaşık/çatal ve kalibrasyon yok) porsiyon hesaplamayı deaktif et
+    if scale_factor is None:
+        if enable_portion_calculation:
+            print("Kaşık veya çatal tespit edilmedi - porsiyon hesaplama deaktif")
+        enable_portion_calculation = False
+    
+    # Track total price and calories
+    total_price = 0
+    total_calories = 0
+    
+    # Porsiyon bazlı yiyeceklerin geometrisini çıkar, porsiyonları tek seferde hesapla
+    portion_items = []
+    if enable_portion_calculation:
+        for index, detection in enumerate(detections):
             food_info = detection["food_info"]
-            #TODO: classların isimleriyle aşağıdak kodlar uyuşuyor mu bakılacak.
-            normalized_class = detection['class'].lower().replace(' ', '_')
-            
-            # Porsiyon hesaplama kontrolü
-            if enable_portion_calculation and 'portion_based' in food_info and food_info['portion_based']:
-                # Segmentasyon geometrisini analiz et
-                geometry_info = analyze_segment_geometry(detection["segments"])
-                
-                # Segmentasyon alanı (piksel)
-                segment_area_px = geometry_info["area"]
-                
-                # Gerçek dünya alanı (cm²)
-                real_area_cm2 = pixel_area_to_cm2(segment_area_px, scale_factor)
-                
-                # Geometry info'yu real area ile güncelle
-                geometry_info_real = geometry_info.copy()
-                geometry_info_real["area"] = real_area_cm2
-                
-                # Temel yiyecek yüksekliği, yoğunluğu ve standart porsiyon kütlesi verilerini al
-                base_height_cm = food_info.get('base_height_cm',  DEFAULT_FOOD_HEIGHT_CM)
-                food_density = food_info.get('density_g_per_cm3', DEFAULT_FOOD_DENSITY)
-                std_portion_mass = food_info.get('reference_mass_g', DEFAULT_PORTION_MASS)
-                
-                # Dinamik yükseklik tahmini
-                estimated_height_cm = estimate_dynamic_height(normalized_class, geometry_info_real, base_height_cm)
-                
-                # Gelişmiş hacim hesaplama
-                volume_cm3 = compute_advanced_volume(normalized_class, real_area_cm2, estimated_height_cm, geometry_info)
-                
-                # Kütle hesapla
-                mass_g = compute_mass(volume_cm3, food_density)
-                
-                # Porsiyon hesapla ve yuvarla
-                raw_portion = compute_portion(mass_g, std_portion_mass)
-                portion = round_to_nearest_portion(raw_portion)
-                
-                # Hesaplama detaylarını yazdır (debug)
-                print(f"\n{food_info['name']} için gelişmiş hesaplama:")
-                print(f"  Segment Alanı: {segment_area_px:.2f} piksel²")
-                print(f"  Gerçek Alan: {real_area_cm2:.2f} cm²")
-                print(f"  Geometri - Dairesellik: {geometry_info['circularity']:.3f}")
-                print(f"  Baz Yükseklik: {base_height_cm:.2f} cm")
-                print(f"  Tahmini Yükseklik: {estimated_height_cm:.2f} cm")
-                print(f"  Gelişmiş Hacim: {volume_cm3:.2f} cm³")
-                print(f"  Kütle: {mass_g:.2f} g")
-                print(f"  Ham Porsiyon: {raw_portion:.2f}")
-                print(f"  Yuvarlanmış Porsiyon: {portion}")
-                
-                # Porsiyon bilgilerini ekle
-                food_info['portion'] = portion
-                food_info['base_price'] = food_info['price']
-                food_info['portion_price'] = round(food_info['price'] * portion, 2)
-                
-                # Besin değerlerini güncelle
-                original_calories = food_info['calories']
-                food_info['calories'] = int(original_calories * portion)
-                
-                if 'nutrition' in food_info:
-                    food_info['nutrition'] = scale_nutrition_values(food_info['nutrition'], portion)
-                
-                # Toplam hesaplar için porsiyon fiyatını kullan
-                total_price += food_info['portion_price']
-                total_calories += food_info['calories']
-            else:
-                # Porsiyon hesaplama deaktif veya porsiyon bazlı olmayan yiyecekler için standart değerleri kullan
-                print(f"{food_info['name']} için porsiyon hesaplama {'deaktif' if not enable_portion_calculation else 'porsiyon bazlı değil'}")
-                total_price += food_info['price']
-                total_calories += food_info['calories']
+            # Poligonu olmayan tespit (ör. önbellekteki kare alındıktan sonra porsiyon bazlı yapılan yemek) standart fiyatla kalır
+            if food_info.get('portion_based') and 'segments' in detection:
+                normalized_class = detection['class'].lower().replace(' ', '_')
+                portion_items.append((index, normalized_class, food_info, analyze_segment_geometry(detection["segments"])))
+    
+    portion_rows = {}
+    if portion_items:
+        estimates = get_portion_engine(food_database).estimate(
+            [(normalized_class, food_info, geometry_info) for _, normalized_class, food_info, geometry_info in portion_items],
+            scale_factor
+        )
+        for row, (index, _, _, geometry_info) in enumerate(portion_items):
+            portion_rows[index] = (row, geometry_info)
+    
+    # Her bir yiyecek için porsiyon bilgilerini ve diğer verileri güncelle
+    for index, detection in enumerate(detections):
         
-        processing_time = time.time() - start_time
+        # Yiyecek bilgisi
+        food_info = detection["food_info"]
         
-        return {
-            'success': True,
-            'data': detections,
-            'total_price': round(total_price, 2),
-            'total_calories': total_calories,
-            'processing_time': processing_time
-        }
+        # Porsiyon hesaplama kontrolü
+        if index in portion_rows:
+            row, geometry_info = portion_rows[index]
+            portion = float(estimates['portion'][row])
+            
+            # Hesaplama detaylarını yazdır (debug)
+            print(f"\n{food_info['name']} için gelişmiş hesaplama:")
+            print(f"  Segment Alanı: {geometry_info['area']:.2f} piksel²")
+            print(f"  Gerçek Alan: {estimates['real_area'][row]:.2f} cm²")
+            print(f"  Geometri - Dairesellik: {geometry_info['circularity']:.3f}")
+            print(f"  Baz Yükseklik: {estimates['base_height'][row]:.2f} cm")
+            print(f"  Tahmini Yükseklik: {estimates['height'][row]:.2f} cm")
+            print(f"  Gelişmiş Hacim: {estimates['volume'][row]:.2f} cm³")
+            print(f"  Kütle: {estimates['mass'][row]:.2f} g")
+            print(f"  Ham Porsiyon: {estimates['raw_portion'][row]:.2f}")
+            print(f"  Yuvarlanmış Porsiyon: {portion}")
+            
+            # Porsiyon bilgilerini ekle
+            food_info['portion'] = portion
+            food_info['base_price'] = food_info['price']
+            food_info['portion_price'] = round(food_info['price'] * portion, 2)
+            
+            # Besin değerlerini güncelle
+            original_calories = food_info['calories']
+            food_info['calories'] = int(original_calories * portion)
+            
+            if 'nutrition' in food_info:
+                food_info['nutrition'] = scale_nutrition_values(food_info['nutrition'], portion)
+            
+            # Toplam hesaplar için porsiyon fiyatını kullan
+            total_price += food_info['portion_price']
+            total_calories += food_info['calories']
+        else:
+            # Porsiyon hesaplama deaktif veya porsiyon bazlı olmayan yiyecekler için standart değerleri kullan
+            print(f"{food_info['name']} için porsiyon hesaplama {'deaktif' if not enable_portion_calculation else 'porsiyon bazlı değil'}")
+            total_price += food_info['price']
+            total_calories += food_info['calories']
     
-    except Exception as e:
-        print(f"Error processing image: {e}")
-        return {
-            'success': False,
-            'error': str(e)
-        } 
\ No newline at end of file
+    return {
+        'success': True,
+        'data': detections,
+        'total_price': round(total_price, 2),
+        'total_calories': total_calories
+    } 
\ No newline at end of file
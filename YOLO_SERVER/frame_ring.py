@@ -0,0 +1,85 @@
+import queue
+import numpy as np
+import cv2
+from multiprocessing import shared_memory
+from YOLO_SERVER.config import FRAME_RING_SLOTS, FRAME_RING_MAX_FRAME_BYTES
+
+class FrameTooLargeError(ValueError):
+    """Çözülen kare bir slota sığmıyor"""
+    pass
+
+class FrameRing:
+    """
+    Ring of preallocated frame slots in shared memory
+    TR: Paylaşımlı bellekte önceden ayrılmış kare slotlarından oluşan halka.
+    WebSocket süreci kareyi bir slota yazar ve sadece slot indeksi + şekli gönderir;
+    işçi süreç kareyi kopyalamadan okur ve işi bitince slotu serbest bırakır.
+    Boş slot kalmadığında acquire() None döner (geri basınç).
+    """
+
+    def __init__(self, shm, slots, max_frame_bytes, free_slots, owner):
+        self.shm = shm
+        self.slots = slots
+        self.max_frame_bytes = max_frame_bytes
+        self.free_slots = free_slots
+        self.owner = owner
+
+    @classmethod
+    def create(cls, context, slots=FRAME_RING_SLOTS, max_frame_bytes=FRAME_RING_MAX_FRAME_BYTES):
+        """Halkayı oluştur (sahip süreç). context: multiprocessing context"""
+        shm = shared_memory.SharedMemory(create=True, size=slots * max_frame_bytes)
+        free_slots = context.Queue(maxsize=slots)
+        for slot in range(slots):
+            free_slots.put(slot)
+        return cls(shm, slots, max_frame_bytes, free_slots, owner=True)
+
+    def handle(self):
+        """İşçi süreçlere geçirilecek (pickle edilebilir) tanımlayıcı"""
+        return (self.shm.name, self.slots, self.max_frame_bytes, self.free_slots)
+
+    @classmethod
+    def attach(cls, handle):
+        """Başka bir süreçte mevcut halkaya bağlan"""
+        name, slots, max_frame_bytes, free_slots = handle
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, slots, max_frame_bytes, free_slots, owner=False)
+
+    def acquire(self, timeout=None):
+        """Boş bir slot al; halka doluysa timeout sonunda None döner"""
+        try:
+            return self.free_slots.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, slot):
+        """Slotu tekrar kullanılabilir yap"""
+        self.free_slots.put(slot)
+
+    def view(self, slot, shape, dtype=np.uint8):
+        """Slottaki kareye kopyasız numpy görünümü"""
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=slot * self.max_frame_bytes)
+
+    def write(self, slot, image):
+        """Kareyi slota yaz, şeklini döndür"""
+        if image.nbytes > self.max_frame_bytes:
+            raise FrameTooLargeError(
+                f"Kare boyutu ({image.nbytes} bayt) slot boyutunu ({self.max_frame_bytes} bayt) aşıyor"
+            )
+        np.copyto(self.view(slot, image.shape, image.dtype), image)
+        return image.shape
+
+    def decode_into(self, slot, encoded, flags=cv2.IMREAD_COLOR):
+        """
+        JPEG/PNG baytlarını çöz ve slota yaz. cv2.imdecode Python'da hedef tampon almadığı için
+        kare bir kez slota kopyalanır; pipe üzerinden pickle etmeye göre ihmal edilebilir maliyet.
+        """
+        image = cv2.imdecode(np.frombuffer(encoded, np.uint8), flags)
+        if image is None:
+            return None
+        return self.write(slot, image)
+
+    def close(self):
+        """Bu süreçteki eşlemeyi kapat; sahip süreç belleği de serbest bırakır"""
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
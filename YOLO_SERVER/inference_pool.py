@@ -0,0 +1,312 @@
+import base64
+import itertools
+import queue
+import signal
+import threading
+import time
+import asyncio
+import multiprocessing
+from YOLO_SERVER.config import (
+    FRAME_RING_SLOTS, FRAME_RING_MAX_FRAME_BYTES, FRAME_RING_ACQUIRE_TIMEOUT,
+    INFERENCE_WORKER_START_TIMEOUT, INFERENCE_REQUEST_TIMEOUT, INFERENCE_WORKER_RESTART_DELAY
+)
+from YOLO_SERVER.frame_ring import FrameRing
+from YOLO_SERVER.utils import decode_image_for_inference, apply_source_size
+
+# Sonuç okuyucunun işçi sağlığını kontrol etme aralığı (s)
+WORKER_CHECK_INTERVAL = 0.5
+
+class RingFullError(RuntimeError):
+    """Tüm kare slotları dolu (geri basınç)"""
+    pass
+
+class InferenceUnavailableError(RuntimeError):
+    """Hazır çıkarım işçisi yok (hepsi yeniden başlatılıyor)"""
+    pass
+
+def _inference_worker(worker_index, ring_handle, request_queue, result_queue, model_path, threads_per_worker):
+    """
+    Çıkarım işçisi: kareleri paylaşımlı bellekten kopyasız okur ve modeli çalıştırır.
+    Slotu ana süreç sonucu aldığında serbest bırakır (işçi ölse de slot bir kez bırakılır).
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from YOLO_SERVER.model import load_yolo_model, predict_with_yolo, configure_inference_threads
+    from YOLO_SERVER.food_processing import analyze_results
+    from YOLO_SERVER.utils import load_food_database
+    from YOLO_SERVER.database import CatalogChangeWatcher
+
+    configure_inference_threads(threads_per_worker)
+    ring = FrameRing.attach(ring_handle)
+    model = load_yolo_model(model_path)
+    food_database = load_food_database()
+    watcher = CatalogChangeWatcher()
+    result_queue.put(('ready', worker_index, model is not None))
+
+    while True:
+        item = request_queue.get()
+        if item is None:
+            break
+        request_id, slot, shape, options = item
+        start_time = time.time()
+        try:
+            if watcher.has_changed():
+                food_database = load_food_database()
+            image = ring.view(slot, shape)
+            keep_raw = options['floor'] is not None
+            model_confidence = min(options['floor'], options['confidence']) if keep_raw else options['confidence']
+            results = predict_with_yolo(model, image, model_confidence, filter_classes=options['classes'],
+                                        retina_masks=options['portions'])
+            response = analyze_results(results, food_database, options['classes'], options['portions'], options['camera_id'],
+                                       options['coordinate_scale'], options['confidence'] if keep_raw else None, keep_raw)
+            response['processing_time'] = time.time() - start_time
+        except Exception as e:
+            response = {'success': False, 'error': str(e)}
+        finally:
+            # Slot görünümü sonuç gönderilmeden bırakılır; slotu ana süreç yeniden kullanıma açar
+            image = None
+            results = None
+        result_queue.put(('result', request_id, response))
+
+    watcher.close()
+    ring.close()
+
+class InferencePool:
+    """
+    Inference worker processes fed through a shared-memory frame ring
+    TR: Paylaşımlı bellek kare halkası üzerinden beslenen çıkarım işçi süreçleri.
+    Her işçinin kendi istek kuyruğu vardır; sonuç okuyucu iş parçacığı işçileri de izler,
+    ölen işçinin bekleyen isteklerini hata ile tamamlar, slotlarını bırakır ve işçiyi yeniden başlatır.
+    """
+
+    def __init__(self, model_path, workers, threads_per_worker=1,
+                 slots=FRAME_RING_SLOTS, max_frame_bytes=FRAME_RING_MAX_FRAME_BYTES):
+        self.context = multiprocessing.get_context('spawn')
+        self.model_path = model_path
+        self.threads_per_worker = threads_per_worker
+        self.ring = FrameRing.create(self.context, slots, max_frame_bytes)
+        self.result_queue = self.context.Queue()
+        # request_id -> (future, işçi indeksi, slot); event loop ve okuyucu iş parçacığı paylaşır
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.request_ids = itertools.count()
+        self.loop = None
+        self.request_queues = [None] * workers
+        self.processes = [None] * workers
+        self.ready = [False] * workers
+        self.restart_at = [None] * workers
+        self.restarts = 0
+        self.stopping = False
+        for index in range(workers):
+            self._spawn(index)
+        self.reader = threading.Thread(target=self._read_results, name="inference-results", daemon=True)
+
+    def _spawn(self, index):
+        """İşçiyi (yeniden) oluştur; ölen işçinin kuyruğu bozuk olabilir, her seferinde yeni kuyruk"""
+        self.request_queues[index] = self.context.Queue()
+        self.processes[index] = self.context.Process(
+            target=_inference_worker,
+            args=(index, self.ring.handle(), self.request_queues[index], self.result_queue,
+                  self.model_path, self.threads_per_worker),
+            name=f"inference-worker-{index}",
+            daemon=True
+        )
+        self.ready[index] = False
+        self.restart_at[index] = None
+
+    @property
+    def ready_workers(self):
+        return sum(self.ready)
+
+    def start(self, timeout=INFERENCE_WORKER_START_TIMEOUT):
+        """İşçileri başlat ve hepsi modelini yükleyene kadar bekle (işçi ölürse veya süre dolarsa RuntimeError)"""
+        self.loop = asyncio.get_event_loop()
+        for process in self.processes:
+            process.start()
+        deadline = time.monotonic() + timeout
+        while not all(self.ready):
+            try:
+                kind, worker_index, model_loaded = self.result_queue.get(timeout=WORKER_CHECK_INTERVAL)
+            except queue.Empty:
+                for index, process in enumerate(self.processes):
+                    if not self.ready[index] and not process.is_alive():
+                        raise RuntimeError(f"Çıkarım işçisi {index} hazır olmadan sonlandı (exit={process.exitcode})")
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Çıkarım işçileri {timeout:.0f} s içinde hazır olmadı")
+                continue
+            if not model_loaded:
+                raise RuntimeError(f"Çıkarım işçisi {worker_index} modeli yükleyemedi")
+            self.ready[worker_index] = True
+        self.reader.start()
+        print(f"✅ {self.ready_workers} çıkarım işçisi hazır ({self.ring.slots} kare slotu)")
+
+    def _read_results(self):
+        """Sonuç kuyruğunu oku, bekleyen future'ları event loop üzerinde tamamla ve işçileri izle"""
+        while True:
+            try:
+                item = self.result_queue.get(timeout=WORKER_CHECK_INTERVAL)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            if item and item[0] == 'ready':
+                _, worker_index, model_loaded = item
+                if model_loaded:
+                    self.ready[worker_index] = True
+                    print(f"✅ Çıkarım işçisi {worker_index} yeniden hazır")
+                else:
+                    print(f"❌ Çıkarım işçisi {worker_index} modeli yükleyemedi")
+                    self.processes[worker_index].terminate()
+            elif item:
+                _, request_id, response = item
+                with self.pending_lock:
+                    entry = self.pending.pop(request_id, None)
+                if entry is not None:
+                    future, _, slot = entry
+                    self.ring.release(slot)
+                    self.loop.call_soon_threadsafe(self._resolve, future, response)
+            if not self.stopping:
+                self._check_workers()
+
+    def _check_workers(self):
+        """Sonlanan işçinin isteklerini hata ile bitir, slotlarını bırak ve işçiyi gecikmeli yeniden başlat"""
+        now = time.monotonic()
+        for index, process in enumerate(self.processes):
+            if self.restart_at[index] is not None:
+                if now >= self.restart_at[index]:
+                    self._spawn(index)
+                    self.processes[index].start()
+                    self.restarts += 1
+                continue
+            if process.is_alive():
+                continue
+
+            self.ready[index] = False
+            self.restart_at[index] = now + INFERENCE_WORKER_RESTART_DELAY
+            with self.pending_lock:
+                lost = [request_id for request_id, entry in self.pending.items() if entry[1] == index]
+                entries = [self.pending.pop(request_id) for request_id in lost]
+            print(f"⚠️  Çıkarım işçisi {index} sonlandı (exit={process.exitcode}), "
+                  f"{len(entries)} istek başarısız, yeniden başlatılıyor...")
+            for future, _, slot in entries:
+                self.ring.release(slot)
+                self.loop.call_soon_threadsafe(self._resolve, future, {
+                    'success': False,
+                    'error': 'Çıkarım işçisi beklenmedik şekilde sonlandı'
+                })
+
+    @staticmethod
+    def _resolve(future, response):
+        if not future.done():
+            future.set_result(response)
+
+    def _pick_worker(self):
+        """En az bekleyen isteği olan hazır işçi (yoksa None)"""
+        with self.pending_lock:
+            load = [0] * len(self.processes)
+            for _, worker_index, _ in self.pending.values():
+                load[worker_index] += 1
+        candidates = [index for index, ready in enumerate(self.ready) if ready]
+        return min(candidates, key=lambda index: load[index]) if candidates else None
+
+    def _stage_frame(self, base64_string, source_size=None):
+        """Slot al ve kareyi doğrudan slota çöz (executor içinde çalışır)"""
+        slot = self.ring.acquire(timeout=FRAME_RING_ACQUIRE_TIMEOUT)
+        if slot is None:
+            raise RingFullError("Tüm kare slotları dolu")
+        try:
+            # Büyük JPEG'ler çıkarım boyutuna yakın ölçekte çözülür, slota daha az bayt yazılır
+            image, coordinate_scale = decode_image_for_inference(base64.b64decode(base64_string))
+            shape = self.ring.write(slot, image) if image is not None else None
+            if source_size is not None and image is not None:
+                coordinate_scale = apply_source_size(image, coordinate_scale, source_size)
+        except Exception:
+            self.ring.release(slot)
+            raise
+        if shape is None:
+            self.ring.release(slot)
+        return slot, shape, coordinate_scale
+
+    def _release_staged(self, staging):
+        """İptal edilen isteğin çözülmüş slotunu bırak (çözme başarısızsa slot zaten bırakıldı)"""
+        if staging.cancelled() or staging.exception() is not None:
+            return
+        slot, shape, _ = staging.result()
+        if shape is not None:
+            self.ring.release(slot)
+
+    async def process_base64(self, base64_string, confidence_threshold=0.5, filter_classes=None, enable_portion_calculation=True,
+                             camera_id=None, source_size=None, detection_floor=None, timeout=INFERENCE_REQUEST_TIMEOUT):
+        """
+        Base64 görüntüyü bir slota çöz, işçiye sadece slot indeksini gönder ve sonucu bekle.
+        Halka doluysa RingFullError, hazır işçi yoksa InferenceUnavailableError fırlatır.
+        Sonuç timeout içinde gelmezse işçi takılmış sayılır ve sonlandırılır (okuyucu yeniden başlatır).
+        detection_floor: process_image ile aynı anlamda.
+        """
+        if self._pick_worker() is None:
+            raise InferenceUnavailableError("Hazır çıkarım işçisi yok")
+
+        loop = asyncio.get_running_loop()
+        # Çözme, görev iptal edilse de executor'da biter; shield sonucu kaybetmez, slot geri callback'te bırakılır
+        staging = loop.run_in_executor(None, self._stage_frame, base64_string, source_size)
+        try:
+            slot, shape, coordinate_scale = await asyncio.shield(staging)
+        except asyncio.CancelledError:
+            staging.add_done_callback(self._release_staged)
+            raise
+        if shape is None:
+            return None
+
+        worker_index = self._pick_worker()
+        if worker_index is None:
+            self.ring.release(slot)
+            raise InferenceUnavailableError("Hazır çıkarım işçisi yok")
+
+        request_id = next(self.request_ids)
+        future = loop.create_future()
+        with self.pending_lock:
+            self.pending[request_id] = (future, worker_index, slot)
+        self.request_queues[worker_index].put((request_id, slot, shape, {
+            'confidence': confidence_threshold,
+            'classes': filter_classes,
+            'portions': enable_portion_calculation,
+            'camera_id': camera_id,
+            'coordinate_scale': coordinate_scale,
+            'floor': detection_floor
+        }))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            # Slot işçi sonlandırılınca okuyucu tarafından bırakılır
+            print(f"⚠️  Çıkarım işçisi {worker_index} {timeout:.0f} s içinde yanıt vermedi, sonlandırılıyor")
+            self.processes[worker_index].terminate()
+            return {'success': False, 'error': 'Çıkarım zaman aşımına uğradı'}
+
+    def status(self):
+        """Sağlık ucu için işçi durumu"""
+        with self.pending_lock:
+            pending = len(self.pending)
+        return {
+            'inference_processes': len(self.processes),
+            'alive': sum(1 for process in self.processes if process.is_alive()),
+            'ready': self.ready_workers,
+            'restarts': self.restarts,
+            'pending': pending
+        }
+
+    def close(self):
+        """İşçileri durdur ve paylaşımlı belleği serbest bırak"""
+        self.stopping = True
+        for index, process in enumerate(self.processes):
+            if process.is_alive():
+                self.request_queues[index].put(None)
+        for process in self.processes:
+            if process.pid is None:
+                continue
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self.result_queue.put(None)
+        if self.reader.is_alive():
+            self.reader.join(timeout=5)
+        self.ring.close()
@@ -0,0 +1,148 @@
+import json
+import time
+import asyncio
+from YOLO_SERVER.config import DRAIN_TIMEOUT
+
+# Sunucu durumları
+STARTING = 'starting'
+READY = 'ready'
+DRAINING = 'draining'
+STOPPED = 'stopped'
+
+class Lifecycle:
+    """
+    Server readiness state and in-flight request tracking
+    TR: Sunucunun hazır olma durumu ve süren istek sayısı.
+    starting -> ready -> draining -> stopped; draining'de yeni kareler reddedilir,
+    wait_idle() süren isteklerin (yanıt gönderimi dahil) bitmesini bekler.
+    """
+
+    def __init__(self):
+        self.state = STARTING
+        self.inflight = 0
+        self.started_at = time.monotonic()
+        self.drain_started_at = None
+        self.drain_reason = None
+        self.abandoned = 0
+        self._draining = None
+        self._idle = None
+
+    def _events(self):
+        # Olaylar sunucunun event loop'unda oluşturulur
+        if self._draining is None:
+            self._draining = asyncio.Event()
+            self._idle = asyncio.Event()
+            self._idle.set()
+        return self._draining, self._idle
+
+    @property
+    def accepting(self):
+        """Yeni görüntü istekleri kabul ediliyor mu?"""
+        return self.state in (STARTING, READY)
+
+    def mark_ready(self):
+        if self.state == STARTING:
+            self.state = READY
+
+    def start_draining(self, reason='signal'):
+        """Yeni kareleri reddetmeye başla; tekrar çağrılırsa etkisizdir"""
+        draining, _ = self._events()
+        if self.state in (DRAINING, STOPPED):
+            return False
+        self.state = DRAINING
+        self.drain_reason = reason
+        self.drain_started_at = time.monotonic()
+        draining.set()
+        return True
+
+    async def wait_draining(self):
+        draining, _ = self._events()
+        await draining.wait()
+
+    def track(self, task):
+        """Görev bitene kadar süren istek say"""
+        _, idle = self._events()
+        self.inflight += 1
+        idle.clear()
+        task.add_done_callback(self._finished)
+        return task
+
+    def _finished(self, _task):
+        self.inflight -= 1
+        if self.inflight <= 0:
+            self._idle.set()
+
+    def abandon(self):
+        """Beklemeyi hemen bitir (ikinci kapanış sinyali)"""
+        _, idle = self._events()
+        idle.set()
+
+    async def wait_idle(self, timeout=DRAIN_TIMEOUT):
+        """Süren istekler bitene kadar bekle; süre dolarsa False (kalan istek sayısı abandoned'a yazılır)"""
+        _, idle = self._events()
+        try:
+            await asyncio.wait_for(idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self.inflight:
+            self.abandoned = self.inflight
+            return False
+        return True
+
+    def mark_stopped(self):
+        self.state = STOPPED
+
+    def status(self):
+        now = time.monotonic()
+        return {
+            'state': self.state,
+            'ready': self.state == READY,
+            'inflight': self.inflight,
+            'uptime_s': round(now - self.started_at, 1),
+            'draining_for_s': round(now - self.drain_started_at, 1) if self.drain_started_at else None,
+            'drain_reason': self.drain_reason,
+            'abandoned': self.abandoned
+        }
+
+# Süreç genelinde tek yaşam döngüsü
+LIFECYCLE = Lifecycle()
+
+_HTTP_REASONS = {200: 'OK', 404: 'Not Found', 503: 'Service Unavailable'}
+
+async def start_health_server(host, port, report):
+    """
+    Local HTTP health probe
+    TR: Yerel HTTP sağlık ucu. GET /health her zaman 200 (süreç ayakta),
+    GET /ready sadece sunucu hazırsa 200, değilse 503 döner; gövde report() çıktısıdır.
+    """
+    async def handle(reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5.0)
+            # Başlıkları oku ve yok say
+            while (await asyncio.wait_for(reader.readline(), 5.0)) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.decode('latin-1').split()
+            path = parts[1].split('?', 1)[0] if len(parts) >= 2 else ''
+
+            body = report()
+            if path == '/health':
+                status = 200
+            elif path == '/ready':
+                status = 200 if body['ready'] else 503
+            else:
+                status, body = 404, {'error': 'not found'}
+
+            payload = json.dumps(body).encode('utf-8')
+            writer.write(
+                f"HTTP/1.1 {status} {_HTTP_REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode('latin-1') + payload
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -1,13 +1,32 @@
 import time
-from ultralytics import YOLO
+import weakref
+from collections import Counter, OrderedDict
 import cv2
 import numpy as np
-from YOLO_SERVER.config import DEFAULT_CONFIDENCE_THRESHOLD, DEFAULT_IOU_THRESHOLD, DEFAULT_IMAGE_SIZE
+from YOLO_SERVER.config import (
+    DEFAULT_CONFIDENCE_THRESHOLD, DEFAULT_IOU_THRESHOLD, DEFAULT_IMAGE_SIZE, MODEL_BACKEND, MAX_DETECTIONS,
+    REFERENCE_OBJECTS, CASCADE_DETECTOR_CONFIDENCE, CASCADE_DETECTOR_IMAGE_SIZE, CASCADE_CHANGE_IOU,
+    CASCADE_MAX_SKIPPED_FRAMES, CASCADE_MAX_STREAMS, CASCADE_STREAM_TTL
+)
+
+# Model -> {sınıf adı: sınıf kimliği} (model yeniden yüklenince kendiliğinden düşer)
+_class_index_cache = weakref.WeakKeyDictionary()
 
 # YOLO model yükleme fonksiyonu
-def load_yolo_model(model_path):
-    """Load YOLO model from file"""
+def load_yolo_model(model_path, backend=MODEL_BACKEND):
+    """Load YOLO model from file (or the weightless stub backend)"""
+    # Sadece "stub" veya "stub:..." tanımı; "stubby_v2.pt" gibi ağırlık dosyaları gerçek modeldir
+    is_stub_spec = model_path == "stub" or model_path.startswith("stub:")
+    if backend == "stub" or is_stub_spec:
+        from YOLO_SERVER.stub_model import StubYOLOModel, parse_stub_spec
+        spec = model_path if is_stub_spec else "stub"
+        model = StubYOLOModel(**parse_stub_spec(spec))
+        print(f"Stub model loaded: {spec}")
+        return model
+    
     try:
+        # Ultralytics sadece gerçek model için gerekli (stub backend torch olmadan çalışır)
+        from ultralytics import YOLO
         model = YOLO(model_path)
         print(f"YOLO model loaded successfully: {model_path}")
         return model
@@ -15,8 +34,45 @@ def load_yolo_model(model_path):
         print(f"Error loading model: {e}")
         return None
 
-def predict_with_yolo(model, image, conf_threshold=DEFAULT_CONFIDENCE_THRESHOLD, iou_threshold=DEFAULT_IOU_THRESHOLD):
-    """Run YOLO inference on an image"""
+def configure_inference_threads(num_threads):
+    """
+    Pin torch intra-op and OpenCV threads so that several worker processes do not oversubscribe cores
+    TR: Birden fazla işçi süreç çekirdekleri aşırı paylaşmasın diye torch/OpenCV iş parçacıklarını sabitler.
+    """
+    num_threads = max(1, int(num_threads))
+    cv2.setNumThreads(num_threads)
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        # Stub backend torch olmadan da çalışır
+        pass
+
+def class_ids_for(model, class_names):
+    """
+    Translate a class-name filter into the model's class ids
+    TR: Sınıf adı filtresini modelin sınıf kimliklerine çevirir (eşleme model başına bir kez kurulur).
+    Filtre yoksa None döner; filtredeki hiçbir ad modelde yoksa boş liste döner ve model hiçbir şey tespit etmez.
+    """
+    if not class_names:
+        return None
+    if isinstance(class_names, str):
+        class_names = [class_names]
+    index = _class_index_cache.get(model)
+    if index is None:
+        names = model.names
+        pairs = names.items() if isinstance(names, dict) else enumerate(names)
+        index = {name: class_id for class_id, name in pairs}
+        _class_index_cache[model] = index
+    return sorted({index[name] for name in class_names if name in index})
+
+def predict_with_yolo(model, image, conf_threshold=DEFAULT_CONFIDENCE_THRESHOLD, iou_threshold=DEFAULT_IOU_THRESHOLD,
+                      filter_classes=None, max_det=MAX_DETECTIONS, retina_masks=True):
+    """
+    Run YOLO inference on an image
+    TR: filter_classes modelin classes= argümanına çevrilir; elenen nesneler için maske hiç çözülmez.
+    retina_masks=False: porsiyon hesaplanmayacaksa maskeler tam çözünürlüğe büyütülmez (sadece tespit yolu).
+    """
     if model is None:
         raise ValueError("Model is not loaded")
     
@@ -24,18 +80,229 @@ def predict_with_yolo(model, image, conf_threshold=DEFAULT_CONFIDENCE_THRESHOLD,
         source=image,
         conf=conf_threshold,
         iou=iou_threshold,
-        retina_masks=True,
+        retina_masks=retina_masks,
         imgsz=DEFAULT_IMAGE_SIZE, # YOLO kendi içinde resize işlemi yapar
+        classes=class_ids_for(model, filter_classes),
+        max_det=max_det,
+    )
+    
+    return results
+
+def predict_batch_with_yolo(model, images, conf_threshold=DEFAULT_CONFIDENCE_THRESHOLD, iou_threshold=DEFAULT_IOU_THRESHOLD,
+                            filter_classes=None, max_det=MAX_DETECTIONS, retina_masks=True):
+    """Run YOLO inference on a list of images as a single batch"""
+    if model is None:
+        raise ValueError("Model is not loaded")
+    
+    results = model.predict(
+        source=list(images),
+        conf=conf_threshold,
+        iou=iou_threshold,
+        retina_masks=retina_masks,
+        imgsz=DEFAULT_IMAGE_SIZE,
+        batch=len(images),
+        classes=class_ids_for(model, filter_classes),
+        max_det=max_det,
     )
     
     return results
 
-# Eğer Ultralytics'in doğrudan yöntemi başarısız olursa, polygon çıkarma
+def _as_numpy(values):
+    """torch tensörü veya numpy dizisi -> numpy dizisi"""
+    return values.cpu().numpy() if hasattr(values, 'cpu') else np.asarray(values)
+
+def detect_boxes(model, image, conf_threshold=CASCADE_DETECTOR_CONFIDENCE, filter_classes=None,
+                 image_size=CASCADE_DETECTOR_IMAGE_SIZE):
+    """
+    Detection-only pass of the small cascade model
+    TR: Kaskadın küçük modeliyle sadece kutu tespiti: [(normalize sınıf adı, (x1, y1, x2, y2))].
+    """
+    results = model.predict(
+        source=image,
+        conf=conf_threshold,
+        iou=DEFAULT_IOU_THRESHOLD,
+        imgsz=image_size,
+        classes=class_ids_for(model, filter_classes),
+        max_det=MAX_DETECTIONS,
+    )
+    boxes = results[0].boxes
+    if boxes is None or not len(boxes):
+        return []
+    names = model.names
+    class_ids = _as_numpy(boxes.cls).astype(int)
+    xyxy = _as_numpy(boxes.xyxy).astype(float)
+    return [(names[class_id].lower().replace(' ', '_'), tuple(box)) for class_id, box in zip(class_ids, xyxy)]
+
+def box_iou(a, b):
+    """İki (x1, y1, x2, y2) kutusunun kesişim/birleşim oranı"""
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    intersection = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+def detection_change(reference, current, change_iou=CASCADE_CHANGE_IOU):
+    """
+    Why the full model must run again, or None when the frame matches the reference
+    TR: Ön tespitleri son tam çalıştırmadaki ön tespitlerle karşılaştırır; tam model gerekiyorsa nedeni döner.
+    Nedenler öncelik sırasıyla: 'utensil' (yeni çatal/kaşık), 'new_class', 'items_changed' (sayı değişti),
+    'boxes_moved' (aynı sınıftan eşleşen kutunun IoU'su change_iou altında).
+    """
+    reference_counts = Counter(name for name, _ in reference)
+    current_counts = Counter(name for name, _ in current)
+    if any(current_counts[name] > reference_counts[name] for name in REFERENCE_OBJECTS):
+        return 'utensil'
+    if set(current_counts) - set(reference_counts):
+        return 'new_class'
+    if current_counts != reference_counts:
+        return 'items_changed'
+
+    # Aynı sınıftaki kutular açgözlü eşlenir (tepside sınıf başına az nesne olur)
+    unmatched = list(reference)
+    for name, box in current:
+        candidates = [(box_iou(box, other), index) for index, (other_name, other) in enumerate(unmatched)
+                      if other_name == name]
+        best_iou, best_index = max(candidates)
+        if best_iou < change_iou:
+            return 'boxes_moved'
+        del unmatched[best_index]
+    return None
+
+class DetectorCascade:
+    """
+    Two-stage cascade for realtime webcam frames
+    TR: Gerçek zamanlı kareler için iki aşamalı kaskad. Küçük tespit modeli her karede çalışır (detect);
+    decide() ön tespitleri akışın son tam çalıştırmasındakilerle karşılaştırır ve segmentasyon modelinin
+    gerekip gerekmediğine karar verir. Gerekmiyorsa akışın son tam sonucu kullanılır.
+    detect() çıkarım iş parçacığında, decide/store/forget sadece event loop'tan çağrılır (kilit gerekmez).
+    """
+
+    def __init__(self, detector, confidence=CASCADE_DETECTOR_CONFIDENCE, image_size=CASCADE_DETECTOR_IMAGE_SIZE,
+                 change_iou=CASCADE_CHANGE_IOU, max_skipped_frames=CASCADE_MAX_SKIPPED_FRAMES,
+                 max_streams=CASCADE_MAX_STREAMS, stream_ttl=CASCADE_STREAM_TTL):
+        self.detector = detector
+        self.confidence = confidence
+        self.image_size = image_size
+        self.change_iou = change_iou
+        self.max_skipped_frames = max_skipped_frames
+        self.max_streams = max_streams
+        self.stream_ttl = stream_ttl
+        self.streams = OrderedDict()
+        self.frames = 0
+        self.full_runs = 0
+        self.reasons = Counter()
+        self.detector_seconds = 0.0
+
+    def detect(self, image, filter_classes=None):
+        """Ön tespitler ve süresi (s)"""
+        started = time.perf_counter()
+        detections = detect_boxes(self.detector, image, self.confidence, filter_classes, self.image_size)
+        return detections, time.perf_counter() - started
+
+    def decide(self, stream_key, detections, config_key, detector_seconds=0.0):
+        """
+        Return (reason, None) when the full model must run, else (None, last full result of the stream)
+        TR: config_key (eşik, sınıf filtresi, porsiyon ayarı, katalog/model sürümü) değişirse tam model çalışır.
+        """
+        now = time.monotonic()
+        self._evict(now)
+        self.frames += 1
+        self.detector_seconds += detector_seconds
+
+        stream = self.streams.get(stream_key)
+        if stream is None or stream['result'] is None:
+            reason = 'first_frame'
+        elif stream['config_key'] != config_key:
+            reason = 'config_changed'
+        else:
+            reason = detection_change(stream['reference'], detections, self.change_iou)
+            if reason is None and stream['skipped'] >= self.max_skipped_frames:
+                reason = 'refresh'
+
+        if reason is None:
+            stream['skipped'] += 1
+            stream['seen'] = now
+            self.streams.move_to_end(stream_key)
+            return None, stream['result']
+
+        # Yeni referans: tam modelin çalıştığı karenin ön tespitleri (sonuç store() ile eklenir)
+        self.streams[stream_key] = {
+            'reference': detections,
+            'config_key': config_key,
+            'result': None,
+            'skipped': 0,
+            'seen': now
+        }
+        self.streams.move_to_end(stream_key)
+        self.full_runs += 1
+        self.reasons[reason] += 1
+        return reason, None
+
+    def store(self, stream_key, result):
+        """Tam modelin sonucunu akışın sonraki karelerinde kullanılmak üzere sakla"""
+        stream = self.streams.get(stream_key)
+        if stream is not None:
+            stream['result'] = result
+
+    def forget(self, stream_key):
+        self.streams.pop(stream_key, None)
+
+    def _evict(self, now):
+        while self.streams:
+            stream_key, stream = next(iter(self.streams.items()))
+            if len(self.streams) <= self.max_streams and now - stream['seen'] <= self.stream_ttl:
+                break
+            del self.streams[stream_key]
+
+    def metrics(self):
+        return {
+            'frames': self.frames,
+            'full_runs': self.full_runs,
+            'skipped': self.frames - self.full_runs,
+            'full_stage_rate': round(self.full_runs / self.frames, 3) if self.frames else None,
+            'reasons': dict(self.reasons),
+            'detector_ms': round(self.detector_seconds / self.frames * 1000.0, 2) if self.frames else None,
+            'streams': len(self.streams)
+        }
+
+def load_detector_cascade(detector_path):
+    """Kaskadın küçük tespit modelini yükle (yüklenemezse None, webcam kareleri tam modelle işlenir)"""
+    detector = load_yolo_model(detector_path)
+    if detector is None:
+        return None
+    return DetectorCascade(detector)
+
+# Tek maskeden polygon çıkarma (en büyük dış kontur, maske koordinatlarında)
 def extract_polygon_from_mask(mask):
     """Extract polygon from mask if Ultralytics direct approach fails"""
-    mask_np = mask.cpu().numpy().astype(np.uint8) * 255
+    mask_np = (mask.cpu().numpy() if hasattr(mask, 'cpu') else np.asarray(mask)).astype(np.uint8) * 255
     contours, _ = cv2.findContours(mask_np, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     if contours:
         max_contour = max(contours, key=cv2.contourArea)
         return max_contour.reshape(-1, 2).tolist()
-    return [] 
\ No newline at end of file
+    return [] 
+def mask_polygon(masks, index):
+    """
+    Polygon of one mask in original image coordinates, without touching masks.xy
+    TR: Tek bir maskenin orijinal görüntü koordinatlarındaki poligonu. Ultralytics'te masks.xy
+    ilk erişimde tüm maskeleri dönüştürür; burada sadece istenen maske çözülür ve masks.xy ile
+    aynı şekilde (letterbox dolgusu çıkarılarak) orig_shape'e ölçeklenir.
+    """
+    polygon = extract_polygon_from_mask(masks.data[index])
+    orig_shape = getattr(masks, 'orig_shape', None)
+    if not polygon or orig_shape is None:
+        return polygon
+
+    mask_height, mask_width = masks.data.shape[1:]
+    orig_height, orig_width = orig_shape[:2]
+    if (mask_height, mask_width) == (orig_height, orig_width):
+        return polygon
+    gain = min(mask_height / orig_height, mask_width / orig_width)
+    pad_x = round((mask_width - orig_width * gain) / 2 - 0.1)
+    pad_y = round((mask_height - orig_height * gain) / 2 - 0.1)
+    points = (np.asarray(polygon, dtype=np.float64) - (pad_x, pad_y)) / gain
+    points[:, 0] = points[:, 0].clip(0, orig_width)
+    points[:, 1] = points[:, 1].clip(0, orig_height)
+    return points.tolist()
@@ -0,0 +1,125 @@
+import gc
+import time
+import asyncio
+import weakref
+import numpy as np
+from YOLO_SERVER.model import load_yolo_model, predict_with_yolo
+from YOLO_SERVER.config import DEFAULT_IMAGE_SIZE, MODEL_RELEASE_TIMEOUT
+
+# Katalogda olmaları beklenmeyen sınıflar (ölçek referansı)
+UTENSIL_CLASSES = ("catal", "kasik")
+
+class ModelHolder:
+    """
+    The model currently served by this process, replaceable at runtime
+    TR: Süreçte sunulan model; sunucu durdurulmadan yenisiyle değiştirilebilir.
+    İstekler modeli işe başlarken bir kez okur; değişimden önce başlayan istekler eski modelle tamamlanır.
+    """
+
+    def __init__(self, model=None, model_path=None):
+        self.model = model
+        self.model_path = model_path
+        self.version = 1
+        self.loaded_at = time.time()
+        self.reloading = False
+        self.reload_supported = True
+        self.last_error = None
+
+    def install(self, model, model_path, reload_supported=True):
+        """Sunucu başlarken yüklenen modeli kaydet"""
+        self.model = model
+        self.model_path = model_path
+        self.loaded_at = time.time()
+        self.reload_supported = reload_supported
+
+    def swap(self, model, model_path):
+        """Yeni modeli tek atamayla etkinleştir, eskisini döndür"""
+        previous = self.model
+        self.model = model
+        self.model_path = model_path
+        self.version += 1
+        self.loaded_at = time.time()
+        return previous
+
+    def status(self):
+        return {
+            'model_path': self.model_path,
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'reloading': self.reloading,
+            'reload_supported': self.reload_supported,
+            'last_error': self.last_error
+        }
+
+def model_class_names(model):
+    """Modelin normalize edilmiş sınıf adları"""
+    if model is None:
+        return set()
+    names = model.names
+    names = names.values() if isinstance(names, dict) else names
+    return {name.lower().replace(' ', '_') for name in names}
+
+def compare_model_classes(current_model, new_model, food_database):
+    """
+    Check a new model's classes against the catalog and the current model
+    TR: Yeni modelin sınıflarını katalog ve mevcut modelle karşılaştırır.
+    lost_catalog_classes: mevcut modelin tanıdığı, katalogda satılan ama yeni modelin tanımadığı yemekler.
+    """
+    new_classes = model_class_names(new_model)
+    catalog = set(food_database)
+    return {
+        'classes': len(new_classes),
+        'not_in_catalog': sorted(new_classes - catalog - set(UTENSIL_CLASSES)),
+        'catalog_not_detected': sorted(catalog - new_classes),
+        'lost_catalog_classes': sorted((model_class_names(current_model) & catalog) - new_classes)
+    }
+
+def load_and_warm_up(model_path):
+    """Modeli yükle ve boş bir görüntüyle bir kez çalıştır (ilk isteğin ısınma gecikmesini önler)"""
+    model = load_yolo_model(model_path)
+    if model is None:
+        raise ValueError(f"Model yüklenemedi: {model_path}")
+    predict_with_yolo(model, np.zeros((DEFAULT_IMAGE_SIZE, DEFAULT_IMAGE_SIZE, 3), dtype=np.uint8))
+    return model
+
+def release_memory():
+    """Serbest kalan modelin belleğini geri ver (GPU varsa önbelleği de boşalt)"""
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        # Stub backend torch olmadan da çalışır
+        pass
+
+async def reload_model(holder, model_path, food_database, force=False, release_timeout=MODEL_RELEASE_TIMEOUT):
+    """
+    Load, warm up and validate a model in the background, then swap it in
+    TR: Yeni modeli event loop dışında yükler ve ısıtır, sınıflarını katalogla doğrular, sonra etkinleştirir.
+    Eski model, onu kullanan son istek bitince serbest bırakılır. Katalogdaki bir yemeği artık
+    tanımayan model force verilmedikçe reddedilir (ValueError).
+    """
+    loop = asyncio.get_running_loop()
+    new_model = await loop.run_in_executor(None, load_and_warm_up, model_path)
+
+    classes = compare_model_classes(holder.model, new_model, food_database)
+    if classes['lost_catalog_classes'] and not force:
+        new_model = None
+        release_memory()
+        raise ValueError(
+            "Yeni model katalogdaki şu yemekleri tanımıyor: " + ", ".join(classes['lost_catalog_classes'])
+        )
+
+    # Eski modele sadece zayıf referans tutulur; süren istekler bitince toplanır
+    previous = weakref.ref(holder.swap(new_model, model_path))
+    new_model = None
+
+    deadline = time.monotonic() + release_timeout
+    while previous() is not None and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+        gc.collect()
+    released = previous() is None
+    release_memory()
+
+    return {'classes': classes, 'previous_released': released}
@@ -0,0 +1,76 @@
+import time
+from YOLO_SERVER.config import (
+    PACER_TARGET_UTILIZATION, PACER_EWMA_ALPHA, PACER_MIN_DELAY_MS, PACER_MAX_DELAY_MS,
+    PACER_STATION_TIMEOUT, WEBCAM_RATE_LIMIT_FPS
+)
+
+PACER_STAGES = ('queue', 'decode', 'inference_wait', 'service', 'total')
+
+class FramePacer:
+    """
+    Recommend the next realtime frame delay for each station
+    TR: Her webcam yanıtına eklenecek "sonraki kare gecikmesi"ni hesaplar.
+    Aşama gecikmelerinin EWMA'sı ve kuyruk derinliğinden, aktif istasyon sayısı ne olursa
+    olsun çıkarım kullanımını PACER_TARGET_UTILIZATION civarında tutacak gecikme seçilir:
+        istasyon başına periyot = istasyon * servis süresi / (slot * hedef kullanım)
+        gecikme = periyot - uçtan uca gecikme + kuyruğun boşalma süresi
+    """
+
+    def __init__(self, target_utilization=PACER_TARGET_UTILIZATION, alpha=PACER_EWMA_ALPHA,
+                 min_delay_ms=PACER_MIN_DELAY_MS, max_delay_ms=PACER_MAX_DELAY_MS,
+                 station_timeout=PACER_STATION_TIMEOUT, rate_limit_fps=WEBCAM_RATE_LIMIT_FPS):
+        self.target_utilization = target_utilization
+        self.alpha = alpha
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.station_timeout = station_timeout
+        # Kabul kontrolünün token bucket'ı bu aralıktan sık kareleri reddeder
+        self.min_interval_ms = 1000.0 / rate_limit_fps if rate_limit_fps else 0.0
+        self.ewma = {}
+        self.stations = {}
+        self.last_delay_ms = None
+
+    def observe(self, client_key, stages):
+        """Bir karenin aşama sürelerini (s) kaydet"""
+        now = time.monotonic()
+        self.stations[client_key] = now
+        for stage, seconds in stages.items():
+            previous = self.ewma.get(stage)
+            self.ewma[stage] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def active_stations(self):
+        """Son PACER_STATION_TIMEOUT saniyede kare gönderen istemci sayısı"""
+        cutoff = time.monotonic() - self.station_timeout
+        for client_key in [key for key, seen in self.stations.items() if seen < cutoff]:
+            del self.stations[client_key]
+        return max(1, len(self.stations))
+
+    def next_delay_ms(self, inference_slots, queue_depth):
+        """Önerilen sonraki kare gecikmesi (ms); henüz ölçüm yoksa en kısa aralık"""
+        service = self.ewma.get('service')
+        latency = self.ewma.get('total', 0.0)
+        if service is None:
+            delay_ms = self.min_interval_ms
+        else:
+            slots = max(1, inference_slots)
+            period = self.active_stations() * service / (slots * self.target_utilization)
+            backlog = queue_depth * service / slots
+            delay_ms = (period - latency + backlog) * 1000.0
+            delay_ms = max(delay_ms, self.min_interval_ms - latency * 1000.0)
+        delay_ms = int(round(min(self.max_delay_ms, max(self.min_delay_ms, delay_ms))))
+        self.last_delay_ms = delay_ms
+        return delay_ms
+
+    def forget_client(self, client_key):
+        self.stations.pop(client_key, None)
+
+    def metrics(self):
+        return {
+            'stations': len(self.stations),
+            'stage_ms': {stage: round(self.ewma[stage] * 1000.0, 2) for stage in PACER_STAGES if stage in self.ewma},
+            'last_delay_ms': self.last_delay_ms,
+            'target_utilization': self.target_utilization
+        }
+
+# Süreç genelinde tek pacer
+FRAME_PACER = FramePacer()
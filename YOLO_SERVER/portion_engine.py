@@ -0,0 +1,193 @@
+import math
+import threading
+from typing import NamedTuple
+import numpy as np
+from YOLO_SERVER.config import DEFAULT_FOOD_HEIGHT_CM, DEFAULT_FOOD_DENSITY, DEFAULT_PORTION_MASS
+
+# Yükseklik çarpanı modları
+HEIGHT_CONSTANT = 0     # m = base
+HEIGHT_CIRCULARITY = 1  # m = base + dairesellik * gain
+HEIGHT_DIAMETER = 2     # m = base + min(eşdeğer çap / ref, cap) * gain
+HEIGHT_AREA = 3         # m = base + min(alan / ref, cap) * gain
+HEIGHT_DEPTH = 4        # Sıvılar: tabak çapına göre basamaklı derinlik (LIQUID_DEPTH_TIERS), küçük kasede base
+
+# Hacim modları
+VOLUME_PRISM = 0        # alan * yükseklik * factor
+VOLUME_DOME = 1         # Yarım elipsoid: (2/3) * π * r * r * yükseklik
+VOLUME_IRREGULAR = 2    # Daire benzeriyse yarım küre, değilse alan * yükseklik * factor
+
+LIQUID_DEPTH_TIERS = ((8, 0.6), (5, 0.8))  # (eşdeğer çap eşiği cm, çarpan): büyük tabak daha sığ
+IRREGULAR_DOME_CIRCULARITY = 0.7
+HEIGHT_MULTIPLIER_RANGE = (0.4, 1.8)
+MIN_VOLUME_CM3 = 0.1
+
+class PortionStrategy(NamedTuple):
+    """Bir yemek kategorisinin yükseklik ve hacim parametreleri"""
+    height_mode: int = HEIGHT_CONSTANT
+    height_base: float = 1.0
+    height_gain: float = 0.0
+    height_ref: float = 1.0
+    height_cap: float = 0.0
+    volume_mode: int = VOLUME_PRISM
+    volume_factor: float = 1.0
+
+# foods.food_category değerleri -> strateji
+CATEGORY_STRATEGIES = {
+    'liquid': PortionStrategy(HEIGHT_DEPTH, 1.3),
+    'flat': PortionStrategy(HEIGHT_CIRCULARITY, 0.5, 0.3, volume_factor=0.85),
+    'dome': PortionStrategy(HEIGHT_DIAMETER, 0.9, 0.4, 8, 1.5, VOLUME_DOME),
+    'irregular': PortionStrategy(HEIGHT_CONSTANT, 1.0, volume_mode=VOLUME_IRREGULAR, volume_factor=0.75),
+    'default': PortionStrategy(),
+}
+CATEGORY_ALIASES = {'sivi': 'liquid', 'duz': 'flat', 'kubbe': 'dome', 'duzensiz': 'irregular'}
+
+# foods.volume_method değerleri (yönetim formundaki seçenekler) -> (hacim modu, faktör)
+VOLUME_METHODS = {
+    'cylinder': (VOLUME_PRISM, 1.0),
+    'box': (VOLUME_PRISM, 1.0),
+    'sphere': (VOLUME_DOME, 1.0),
+}
+
+# food_category girilmemiş yemekler için eski isim listeleri
+LEGACY_FOOD_CATEGORIES = {
+    'corba': 'liquid',
+    'makarna': 'flat', 'tavuk_kul_basti': 'flat', 'cig_kofte': 'flat', 'salata': 'flat',
+    'pirinc_pilav': 'dome', 'bulgur_pilav': 'dome',
+    'tavuk_but': 'irregular', 'tavuk_sote': 'irregular', 'kuru_fasulye': 'irregular',
+}
+# Kategorisinin genel parametrelerinden ayrılan yemekler
+FOOD_STRATEGY_OVERRIDES = {
+    'makarna': CATEGORY_STRATEGIES['flat']._replace(height_base=0.6, height_gain=0.4),
+    'salata': CATEGORY_STRATEGIES['flat']._replace(height_base=0.8),
+    'tavuk_but': CATEGORY_STRATEGIES['irregular']._replace(
+        height_mode=HEIGHT_AREA, height_base=1.1, height_gain=1.0, height_ref=20, height_cap=0.5),
+    'kuru_fasulye': CATEGORY_STRATEGIES['irregular']._replace(
+        height_mode=HEIGHT_CIRCULARITY, height_base=0.8, height_gain=0.3),
+}
+
+def _normalize(value):
+    if not value:
+        return None
+    value = str(value).strip().lower()
+    return CATEGORY_ALIASES.get(value, value)
+
+def compile_strategy(food_id, food_info):
+    """
+    Resolve the portion strategy of one catalog food
+    TR: Yemeğin stratejisini food_category / volume_method sütunlarından çıkarır.
+    Kategori girilmemişse eski isim listeleri kullanılır (volume_method da yok sayılır),
+    böylece mevcut yemeklerin sonuçları değişmez.
+    """
+    category = _normalize(food_info.get('food_category'))
+    legacy_category = LEGACY_FOOD_CATEGORIES.get(food_id)
+
+    if category not in CATEGORY_STRATEGIES:
+        if legacy_category is None:
+            return CATEGORY_STRATEGIES['default']
+        return FOOD_STRATEGY_OVERRIDES.get(food_id, CATEGORY_STRATEGIES[legacy_category])
+
+    if category == legacy_category:
+        strategy = FOOD_STRATEGY_OVERRIDES.get(food_id, CATEGORY_STRATEGIES[category])
+    else:
+        strategy = CATEGORY_STRATEGIES[category]
+
+    volume_method = VOLUME_METHODS.get(_normalize(food_info.get('volume_method')))
+    if volume_method is not None:
+        strategy = strategy._replace(volume_mode=volume_method[0], volume_factor=volume_method[1])
+    return strategy
+
+def _value_or_default(food_info, key, default):
+    value = food_info.get(key)
+    return default if value is None else value
+
+class PortionEngine:
+    """
+    Vectorized portion estimation for all detections of a frame
+    TR: Bir karedeki tüm yemeklerin yükseklik, hacim, kütle ve porsiyonunu NumPy ile tek seferde hesaplar.
+    Stratejiler katalog yüklenirken bir kez derlenir; sonuçlar utils.estimate_dynamic_height /
+    compute_advanced_volume / compute_portion / round_to_nearest_portion ile birebir aynıdır.
+    """
+
+    def __init__(self, food_database):
+        self.food_database = food_database
+        self.strategies = {}
+
+    def strategy_for(self, food_id, food_info):
+        strategy = self.strategies.get(food_id)
+        if strategy is None:
+            strategy = compile_strategy(food_id, food_info)
+            self.strategies[food_id] = strategy
+        return strategy
+
+    def estimate(self, items, scale_factor):
+        """
+        items: (normalize edilmiş sınıf, food_info, geometri) listesi (geometri: analyze_segment_geometry çıktısı)
+        Dönüş: 'real_area', 'base_height', 'height', 'volume', 'mass', 'raw_portion', 'portion' dizileri
+        """
+        # Satır başına: strateji parametreleri + geometri + yemek özellikleri, tek diziye toplanır
+        rows = [
+            self.strategy_for(food_id, food_info) + (
+                geometry['area'], geometry['circularity'],
+                _value_or_default(food_info, 'base_height_cm', DEFAULT_FOOD_HEIGHT_CM),
+                _value_or_default(food_info, 'density_g_per_cm3', DEFAULT_FOOD_DENSITY),
+                _value_or_default(food_info, 'reference_mass_g', DEFAULT_PORTION_MASS)
+            )
+            for food_id, food_info, geometry in items
+        ]
+        (height_mode, base, gain, ref, cap, volume_mode, volume_factor,
+         area_px, circularity, base_height, density, std_mass) = np.array(rows, dtype=np.float64).T
+
+        real_area = area_px * scale_factor
+        radius = np.sqrt(real_area / math.pi)
+        diameter = radius * 2
+
+        # Yükseklik çarpanı
+        depth = base.copy()
+        for threshold, tier_multiplier in reversed(LIQUID_DEPTH_TIERS):
+            depth = np.where(diameter > threshold, tier_multiplier, depth)
+        ratio_source = np.where(height_mode == HEIGHT_AREA, real_area, diameter)
+        multiplier = np.where(height_mode == HEIGHT_CIRCULARITY, base + (circularity * gain),
+                     np.where((height_mode == HEIGHT_DIAMETER) | (height_mode == HEIGHT_AREA),
+                              base + (np.minimum(ratio_source / ref, cap) * gain),
+                              np.where(height_mode == HEIGHT_DEPTH, depth, base)))
+        low, high = HEIGHT_MULTIPLIER_RANGE
+        multiplier = np.maximum(low, np.minimum(high, multiplier))
+        height = base_height * multiplier
+
+        # Hacim
+        dome_volume = (2/3) * math.pi * radius * radius * height
+        prism_volume = real_area * height * volume_factor
+        # float_power, Python'daki radius ** 2 (C pow) ile aynı sonucu verir; numpy ** 2 ise r * r hesaplar
+        hemisphere_volume = (2/3) * math.pi * np.float_power(radius, 2) * height
+        volume = np.where(volume_mode == VOLUME_DOME, dome_volume,
+                          np.where((volume_mode == VOLUME_IRREGULAR) & (circularity > IRREGULAR_DOME_CIRCULARITY),
+                                   hemisphere_volume, prism_volume))
+        volume = np.maximum(volume, MIN_VOLUME_CM3)
+
+        # Kütle ve porsiyon (standart kütle <= 0 ise 1 porsiyon)
+        mass = volume * density
+        positive = std_mass > 0
+        raw_portion = np.divide(mass, std_mass, out=np.ones_like(mass), where=positive)
+        portion = np.where(raw_portion < 0.3, 0.5,
+                           np.where(raw_portion > 3.0, 3.0, np.round(raw_portion * 2) / 2))
+
+        return {
+            'real_area': real_area,
+            'base_height': base_height,
+            'height': height,
+            'volume': volume,
+            'mass': mass,
+            'raw_portion': raw_portion,
+            'portion': portion
+        }
+
+# Katalog sözlüğü -> motor (katalog her senkronda yeni sözlük olur, stratejiler yeniden derlenir)
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_portion_engine(food_database):
+    global _engine
+    with _engine_lock:
+        if _engine is None or _engine.food_database is not food_database:
+            _engine = PortionEngine(food_database)
+        return _engine
@@ -0,0 +1,115 @@
+import json
+import asyncio
+import hashlib
+from collections import OrderedDict
+from YOLO_SERVER.config import RESULT_CACHE_MAX_BYTES
+
+def result_cache_key(image_data, config, generation):
+    """
+    Content address of an image request
+    TR: Görüntü verisinin özeti + sonucu etkileyen ayarlar + nesil (katalog ve model sürümü).
+    base64 metni özetlenir (aynı baytlar aynı metni verir), böylece anahtar için çözme gerekmez.
+    """
+    digest = hashlib.blake2b(image_data.encode('ascii', 'replace'), digest_size=16).hexdigest()
+    effective_config = json.dumps({
+        'confidence': config.get('confidence', 0.5),
+        'classes': config.get('classes'),
+        'portions': config.get('enablePortionCalculation', True),
+        'camera_id': config.get('cameraId'),
+        'source_size': config.get('sourceSize')
+    }, sort_keys=True)
+    return digest, effective_config, generation
+
+class ResultCache:
+    """
+    Memory-bounded LRU of serialized image responses
+    TR: Aynı görüntünün tekrar gönderilmesi (yeniden bağlanma sonrası tekrar deneme, çift tıklama)
+    çözme ve çıkarım yapılmadan yanıtlanır. Yanıtlar JSON metni olarak saklanır, boyut sınırı bayt cinsindendir.
+    Aynı anahtar işlenirken gelen istek, ilk isteğin sonucunu bekler.
+    Sadece event loop'tan kullanılır, kilit gerekmez.
+    """
+
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.size_bytes = 0
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def get(self, key):
+        """Saklanan yanıt metni (yoksa None)"""
+        text = self.entries.get(key)
+        if text is None:
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    async def wait_pending(self, key):
+        """Aynı anahtar işleniyorsa sonucunu bekle (sonuç saklanmadıysa None)"""
+        future = self.pending.get(key)
+        if future is None:
+            return None
+        text = await asyncio.shield(future)
+        if text is not None:
+            self.coalesced += 1
+        return text
+
+    def begin(self, key):
+        """Anahtarı işleniyor olarak işaretle (önbellekte yok)"""
+        self.misses += 1
+        if key not in self.pending:
+            self.pending[key] = asyncio.get_running_loop().create_future()
+
+    def end(self, key, text=None):
+        """İşlem bitti: başarılı yanıtı sakla ve bekleyenleri uyandır (text None ise kendileri işler)"""
+        future = self.pending.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(text)
+        if text is None or key[2] != self.generation or len(text) > self.max_bytes:
+            return
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size_bytes -= len(previous)
+        self.entries[key] = text
+        self.size_bytes += len(text)
+        while self.size_bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size_bytes -= len(evicted)
+            self.evictions += 1
+
+    def set_generation(self, generation):
+        """Katalog veya model değiştiyse eski nesille hesaplanmış tüm yanıtları at"""
+        if generation == self.generation:
+            return
+        self.generation = generation
+        if self.entries:
+            self.invalidations += 1
+        self.entries.clear()
+        self.size_bytes = 0
+
+    def metrics(self):
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            'entries': len(self.entries),
+            'size_bytes': self.size_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'coalesced': self.coalesced,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
+
+# Süreç genelinde tek önbellek
+RESULT_CACHE = ResultCache()
@@ -0,0 +1,206 @@
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from YOLO_SERVER.config import SCHEDULER_CLASSES, INFERENCE_CONCURRENCY
+
+# Trafik sınıfları (öncelik sırası config.SCHEDULER_CLASSES içinde)
+CHECKOUT = 'checkout'
+ADMIN = 'admin'
+BATCH = 'batch'
+REALTIME = 'realtime'
+
+# Mesaj türü -> trafik sınıfı
+MESSAGE_CLASSES = {
+    'image': CHECKOUT,
+    'refilter': CHECKOUT,
+    'webcam': REALTIME,
+    'image_batch': BATCH,
+}
+
+# Kuyruk süresi yüzdelikleri için saklanan son örnek sayısı
+QUEUE_TIME_SAMPLES = 1000
+
+class RequestDropped(Exception):
+    """Düşürülebilir istek daha yeni bir istek yüzünden kuyruktan atıldı"""
+    pass
+
+class QueueFullError(Exception):
+    """Sınıf kuyruğu dolu"""
+    pass
+
+def classify_message(message_type):
+    """Mesaj türünün trafik sınıfı (bilinmeyen/admin işlemleri admin sınıfındadır)"""
+    return MESSAGE_CLASSES.get(message_type, ADMIN)
+
+def _percentiles_ms(samples):
+    """Süre örneklerinin p50/p99/max değerleri (ms)"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 2)
+
+    return {'p50': percentile(0.50), 'p99': percentile(0.99), 'max': round(ordered[-1] * 1000, 2)}
+
+class _PriorityGate:
+    """
+    Priority-ordered counting gate with per-class queues
+    TR: Sınıf başına kuyruklu, öncelik sıralı sayaçlı kapı.
+    Yüksek öncelikli sınıfta bekleyen varken düşük öncelikli sınıf başlayamaz.
+    """
+
+    def __init__(self, priorities, capacity=None, class_limits=None):
+        self.order = sorted(priorities, key=lambda name: priorities[name])
+        self.priorities = priorities
+        self.capacity = capacity
+        self.class_limits = class_limits or {}
+        self.running = {name: 0 for name in priorities}
+        self.waiters = {name: deque() for name in priorities}
+
+    def _has_capacity(self, traffic_class):
+        if self.capacity is not None and sum(self.running.values()) >= self.capacity:
+            return False
+        limit = self.class_limits.get(traffic_class)
+        return limit is None or self.running[traffic_class] < limit
+
+    def _higher_priority_waiting(self, traffic_class):
+        if self.capacity is None:
+            # Paylaşılan kapasite yoksa sınıflar birbirini beklemez, sadece kendi FIFO sırası
+            return bool(self.waiters[traffic_class])
+        priority = self.priorities[traffic_class]
+        return any(
+            self.waiters[name] for name in self.order
+            if self.priorities[name] <= priority
+        )
+
+    async def acquire(self, traffic_class, max_queue=None, droppable=False):
+        if self._has_capacity(traffic_class) and not self._higher_priority_waiting(traffic_class):
+            self.running[traffic_class] += 1
+            return
+
+        queue = self.waiters[traffic_class]
+        if max_queue is not None and len(queue) >= max_queue:
+            if not droppable:
+                raise QueueFullError(f"{traffic_class} kuyruğu dolu")
+            # Düşürülebilir trafikte en eski bekleyeni at (en yeni kare daha değerli)
+            oldest = queue.popleft()
+            if not oldest.done():
+                oldest.set_exception(RequestDropped(f"{traffic_class} isteği daha yeni bir istekle değiştirildi"))
+
+        future = asyncio.get_running_loop().create_future()
+        queue.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future in queue:
+                queue.remove(future)
+            elif future.done() and not future.cancelled() and future.exception() is None:
+                # Slot verilmişti ama kullanılmadı, geri bırak
+                self.release(traffic_class)
+            raise
+
+    def release(self, traffic_class):
+        self.running[traffic_class] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        for name in self.order:
+            queue = self.waiters[name]
+            while queue and self._has_capacity(name):
+                future = queue.popleft()
+                if future.done():
+                    continue
+                self.running[name] += 1
+                future.set_result(None)
+            if queue and self.capacity is not None:
+                # Bu sınıf hâlâ bekliyor, düşük öncelikliler paylaşılan kapasitede sıra atlamasın
+                return
+
+class PriorityScheduler:
+    """
+    Central scheduler separating checkout, admin and realtime traffic
+    TR: Ödeme, admin ve gerçek zamanlı trafiği ayıran merkezi zamanlayıcı.
+    slot(): sınıf başına eşzamanlılık limiti ve öncelikli kuyruk
+    inference(): model erişimi için paylaşılan, öncelik sıralı çıkarım slotları
+    """
+
+    def __init__(self, classes=SCHEDULER_CLASSES, inference_slots=INFERENCE_CONCURRENCY):
+        self.classes = classes
+        priorities = {name: spec['priority'] for name, spec in classes.items()}
+        self.gate = _PriorityGate(
+            priorities,
+            class_limits={name: spec['concurrency'] for name, spec in classes.items()}
+        )
+        self.inference_gate = _PriorityGate(priorities, capacity=inference_slots)
+        self.stats = {
+            name: {
+                'submitted': 0,
+                'completed': 0,
+                'dropped': 0,
+                'rejected': 0,
+                'queue_times': deque(maxlen=QUEUE_TIME_SAMPLES),
+                'inference_waits': deque(maxlen=QUEUE_TIME_SAMPLES)
+            }
+            for name in classes
+        }
+
+    def set_inference_slots(self, slots):
+        """Eşzamanlı model çağrısı sayısını ayarla (ör. çıkarım süreci sayısı)"""
+        self.inference_gate.capacity = max(1, int(slots))
+
+    def queue_depth(self, traffic_class=None):
+        """Bekleyen istek sayısı (sınıf verilmezse toplam)"""
+        names = [traffic_class] if traffic_class else self.classes
+        return sum(len(self.gate.waiters[name]) + len(self.inference_gate.waiters[name]) for name in names)
+
+    @asynccontextmanager
+    async def slot(self, traffic_class):
+        spec = self.classes[traffic_class]
+        stats = self.stats[traffic_class]
+        stats['submitted'] += 1
+        queued_at = time.perf_counter()
+        try:
+            await self.gate.acquire(traffic_class, spec.get('max_queue'), spec.get('droppable', False))
+        except RequestDropped:
+            stats['dropped'] += 1
+            raise
+        except QueueFullError:
+            stats['rejected'] += 1
+            raise
+        stats['queue_times'].append(time.perf_counter() - queued_at)
+        try:
+            yield
+        finally:
+            stats['completed'] += 1
+            self.gate.release(traffic_class)
+
+    @asynccontextmanager
+    async def inference(self, traffic_class):
+        queued_at = time.perf_counter()
+        await self.inference_gate.acquire(traffic_class)
+        self.stats[traffic_class]['inference_waits'].append(time.perf_counter() - queued_at)
+        try:
+            yield
+        finally:
+            self.inference_gate.release(traffic_class)
+
+    def metrics(self):
+        """Sınıf başına sayaçlar ve kuyruk süresi yüzdelikleri (ms)"""
+        result = {}
+        for name, stats in self.stats.items():
+            result[name] = {
+                'submitted': stats['submitted'],
+                'completed': stats['completed'],
+                'dropped': stats['dropped'],
+                'rejected': stats['rejected'],
+                'running': self.gate.running[name],
+                'queued': self.queue_depth(name),
+                'queue_time_ms': _percentiles_ms(stats['queue_times']),
+                'inference_wait_ms': _percentiles_ms(stats['inference_waits'])
+            }
+        return result
+
+# Süreç genelinde tek zamanlayıcı
+SCHEDULER = PriorityScheduler()
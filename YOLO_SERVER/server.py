@@ -1,277 +1,1003 @@
 import json
+import time
+import signal
+import asyncio
 import websockets
-from YOLO_SERVER.utils import base64_to_image, load_food_database
-from YOLO_SERVER.food_processing import process_image
-from YOLO_SERVER.config import HOST, PORT
-from YOLO_SERVER.database import (
-    get_database_manager, get_database_stats,
-    add_new_food, update_existing_food, delete_existing_food,
-    search_foods
+from concurrent.futures import ThreadPoolExecutor
+from YOLO_SERVER.utils import base64_to_inference_image, apply_source_size, load_food_database
+from YOLO_SERVER.food_processing import process_image, process_image_batch, summarize_detections, process_cascaded_frame
+from YOLO_SERVER.model import load_detector_cascade
+from YOLO_SERVER.inference_pool import RingFullError, InferenceUnavailableError
+from YOLO_SERVER.scheduler import SCHEDULER, classify_message, RequestDropped, QueueFullError
+from YOLO_SERVER.broadcast import CATALOG_BROADCASTER
+from YOLO_SERVER.catalog_stats import CatalogStats
+from YOLO_SERVER.catalog_io import ImportFormatError, parse_foods_json, parse_foods_csv, foods_to_csv
+from YOLO_SERVER.admission import ADMISSION, ADMISSION_CONTROLLED_TYPES, Rejection, peek_message_fields
+from YOLO_SERVER.pacing import FRAME_PACER
+from YOLO_SERVER.detection_cache import DETECTION_CACHE
+from YOLO_SERVER.result_cache import RESULT_CACHE, result_cache_key
+from YOLO_SERVER.model_reload import ModelHolder, reload_model
+from YOLO_SERVER.lifecycle import LIFECYCLE, start_health_server
+from YOLO_SERVER.calibration import attach_async_store
+from YOLO_SERVER.config import (
+    HOST, PORT, BATCH_MAX_IMAGES, BATCH_MAX_BYTES, DECODE_WORKERS, CATALOG_POLL_INTERVAL, ADMISSION_RETRY_AFTER_MS,
+    CATALOG_BROADCAST_QUEUE_SIZE, IMPORT_MAX_FOODS, SCHEDULER_CLASSES, WEBCAM_RATE_LIMIT_FPS,
+    CAPTURE_MAX_DIMENSION, CAPTURE_ENCODING, CAPTURE_JPEG_QUALITY, CAPTURE_JPEG_QUALITY_BUSY, CAPTURE_BUSY_LOAD,
+    DETECTION_CACHE_FLOOR_CONFIDENCE, DETECTION_CACHE_MAX_ENTRIES, MODEL_PATH,
+    DRAIN_TIMEOUT, DRAIN_RETRY_AFTER_MS, HEALTH_HOST, HEALTH_PORT, CASCADE_DETECTOR_PATH,
+    ADMISSION_MAX_MESSAGE_BYTES, WEBSOCKET_MAX_MESSAGE_BYTES
 )
+from YOLO_SERVER.database import get_async_database_manager, CatalogChangeWatcher
+
+# Admin CRUD ve istatistikler için event loop'u bloklamayan veritabanı erişimi
+DB = get_async_database_manager()
 
 # Load food database from SQLite only
 try:
+    # Sürüm yüklemeden önce okunur; arada yapılan değişiklikler ilk senkronizasyonda gelir
+    CATALOG_VERSION = DB.manager.get_catalog_version()
     FOOD_DATABASE = load_food_database()
 except Exception as e:
     print(f"❌ Veritabanı yükleme hatası: {e}")
     raise
 
-async def websocket_handler(websocket, model):
+# Sunulan model (reload_model ile sunucu durmadan değiştirilebilir)
+MODEL_HOLDER = ModelHolder()
+
+# Bağlantıdan bağımsız arka plan görevleri (model yükleme)
+BACKGROUND_TASKS = set()
+
+# Webcam kareleri için iki aşamalı kaskad (CASCADE_DETECTOR_PATH verilirse sunucu başlarken yüklenir)
+REALTIME_CASCADE = None
+
+def cache_generation():
+    """Önbellekteki yanıtların geçerli olduğu katalog ve model sürümü"""
+    return CATALOG_VERSION, MODEL_HOLDER.version
+
+RESULT_CACHE.set_generation(cache_generation())
+
+# get_stats için artımlı istatistikler (FOOD_DATABASE ile aynı değişikliklerle güncellenir)
+CATALOG_STATS = CatalogStats(FOOD_DATABASE)
+
+# FOOD_DATABASE'i aynı anda iki görevin güncellemesini engeller
+CATALOG_SYNC_LOCK = asyncio.Lock()
+
+# Toplu mesajlarda base64/JPEG çözme için iş parçacığı havuzu (cv2.imdecode GIL'i bırakır)
+DECODE_EXECUTOR = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix="decode")
+
+def capture_profile():
+    """
+    Frame capture profile advertised to clients
+    TR: İstemcilerin kareleri kodlarken uyacağı profil: çıkarım boyutundan büyük kare göndermek
+    sadece yükleme ve çözme süresini artırır. Sunucu yüklüyken kalite düşer ve kare aralığı uzar.
+    """
+    load = min(1.0, max(
+        ADMISSION.inflight / ADMISSION.max_inflight,
+        SCHEDULER.queue_depth('realtime') / SCHEDULER_CLASSES['realtime']['max_queue']
+    ))
+    return {
+        'max_dimension': CAPTURE_MAX_DIMENSION,
+        'encoding': CAPTURE_ENCODING,
+        'jpeg_quality': CAPTURE_JPEG_QUALITY_BUSY if load >= CAPTURE_BUSY_LOAD else CAPTURE_JPEG_QUALITY,
+        'min_frame_interval_ms': int(round(1000 / WEBCAM_RATE_LIMIT_FPS * (1 + load)))
+    }
+
+async def handle_image_batch(websocket, model, data, traffic_class):
+    """
+    Decode a batch of images in parallel, stream each result back, then send a summary
+    TR: Görüntü listesini paralel çözer, her sonucu hazır olur olmaz gönderir, sonunda özet yollar.
+    """
+    batch_start = time.time()
+    batch_id = data.get('batch_id')
+    images = data.get('images')
+    
+    if not isinstance(images, list) or not images:
+        await websocket.send(json.dumps({
+            'success': False,
+            'type': 'batch_summary',
+            'batch_id': batch_id,
+            'error': 'Görüntü listesi bulunamadı'
+        }))
+        return
+    
+    if len(images) > BATCH_MAX_IMAGES:
+        await websocket.send(json.dumps({
+            'success': False,
+            'type': 'batch_summary',
+            'batch_id': batch_id,
+            'error': f'Tek mesajda en fazla {BATCH_MAX_IMAGES} görüntü gönderilebilir'
+        }))
+        return
+    
+    # Görüntü sayısı gibi toplam boyut da sınırlı; büyük görüntüler birkaç batch'e bölünmeli
+    total_bytes = sum(len(item.get('data') or '') for item in images if isinstance(item, dict))
+    if total_bytes > BATCH_MAX_BYTES:
+        await websocket.send(json.dumps({
+            'success': False,
+            'type': 'batch_summary',
+            'batch_id': batch_id,
+            'error': f'Batch görüntü verisi {BATCH_MAX_BYTES // (1024 * 1024)} MB sınırını aşıyor, daha küçük batch\'ler gönderin'
+        }))
+        return
+    
+    # Konfigürasyon parametrelerini al
+    config = data.get('config', {})
+    confidence = config.get('confidence', 0.5)
+    classes = config.get('classes', None)
+    enable_portion_calculation = config.get('enablePortionCalculation', True)
+    camera_id = config.get('cameraId')
+    
+    # Her görüntünün kimliği (verilmemişse sırası)
+    image_ids = [item.get('id', index) if isinstance(item, dict) else index for index, item in enumerate(images)]
+    
+    def safe_decode(item):
+        try:
+            return base64_to_inference_image(item['data'])
+        except Exception:
+            return None, None
+    
+    # Görüntüleri paralel çöz
+    loop = asyncio.get_running_loop()
+    decoded = await asyncio.gather(*(
+        loop.run_in_executor(DECODE_EXECUTOR, safe_decode, item if isinstance(item, dict) else {})
+        for item in images
+    ))
+    
+    succeeded = 0
+    failed = 0
+    total_price = 0
+    total_calories = 0
+    
+    # Çözülemeyen görüntüler için hemen hata gönder
+    valid_indices = []
+    for index, (img, _) in enumerate(decoded):
+        if img is None:
+            failed += 1
+            await websocket.send(json.dumps({
+                'success': False,
+                'type': 'batch_result',
+                'batch_id': batch_id,
+                'image_id': image_ids[index],
+                'error': 'Görüntü dönüştürülemedi'
+            }))
+        else:
+            valid_indices.append(index)
+    
+    valid_images = [decoded[index][0] for index in valid_indices]
+    coordinate_scales = [decoded[index][1] for index in valid_indices]
+    
+    # Her sonucu hazır olur olmaz gönder
+    async for position, result in process_image_batch(
+        model, valid_images, FOOD_DATABASE, confidence, classes, enable_portion_calculation,
+        inference_slot=lambda: SCHEDULER.inference(traffic_class), camera_id=camera_id,
+        coordinate_scales=coordinate_scales
+    ):
+        if result.get('success'):
+            succeeded += 1
+            total_price += result['total_price']
+            total_calories += result['total_calories']
+        else:
+            failed += 1
+        
+        await websocket.send(json.dumps({
+            **result,
+            'type': 'batch_result',
+            'batch_id': batch_id,
+            'image_id': image_ids[valid_indices[position]]
+        }))
+    
+    await websocket.send(json.dumps({
+        'success': True,
+        'type': 'batch_summary',
+        'batch_id': batch_id,
+        'count': len(images),
+        'succeeded': succeeded,
+        'failed': failed,
+        'total_price': round(total_price, 2),
+        'total_calories': total_calories,
+        'processing_time': time.time() - batch_start
+    }))
+
+class ReplyChannel:
+    """
+    websocket.send sarmalayıcı: istemci request_id gönderdiyse her yanıta ekler.
+    Mesajlar artık paralel işlendiği için yanıtlar gönderim sırasıyla gelmeyebilir.
+    """
+    
+    def __init__(self, websocket, request_id=None):
+        self.websocket = websocket
+        self.remote_address = websocket.remote_address
+        self.prefix = None
+        if request_id is not None:
+            self.prefix = '{"request_id": ' + json.dumps(request_id)
+    
+    async def send(self, message):
+        # JSON nesnesinin başına alan ekle (yanıtı yeniden ayrıştırmadan)
+        if self.prefix is not None and message.startswith('{'):
+            rest = message[1:]
+            message = self.prefix + (', ' + rest if rest.strip() != '}' else '}')
+        await self.websocket.send(message)
+
+async def sync_food_database():
+    """
+    Apply catalog changes since CATALOG_VERSION to FOOD_DATABASE
+    TR: Son senkronizasyondan bu yana değişen/silinen yemekleri FOOD_DATABASE'e uygular
+    (tüm kataloğu yeniden yüklemeden). Uygulanan değişiklikleri döndürür.
+    """
+    global FOOD_DATABASE, CATALOG_VERSION
+    
+    async with CATALOG_SYNC_LOCK:
+        delta = await DB.get_changes_since(CATALOG_VERSION)
+        if delta['changed'] or delta['deleted']:
+            # Çıkarım iş parçacıkları eski sözlüğü okuyabilir, yerinde değiştirme yerine kopyala
+            foods = dict(FOOD_DATABASE)
+            foods.update(delta['changed'])
+            for food_id in delta['deleted']:
+                foods.pop(food_id, None)
+            FOOD_DATABASE = foods
+            CATALOG_STATS.apply(delta['changed'], delta['deleted'])
+        CATALOG_VERSION = max(CATALOG_VERSION, delta['version'])
+        RESULT_CACHE.set_generation(cache_generation())
+        return delta
+
+def publish_catalog_delta(delta, origin=None, origin_food_id=None):
+    """Değişiklikleri abonelere yayınla; isteği yapan istemci kendi değişikliğini tekrar almaz"""
+    if len(delta['changed']) + len(delta['deleted']) > CATALOG_BROADCAST_QUEUE_SIZE:
+        # Toplu içe aktarma gibi büyük değişikliklerde tek tek olay yerine listeyi yeniden iste
+        CATALOG_BROADCASTER.publish('catalog_resync', None, delta['version'])
+        return
+    for food_id, food in delta['changed'].items():
+        CATALOG_BROADCASTER.publish(
+            'food_changed', food, delta['version'], exclude=origin if food_id == origin_food_id else None
+        )
+    for food_id in delta['deleted']:
+        CATALOG_BROADCASTER.publish(
+            'food_deleted', {'food_id': food_id}, delta['version'], exclude=origin if food_id == origin_food_id else None
+        )
+
+def origin_socket(websocket):
+    """ReplyChannel sarmalayıcısının altındaki gerçek bağlantı"""
+    return getattr(websocket, 'websocket', websocket)
+
+def next_frame_delay_ms():
+    """Gerçek zamanlı istemcilere önerilen sonraki kare gecikmesi"""
+    return FRAME_PACER.next_delay_ms(SCHEDULER.inference_gate.capacity, SCHEDULER.queue_depth())
+
+def pace_realtime_result(websocket, result, stages, received_at):
+    """Webcam karesinin aşama sürelerini kaydet ve yanıta next_frame_delay_ms ekle"""
+    stages['total'] = time.perf_counter() - received_at
+    FRAME_PACER.observe(id(origin_socket(websocket)), stages)
+    result['next_frame_delay_ms'] = next_frame_delay_ms()
+
+def cache_raw_detections(result, confidence, enable_portion_calculation, camera_id):
+    """Ham tespitleri önbelleğe al ve yanıta image_id ekle (güven eşiği değişince refilter için)"""
+    raw_detections = result.pop('raw_detections', None)
+    if raw_detections is not None and result.get('success'):
+        result['image_id'] = DETECTION_CACHE.put(
+            raw_detections, min(DETECTION_CACHE_FLOOR_CONFIDENCE, confidence), enable_portion_calculation, camera_id
+        )
+
+async def start_model_reload(websocket, model_holder, data):
+    """
+    Start loading a new model in the background (admin reload_model message)
+    TR: Yeni modeli arka planda yüklemeye başlar; istemci önce model_reload_started,
+    yükleme bitince model_reloaded veya model_reload_failed alır. Bu sürede istekler eski modelle sürer.
+    """
+    if not model_holder.reload_supported:
+        await websocket.send(json.dumps({
+            'success': False,
+            'type': 'model_reload_failed',
+            'error': 'Model yeniden yükleme çıkarım süreçleri / çok işçili modda desteklenmiyor'
+        }))
+        return
+    if model_holder.reloading:
+        await websocket.send(json.dumps({
+            'success': False,
+            'type': 'model_reload_failed',
+            'error': 'Model zaten yükleniyor'
+        }))
+        return
+    
+    model_path = data.get('model_path') or model_holder.model_path
+    model_holder.reloading = True
+    await websocket.send(json.dumps({
+        'success': True,
+        'type': 'model_reload_started',
+        'model_path': model_path
+    }))
+    
+    # Yükleme bağlantı kapansa da tamamlanır
+    task = asyncio.create_task(finish_model_reload(websocket, model_holder, model_path, bool(data.get('force'))))
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(BACKGROUND_TASKS.discard)
+
+async def finish_model_reload(websocket, model_holder, model_path, force):
+    """Modeli yükle, doğrula, etkinleştir ve sonucu yöneticiye bildir"""
+    try:
+        report = await reload_model(model_holder, model_path, FOOD_DATABASE, force)
+        model_holder.last_error = None
+        # Eski modelle hesaplanmış yanıtlar artık geçersiz
+        RESULT_CACHE.set_generation(cache_generation())
+        print(f"🔁 Model değiştirildi: {model_path} (sürüm {model_holder.version})")
+        reply = {
+            'success': True,
+            'type': 'model_reloaded',
+            'data': {**model_holder.status(), **report}
+        }
+    except Exception as e:
+        model_holder.last_error = str(e)
+        print(f"❌ Model yeniden yüklenemedi: {e}")
+        reply = {
+            'success': False,
+            'type': 'model_reload_failed',
+            'model_path': model_path,
+            'error': str(e)
+        }
+    finally:
+        model_holder.reloading = False
+    
+    try:
+        await websocket.send(json.dumps(reply))
+    except websockets.exceptions.ConnectionClosed:
+        pass
+
+async def send_image_result(websocket, result, result_key=None):
+    """Görüntü yanıtını gönder; başarılıysa aynı görüntünün tekrarları için sakla"""
+    text = json.dumps(result)
+    if result_key is not None and result.get('success'):
+        RESULT_CACHE.end(result_key, text)
+    await websocket.send(text)
+
+async def dispatch_message(websocket, model_holder, inference_pool, data):
+    """
+    Run a message through the priority scheduler and report drops/overload to the client
+    TR: Mesajı öncelikli zamanlayıcıdan geçirir, düşürülme/aşırı yük durumunu istemciye bildirir.
+    """
+    received_at = time.perf_counter()
+    traffic_class = classify_message(data['type'])
+    websocket = ReplyChannel(websocket, data.get('request_id'))
+    result_key = None
+    try:
+        # Aynı görüntü ve ayarlar daha önce (veya şu anda) işlendiyse çözmeden ve kuyruğa girmeden yanıtla
+        if data['type'] == 'image' and RESULT_CACHE.enabled and isinstance(data.get('data'), str):
+            key = result_cache_key(data['data'], data.get('config') or {}, cache_generation())
+            cached = RESULT_CACHE.get(key) or await RESULT_CACHE.wait_pending(key)
+            if cached is not None:
+                await websocket.send('{"cached": true, ' + cached[1:])
+                return
+            RESULT_CACHE.begin(key)
+            result_key = key
+        
+        async with SCHEDULER.slot(traffic_class):
+            await handle_message(websocket, model_holder, inference_pool, data, traffic_class, received_at, result_key)
+    
+    except RequestDropped as e:
+        reply = {
+            'success': False,
+            'type': 'dropped',
+            'error': str(e)
+        }
+        if data['type'] == 'webcam':
+            reply['next_frame_delay_ms'] = next_frame_delay_ms()
+        await websocket.send(json.dumps(reply))
+    
+    except QueueFullError as e:
+        await websocket.send(json.dumps({
+            'success': False,
+            'type': 'busy',
+            'reason': 'queue_full',
+            'retry_after_ms': ADMISSION_RETRY_AFTER_MS,
+            'error': str(e)
+        }))
+    
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    
+    except Exception as e:
+        print(f"Mesaj işlenirken hata oluştu: {e}")
+        try:
+            await websocket.send(json.dumps({
+                'success': False,
+                'error': str(e)
+            }))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+    
+    finally:
+        # Yanıt saklanmadıysa (hata, düşürülme) bekleyen kopyalar kendileri işler
+        if result_key is not None:
+            RESULT_CACHE.end(result_key)
+
+async def handle_message(websocket, model_holder, inference_pool, data, traffic_class, received_at=None, result_key=None):
+    """
+    Handle a single parsed message (runs inside its scheduler slot)
+    TR: Ayrıştırılmış tek bir mesajı işler (zamanlayıcı slotu içinde çalışır).
+    received_at: mesajın alındığı an (perf_counter); webcam karelerinin aşama süreleri için
+    result_key: verilirse başarılı görüntü yanıtı bu anahtarla yanıt önbelleğine yazılır
+    """
+    started_at = time.perf_counter()
+    # Model bir kez okunur; istek sürerken model değişse de bu istek aynı modelle tamamlanır
+    model = model_holder.model
+    if received_at is None:
+        received_at = started_at
+
+    # Görüntü işleme
+    if data['type'] in ['image', 'webcam']:
+        # Görüntü verisini kontrol et
+        if 'data' not in data:
+            await websocket.send(json.dumps({
+                'success': False,
+                'error': 'Görüntü verisi bulunamadı'
+            }))
+            return
+        
+        # Konfigürasyon parametrelerini al
+        config = data.get('config', {})
+        confidence = config.get('confidence', 0.5)
+        classes = config.get('classes', None)
+        enable_portion_calculation = config.get('enablePortionCalculation', True)
+        camera_id = config.get('cameraId')
+        source_size = config.get('sourceSize')
+        
+        # Debug log
+        print(f"📦 Config: confidence={confidence}, porsiyon_hesaplama={'✅' if enable_portion_calculation else '❌'}")
+        
+        # Aşama süreleri (webcam yanıtlarındaki next_frame_delay_ms için)
+        stages = {'queue': started_at - received_at, 'decode': 0.0}
+        
+        # Tek görüntüler düşük eşikte çalıştırılır, ham tespitler refilter için saklanır
+        detection_floor = None
+        if data['type'] == 'image' and DETECTION_CACHE_MAX_ENTRIES > 0:
+            detection_floor = DETECTION_CACHE_FLOOR_CONFIDENCE
+        
+        if inference_pool is not None:
+            # Kare paylaşımlı bellek halkasına çözülür, işçi süreç kopyasız okur
+            try:
+                wait_started = time.perf_counter()
+                async with SCHEDULER.inference(traffic_class):
+                    service_started = time.perf_counter()
+                    result = await inference_pool.process_base64(
+                        data['data'], confidence, classes, enable_portion_calculation, camera_id, source_size,
+                        detection_floor
+                    )
+                stages['inference_wait'] = service_started - wait_started
+                stages['service'] = time.perf_counter() - service_started
+            except RingFullError:
+                await websocket.send(json.dumps({
+                    'success': False,
+                    'type': 'busy',
+                    'reason': 'frame_ring_full',
+                    'retry_after_ms': ADMISSION_RETRY_AFTER_MS,
+                    'error': 'Sunucu meşgul, tüm kare slotları dolu'
+                }))
+                return
+            except InferenceUnavailableError:
+                # Çıkarım işçileri yeniden başlatılıyor
+                await websocket.send(json.dumps({
+                    'success': False,
+                    'type': 'busy',
+                    'reason': 'inference_unavailable',
+                    'retry_after_ms': ADMISSION_RETRY_AFTER_MS,
+                    'error': 'Çıkarım işçisi hazır değil'
+                }))
+                return
+            if result is None:
+                await websocket.send(json.dumps({
+                    'success': False,
+                    'error': 'Görüntü dönüştürülemedi'
+                }))
+                return
+            
+            if data['type'] == 'webcam':
+                pace_realtime_result(websocket, result, stages, received_at)
+            else:
+                cache_raw_detections(result, confidence, enable_portion_calculation, camera_id)
+            await send_image_result(websocket, result, result_key)
+            return
+        
+        # Görüntüyü dönüştür
+        decode_started = time.perf_counter()
+        img, coordinate_scale = base64_to_inference_image(data['data'])
+        stages['decode'] = time.perf_counter() - decode_started
+        if img is None:
+            await websocket.send(json.dumps({
+                'success': False,
+                'error': 'Görüntü dönüştürülemedi'
+            }))
+            return
+        if source_size is not None:
+            # İstemci kareyi küçülterek gönderdi, tespitler kaynak boyutunda döner
+            coordinate_scale = apply_source_size(img, coordinate_scale, source_size)
+        
+        # Görüntüyü işle (model erişimi öncelik sırasıyla verilir)
+        wait_started = time.perf_counter()
+        async with SCHEDULER.inference(traffic_class):
+            service_started = time.perf_counter()
+            if data['type'] == 'webcam' and REALTIME_CASCADE is not None:
+                # Ayarlar, katalog veya model değişirse akışın saklanan sonucu kullanılmaz
+                config_key = (confidence, tuple(sorted(classes)) if isinstance(classes, list) else classes,
+                              enable_portion_calculation, camera_id, cache_generation())
+                result = await process_cascaded_frame(
+                    REALTIME_CASCADE, id(origin_socket(websocket)), config_key, model, img, FOOD_DATABASE,
+                    confidence, classes, enable_portion_calculation, camera_id, coordinate_scale
+                )
+            else:
+                result = await process_image(
+                    model, img, FOOD_DATABASE, confidence, classes, enable_portion_calculation, camera_id,
+                    coordinate_scale, detection_floor
+                )
+        stages['inference_wait'] = service_started - wait_started
+        stages['service'] = time.perf_counter() - service_started
+        
+        if data['type'] == 'webcam':
+            pace_realtime_result(websocket, result, stages, received_at)
+        else:
+            cache_raw_detections(result, confidence, enable_portion_calculation, camera_id)
+        
+        # Sonuçları gönder
+        await send_image_result(websocket, result, result_key)
+    
+    # Önbellekteki ham tespitleri yeni güven eşiğiyle yeniden süz (çıkarım yok)
+    elif data['type'] == 'refilter':
+        image_id = data.get('image_id')
+        config = data.get('config', {})
+        confidence = config.get('confidence', 0.5)
+        entry = DETECTION_CACHE.get(image_id)
+        
+        # Kayıt yoksa, eşik modelin çalıştığı eşiğin altındaysa veya porsiyon ayarı değiştiyse istemci görüntüyü yeniden gönderir
+        if entry is None or confidence < entry['floor'] or \
+                config.get('enablePortionCalculation', entry['enable_portion_calculation']) != entry['enable_portion_calculation']:
+            await websocket.send(json.dumps({
+                'success': False,
+                'type': 'refilter_miss',
+                'image_id': image_id,
+                'error': 'Görüntü önbellekte yok, yeniden gönderilmeli'
+            }))
+            return
+        
+        start_time = time.time()
+        result = summarize_detections(
+            entry['detections'], FOOD_DATABASE, confidence, entry['enable_portion_calculation'], entry['camera_id'],
+            update_calibration=False
+        )
+        result['processing_time'] = time.time() - start_time
+        result['image_id'] = image_id
+        await websocket.send(json.dumps(result))
+    
+    # Toplu görüntü işleme
+    elif data['type'] == 'image_batch':
+        if model is None:
+            await websocket.send(json.dumps({
+                'success': False,
+                'error': 'Toplu işlem çıkarım süreçleri modunda desteklenmiyor'
+            }))
+            return
+        await handle_image_batch(websocket, model, data, traffic_class)
+    
+    # Admin Panel İşlemleri
+    elif data['type'] == 'get_foods':
+        # Yemek listesini gönder (since_version verilirse sadece o sürümden sonraki değişiklikler)
+        try:
+            since_version = data.get('since_version')
+            current_version = await DB.get_catalog_version()
+            
+            if since_version is not None and 0 <= int(since_version) <= current_version:
+                delta = await DB.get_changes_since(int(since_version))
+                if not delta['changed'] and not delta['deleted']:
+                    await websocket.send(json.dumps({
+                        'success': True,
+                        'type': 'foods_not_modified',
+                        'version': delta['version']
+                    }))
+                else:
+                    await websocket.send(json.dumps({
+                        'success': True,
+                        'type': 'foods_delta',
+                        'version': delta['version'],
+                        'data': delta['changed'],
+                        'deleted': delta['deleted']
+                    }))
+                return
+            
+            # İlk yükleme veya istemcinin sürümü bu veritabanına ait değil: tam liste
+            foods = await DB.get_all_foods()
+            
+            await websocket.send(json.dumps({
+                'success': True,
+                'type': 'foods_list',
+                'version': current_version,
+                'data': foods
+            }))
+        except Exception as e:
+            await websocket.send(json.dumps({
+                'success': False,
+                'type': 'error',
+                'message': f'Yemek listesi alınamadı: {str(e)}'
+            }))
+    
+    elif data['type'] == 'add_food':
+        # Yeni yemek ekle
+        try:
+            food_data = data.get('data', {})
+            food_id = food_data.get('id')
+            
+            if not food_id:
+                await websocket.send(json.dumps({
+                    'success': False,
+                    'type': 'error',
+                    'message': 'Yemek ID\'si gerekli'
+                }))
+                return
+            
+            success = await DB.add_food(food_id, food_data)
+            
+            if success:
+                # Veritabanını yeniden yükle
+                delta = await sync_food_database()
+                publish_catalog_delta(delta, origin_socket(websocket), food_id)
+                
+                await websocket.send(json.dumps({
+                    'success': True,
+                    'type': 'food_added',
+                    'version': delta['version'],
+                    'data': food_data
+                }))
+            else:
+                await websocket.send(json.dumps({
+                    'success': False,
+                    'type': 'error',
+                    'message': 'Yemek eklenemedi (ID zaten mevcut olabilir)'
+                }))
+                
+        except Exception as e:
+            await websocket.send(json.dumps({
+                'success': False,
+                'type': 'error',
+                'message': f'Yemek ekleme hatası: {str(e)}'
+            }))
+    
+    elif data['type'] == 'update_food':
+        # Yemek güncelle
+        try:
+            food_id = data.get('food_id')
+            food_data = data.get('data', {})
+            
+            if not food_id:
+                await websocket.send(json.dumps({
+                    'success': False,
+                    'type': 'error',
+                    'message': 'Yemek ID\'si gerekli'
+                }))
+                return
+            
+            success = await DB.update_food(food_id, food_data)
+            
+            if success:
+                # Veritabanını yeniden yükle
+                delta = await sync_food_database()
+                publish_catalog_delta(delta, origin_socket(websocket), food_id)
+                
+                await websocket.send(json.dumps({
+                    'success': True,
+                    'type': 'food_updated',
+                    'version': delta['version'],
+                    'data': {**food_data, 'id': food_id}
+                }))
+            else:
+                await websocket.send(json.dumps({
+                    'success': False,
+                    'type': 'error',
+                    'message': 'Yemek güncellenemedi (yemek bulunamadı)'
+                }))
+                
+        except Exception as e:
+            await websocket.send(json.dumps({
+                'success': False,
+                'type': 'error',
+                'message': f'Yemek güncelleme hatası: {str(e)}'
+            }))
+    
+    elif data['type'] == 'delete_food':
+        # Yemek sil
+        try:
+            food_id = data.get('food_id')
+            
+            if not food_id:
+                await websocket.send(json.dumps({
+                    'success': False,
+                    'type': 'error',
+                    'message': 'Yemek ID\'si gerekli'
+                }))
+                return
+            
+            success = await DB.delete_food(food_id)
+            
+            if success:
+                # Veritabanını yeniden yükle
+                delta = await sync_food_database()
+                publish_catalog_delta(delta, origin_socket(websocket), food_id)
+                
+                await websocket.send(json.dumps({
+                    'success': True,
+                    'type': 'food_deleted',
+                    'version': delta['version'],
+                    'data': {'food_id': food_id}
+                }))
+            else:
+                await websocket.send(json.dumps({
+                    'success': False,
+                    'type': 'error',
+                    'message': 'Yemek silinemedi (yemek bulunamadı)'
+                }))
+                
+        except Exception as e:
+            await websocket.send(json.dumps({
+                'success': False,
+                'type': 'error',
+                'message': f'Yemek silme hatası: {str(e)}'
+            }))
+    
+    elif data['type'] == 'import_foods':
+        # Toplu içe aktarma: JSON ({id: yemek} veya liste) ya da CSV, tek işlemde yazılır
+        try:
+            import_format = data.get('format', 'json')
+            if import_format == 'csv':
+                foods = parse_foods_csv(data.get('data') or '')
+            elif import_format == 'json':
+                foods = parse_foods_json(data.get('data') or {})
+            else:
+                raise ImportFormatError(f'Desteklenmeyen biçim: {import_format}')
+            
+            delete_ids = data.get('delete') or []
+            if not isinstance(delete_ids, list) or not all(isinstance(food_id, str) for food_id in delete_ids):
+                raise ImportFormatError('delete alanı yemek id listesi olmalı')
+            if len(foods) + len(delete_ids) > IMPORT_MAX_FOODS:
+                raise ImportFormatError(f'Tek seferde en fazla {IMPORT_MAX_FOODS} yemek içe aktarılabilir')
+            
+            # Eklemeler ve silmeler tek işlemde: biri başarısız olursa hiçbiri yazılmaz
+            upserted, deleted = await DB.bulk_import_foods(foods, delete_ids)
+            
+            # Tek katalog senkronizasyonu (yemek başına yeniden yükleme yok)
+            delta = await sync_food_database()
+            publish_catalog_delta(delta)
+            
+            await websocket.send(json.dumps({
+                'success': True,
+                'type': 'foods_imported',
+                'version': delta['version'],
+                'data': {'upserted': upserted, 'deleted': deleted}
+            }))
+            
+        except ImportFormatError as e:
+            await websocket.send(json.dumps({
+                'success': False,
+                'type': 'error',
+                'message': f'Geçersiz içe aktarma verisi: {str(e)}'
+            }))
+        except Exception as e:
+            await websocket.send(json.dumps({
+                'success': False,
+                'type': 'error',
+                'message': f'İçe aktarma hatası: {str(e)}'
+            }))
+    
+    elif data['type'] == 'export_foods':
+        # Kataloğu sayfa sayfa gönder (tüm katalog bellekte oluşturulmaz)
+        try:
+            export_format = data.get('format', 'json')
+            if export_format not in ('json', 'csv'):
+                raise ImportFormatError(f'Desteklenmeyen biçim: {export_format}')
+            
+            version = await DB.get_catalog_version()
+            count = 0
+            chunks = 0
+            async for page in DB.iter_food_pages():
+                await websocket.send(json.dumps({
+                    'success': True,
+                    'type': 'foods_export_chunk',
+                    'format': export_format,
+                    'index': chunks,
+                    'data': page if export_format == 'json' else foods_to_csv(page, include_header=chunks == 0)
+                }))
+                count += len(page)
+                chunks += 1
+            
+            await websocket.send(json.dumps({
+                'success': True,
+                'type': 'foods_export_done',
+                'format': export_format,
+                'version': version,
+                'chunks': chunks,
+                'count': count
+            }))
+            
+        except Exception as e:
+            await websocket.send(json.dumps({
+                'success': False,
+                'type': 'error',
+                'message': f'Dışa aktarma hatası: {str(e)}'
+            }))
+    
+    elif data['type'] == 'search_foods':
+        # Yemek ara
+        try:
+            query = data.get('query', '')
+            
+            if not query:
+                await websocket.send(json.dumps({
+                    'success': False,
+                    'type': 'error',
+                    'message': 'Arama sorgusu gerekli'
+                }))
+                return
+            
+            search_results = await DB.search_foods_by_name(query)
+            
+            # Sonuçları dict formatına çevir
+            results_dict = {}
+            for food in search_results:
+                if food and 'id' in food:
+                    results_dict[food['id']] = food
+            
+            await websocket.send(json.dumps({
+                'success': True,
+                'type': 'foods_list',
+                'data': results_dict
+            }))
+            
+        except Exception as e:
+            await websocket.send(json.dumps({
+                'success': False,
+                'type': 'error',
+                'message': f'Arama hatası: {str(e)}'
+            }))
+    
+    elif data['type'] == 'get_stats':
+        # İstatistikleri gönder
+        try:
+            stats = CATALOG_STATS.snapshot()
+            
+            await websocket.send(json.dumps({
+                'success': True,
+                'type': 'stats',
+                'data': stats
+            }))
+            
+        except Exception as e:
+            await websocket.send(json.dumps({
+                'success': False,
+                'type': 'error',
+                'message': f'İstatistik alma hatası: {str(e)}'
+            }))
+    
+    elif data['type'] == 'subscribe_catalog':
+        # Katalog değişiklik olaylarına abone ol (food_changed / food_deleted / catalog_resync)
+        CATALOG_BROADCASTER.subscribe(origin_socket(websocket))
+        await websocket.send(json.dumps({
+            'success': True,
+            'type': 'catalog_subscribed',
+            'version': CATALOG_VERSION
+        }))
+    
+    elif data['type'] == 'get_capture_profile':
+        await websocket.send(json.dumps({
+            'success': True,
+            'type': 'capture_profile',
+            'data': capture_profile()
+        }))
+    
+    elif data['type'] == 'reload_model':
+        await start_model_reload(websocket, model_holder, data)
+    
+    elif data['type'] == 'get_metrics':
+        # Zamanlayıcı metrikleri (sınıf başına kuyruk süreleri)
+        await websocket.send(json.dumps({
+            'success': True,
+            'type': 'metrics',
+            'data': {
+                'scheduler': SCHEDULER.metrics(),
+                'admission': ADMISSION.metrics(),
+                'frame_pacing': FRAME_PACER.metrics(),
+                'detection_cache': DETECTION_CACHE.metrics(),
+                'result_cache': RESULT_CACHE.metrics(),
+                'model': model_holder.status(),
+                'lifecycle': LIFECYCLE.status(),
+                'cascade': REALTIME_CASCADE.metrics() if REALTIME_CASCADE is not None else None,
+                'catalog_broadcast': CATALOG_BROADCASTER.metrics()
+            }
+        }))
+    
+    else:
+        await websocket.send(json.dumps({
+            'success': False,
+            'error': f'Desteklenmeyen işlem türü: {data["type"]}'
+        }))
+
+async def admit_message(websocket, client_key, message_type, request_id, size):
+    """
+    Admit an image-carrying message or answer it with a draining/busy reply
+    TR: Görüntü taşıyan mesajı kabul kontrolünden geçirir; reddedilirse yanıtı gönderir ve None döner.
+    """
+    # Kapanış sırasında yeni kare alınmaz; istemci yeniden bağlanıp yeni sürece geçer
+    if not LIFECYCLE.accepting:
+        await ReplyChannel(websocket, request_id).send(json.dumps({
+            'success': False,
+            'type': 'draining',
+            'retry_after_ms': DRAIN_RETRY_AFTER_MS
+        }))
+        return None
+    try:
+        return ADMISSION.admit(client_key, message_type, size)
+    except Rejection as rejection:
+        await ReplyChannel(websocket, request_id).send(json.dumps({
+            'success': False,
+            'type': 'busy',
+            'reason': rejection.reason,
+            'retry_after_ms': rejection.retry_after_ms
+        }))
+        return None
+
+async def websocket_handler(websocket, model_holder, inference_pool=None):
     """Handle WebSocket connection and messages"""
-    global FOOD_DATABASE
+    pending_tasks = set()
+    client_key = id(websocket)
     
     try:
         print(f"Yeni bağlantı: {websocket.remote_address}")
         
-        # Model Kontrolü
-        if model is None:
+        # Model Kontrolü (çıkarım süreçleri kullanılıyorsa model işçilerdedir)
+        if model_holder.model is None and inference_pool is None:
             await websocket.send(json.dumps({
                 'success': False,
                 'error': 'YOLO modeli yüklenemedi'
             }))
             return
         
+        # İstemci kareleri bu profile göre kodlar (boyut, kalite, kare aralığı)
+        await websocket.send(json.dumps({
+            'success': True,
+            'type': 'capture_profile',
+            'data': capture_profile()
+        }))
         
         # Process messages
         async for message in websocket:
+            ticket = None
             try:
+                # Kabul kontrolü: bütçe doluysa görüntü taşıyan mesajı ayrıştırmadan/çözmeden reddet
+                message_type, request_id = peek_message_fields(message)
+                if message_type in ADMISSION_CONTROLLED_TYPES:
+                    ticket = await admit_message(websocket, client_key, message_type, request_id, len(message))
+                    if ticket is None:
+                        continue
+                
                 # JSON mesajı ayrıştır
                 data = json.loads(message)
                 
                 # Mesaj türünü kontrol et
-                if 'type' not in data:
+                if not isinstance(data, dict) or 'type' not in data:
                     await websocket.send(json.dumps({
                         'success': False,
                         'error': 'Geçersiz mesaj formatı: "type" alanı bulunamadı'
                     }))
                     continue
                 
-                # Görüntü işleme
-                if data['type'] in ['image', 'webcam']:
-                    # Görüntü verisini kontrol et
-                    if 'data' not in data:
-                        await websocket.send(json.dumps({
-                            'success': False,
-                            'error': 'Görüntü verisi bulunamadı'
-                        }))
-                        continue
-                    
-                    # Konfigürasyon parametrelerini al
-                    config = data.get('config', {})
-                    confidence = config.get('confidence', 0.5)
-                    classes = config.get('classes', None)
-                    enable_portion_calculation = config.get('enablePortionCalculation', True)
-                    
-                    # Debug log
-                    print(f"📦 Config: confidence={confidence}, porsiyon_hesaplama={'✅' if enable_portion_calculation else '❌'}")
-                    
-                    # Görüntüyü dönüştür
-                    img = base64_to_image(data['data'])
-                    if img is None:
-                        await websocket.send(json.dumps({
-                            'success': False,
-                            'error': 'Görüntü dönüştürülemedi'
-                        }))
+                # "type" mesajın başında değilse (ör. "data" önce yazıldıysa) kabul kontrolü ayrıştırmadan sonra yapılır
+                if ticket is None and data['type'] in ADMISSION_CONTROLLED_TYPES:
+                    ticket = await admit_message(websocket, client_key, data['type'], data.get('request_id'), len(message))
+                    if ticket is None:
                         continue
-                    
-                    # Görüntüyü işle
-                    result = await process_image(model, img, FOOD_DATABASE, confidence, classes, enable_portion_calculation)
-                    
-                    # Sonuçları gönder
-                    await websocket.send(json.dumps(result))
-                
-                # Admin Panel İşlemleri
-                elif data['type'] == 'get_foods':
-                    # Yemek listesini gönder
-                    try:
-                        db_manager = get_database_manager()
-                        foods = db_manager.get_all_foods()
-                        
-                        await websocket.send(json.dumps({
-                            'success': True,
-                            'type': 'foods_list',
-                            'data': foods
-                        }))
-                    except Exception as e:
-                        await websocket.send(json.dumps({
-                            'success': False,
-                            'type': 'error',
-                            'message': f'Yemek listesi alınamadı: {str(e)}'
-                        }))
-                
-                elif data['type'] == 'add_food':
-                    # Yeni yemek ekle
-                    try:
-                        food_data = data.get('data', {})
-                        food_id = food_data.get('id')
-                        
-                        if not food_id:
-                            await websocket.send(json.dumps({
-                                'success': False,
-                                'type': 'error',
-                                'message': 'Yemek ID\'si gerekli'
-                            }))
-                            continue
-                        
-                        success = add_new_food(food_id, food_data)
-                        
-                        if success:
-                            # Veritabanını yeniden yükle
-                            FOOD_DATABASE = load_food_database()
-                            
-                            await websocket.send(json.dumps({
-                                'success': True,
-                                'type': 'food_added',
-                                'data': food_data
-                            }))
-                        else:
-                            await websocket.send(json.dumps({
-                                'success': False,
-                                'type': 'error',
-                                'message': 'Yemek eklenemedi (ID zaten mevcut olabilir)'
-                            }))
-                            
-                    except Exception as e:
-                        await websocket.send(json.dumps({
-                            'success': False,
-                            'type': 'error',
-                            'message': f'Yemek ekleme hatası: {str(e)}'
-                        }))
-                
-                elif data['type'] == 'update_food':
-                    # Yemek güncelle
-                    try:
-                        food_id = data.get('food_id')
-                        food_data = data.get('data', {})
-                        
-                        if not food_id:
-                            await websocket.send(json.dumps({
-                                'success': False,
-                                'type': 'error',
-                                'message': 'Yemek ID\'si gerekli'
-                            }))
-                            continue
-                        
-                        success = update_existing_food(food_id, food_data)
-                        
-                        if success:
-                            # Veritabanını yeniden yükle
-                            FOOD_DATABASE = load_food_database()
-                            
-                            await websocket.send(json.dumps({
-                                'success': True,
-                                'type': 'food_updated',
-                                'data': {**food_data, 'id': food_id}
-                            }))
-                        else:
-                            await websocket.send(json.dumps({
-                                'success': False,
-                                'type': 'error',
-                                'message': 'Yemek güncellenemedi (yemek bulunamadı)'
-                            }))
-                            
-                    except Exception as e:
-                        await websocket.send(json.dumps({
-                            'success': False,
-                            'type': 'error',
-                            'message': f'Yemek güncelleme hatası: {str(e)}'
-                        }))
-                
-                elif data['type'] == 'delete_food':
-                    # Yemek sil
-                    try:
-                        food_id = data.get('food_id')
-                        
-                        if not food_id:
-                            await websocket.send(json.dumps({
-                                'success': False,
-                                'type': 'error',
-                                'message': 'Yemek ID\'si gerekli'
-                            }))
-                            continue
-                        
-                        success = delete_existing_food(food_id)
-                        
-                        if success:
-                            # Veritabanını yeniden yükle
-                            FOOD_DATABASE = load_food_database()
-                            
-                            await websocket.send(json.dumps({
-                                'success': True,
-                                'type': 'food_deleted',
-                                'data': {'food_id': food_id}
-                            }))
-                        else:
-                            await websocket.send(json.dumps({
-                                'success': False,
-                                'type': 'error',
-                                'message': 'Yemek silinemedi (yemek bulunamadı)'
-                            }))
-                            
-                    except Exception as e:
-                        await websocket.send(json.dumps({
-                            'success': False,
-                            'type': 'error',
-                            'message': f'Yemek silme hatası: {str(e)}'
-                        }))
-                
-                elif data['type'] == 'search_foods':
-                    # Yemek ara
-                    try:
-                        query = data.get('query', '')
-                        
-                        if not query:
-                            await websocket.send(json.dumps({
-                                'success': False,
-                                'type': 'error',
-                                'message': 'Arama sorgusu gerekli'
-                            }))
-                            continue
-                        
-                        search_results = search_foods(query)
-                        
-                        # Sonuçları dict formatına çevir
-                        results_dict = {}
-                        for food in search_results:
-                            if food and 'id' in food:
-                                results_dict[food['id']] = food
-                        
-                        await websocket.send(json.dumps({
-                            'success': True,
-                            'type': 'foods_list',
-                            'data': results_dict
-                        }))
-                        
-                    except Exception as e:
-                        await websocket.send(json.dumps({
-                            'success': False,
-                            'type': 'error',
-                            'message': f'Arama hatası: {str(e)}'
-                        }))
-                
-                elif data['type'] == 'get_stats':
-                    # İstatistikleri gönder
-                    try:
-                        stats = get_database_stats()
-                        
-                        await websocket.send(json.dumps({
-                            'success': True,
-                            'type': 'stats',
-                            'data': stats
-                        }))
-                        
-                    except Exception as e:
-                        await websocket.send(json.dumps({
-                            'success': False,
-                            'type': 'error',
-                            'message': f'İstatistik alma hatası: {str(e)}'
-                        }))
                 
-                else:
-                    await websocket.send(json.dumps({
-                        'success': False,
-                        'error': f'Desteklenmeyen işlem türü: {data["type"]}'
-                    }))
+                # Mesajı kendi trafik sınıfında zamanla; ödeme istekleri önizleme karelerinin arkasında beklemez
+                task = asyncio.create_task(dispatch_message(websocket, model_holder, inference_pool, data))
+                # Kapanışta bu görev (yanıtın gönderilmesi dahil) bitene kadar beklenir
+                LIFECYCLE.track(task)
+                pending_tasks.add(task)
+                task.add_done_callback(pending_tasks.discard)
+                if ticket is not None:
+                    # Bütçe, istek kuyrukta beklediği süre dahil iş bitene kadar tutulur
+                    task.add_done_callback(lambda _, ticket=ticket: ticket.release())
+                    ticket = None
             
             except json.JSONDecodeError:
                 await websocket.send(json.dumps({
@@ -285,21 +1011,154 @@ async def websocket_handler(websocket, model):
                     'success': False,
                     'error': str(e)
                 }))
+            
+            finally:
+                # Göreve devredilmeyen bütçeyi hemen bırak
+                if ticket is not None:
+                    ticket.release()
     
     except websockets.exceptions.ConnectionClosed:
         print(f"Bağlantı kapatıldı: {websocket.remote_address}")
     
     except Exception as e:
         print(f"WebSocket işleyicinde hata: {e}")
+    
+    finally:
+        # Bağlantı kapandıysa bekleyen işleri iptal et
+        for task in list(pending_tasks):
+            task.cancel()
+        ADMISSION.forget_client(client_key)
+        FRAME_PACER.forget_client(client_key)
+        if REALTIME_CASCADE is not None:
+            REALTIME_CASCADE.forget(client_key)
+        CATALOG_BROADCASTER.unsubscribe(websocket)
+
+async def watch_catalog_changes(interval=CATALOG_POLL_INTERVAL):
+    """
+    Diğer işçi süreçlerin yaptığı katalog değişikliklerini izle, FOOD_DATABASE'e uygula ve abonelere yayınla
+    """
+    watcher = CatalogChangeWatcher()
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if await DB.run_read(watcher.has_changed):
+                    delta = await sync_food_database()
+                    if delta['changed'] or delta['deleted']:
+                        publish_catalog_delta(delta)
+                        print(f"🔄 Katalog değişikliği uygulandı (sürüm {delta['version']})")
+            except Exception as e:
+                print(f"Katalog izleme hatası: {e}")
+    finally:
+        watcher.close()
+
+def health_report(model_holder, inference_pool=None):
+    """Sağlık ucunun gövdesi: hazır olma durumu, model durumu ve kuyruk derinliği"""
+    report = LIFECYCLE.status()
+    if inference_pool is not None:
+        model = dict(inference_pool.status())
+        model['loaded'] = model['ready'] > 0
+    else:
+        model = dict(model_holder.status(), loaded=model_holder.model is not None)
+    report['ready'] = report['ready'] and model['loaded']
+    report['model'] = model
+    report['queue_depth'] = SCHEDULER.queue_depth()
+    report['admission_inflight'] = ADMISSION.inflight
+    return report
+
+async def drain_server(server, timeout=DRAIN_TIMEOUT):
+    """
+    Stop accepting work, let in-flight requests finish, then close the connections
+    TR: Yeni bağlantı ve kareleri kabul etmeyi bırakır, süren isteklerin yanıtlarının gönderilmesini
+    en fazla timeout saniye bekler, sonra bağlantıları 1012 (service restart) ile kapatır.
+    """
+    # Dinleyen soketi kapat (bağlantılar açık kalır); SO_REUSEPORT ile yeni sürüm aynı portu dinleyebilir
+    server.server.close()
+    inflight = LIFECYCLE.inflight
+    print(f"⏳ Kapanış başladı: {inflight} süren istek bekleniyor (en fazla {timeout:.0f} s)")
+    if await LIFECYCLE.wait_idle(timeout):
+        print("✅ Süren istekler tamamlandı")
+    else:
+        print(f"⚠️  Kapanış süresi doldu, {LIFECYCLE.abandoned} istek yarıda kaldı")
+    server.close(code=1012, reason='server restart')
+    await server.wait_closed()
+
+def install_signal_handlers(supervised=False):
+    """
+    SIGTERM/SIGINT kapanışı başlatır; ikinci sinyal beklemeden durdurur
+    supervised: çok işçili modda işçi süreç. Ctrl+C ve systemd sinyalleri tüm süreç grubuna gider
+    ve ebeveyn ayrıca terminate() gönderir; bu yüzden SIGINT yok sayılır (main'de SIG_IGN) ve
+    tekrarlanan SIGTERM boşaltmayı yarıda kesmez.
+    """
+    loop = asyncio.get_running_loop()
+
+    def on_signal(signum):
+        if LIFECYCLE.start_draining(signal.Signals(signum).name) or supervised:
+            return
+        print("🛑 İkinci sinyal: süren istekler beklenmeden kapatılıyor")
+        LIFECYCLE.abandon()
+
+    for signum in (signal.SIGTERM,) if supervised else (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, on_signal, signum)
+        except (NotImplementedError, RuntimeError):
+            # Windows veya ana iş parçacığı dışı: varsayılan davranış korunur
+            pass
 
-async def start_websocket_server(model):
-    """WebSocket sunucusunu başlat"""
+async def start_websocket_server(model, reuse_port=False, watch_catalog=False, inference_pool=None, health_port=HEALTH_PORT,
+                                 supervised=False):
+    """WebSocket sunucusunu başlat (supervised: run_server_workers altında çalışan işçi)"""
+    if inference_pool is not None:
+        # Her çıkarım süreci bir model çağrısını paralel yürütebilir
+        SCHEDULER.set_inference_slots(len(inference_pool.processes))
+    
+    # Çıkarım süreçleri veya çok işçili modda modeller diğer süreçlerdedir, yeniden yükleme desteklenmez
+    MODEL_HOLDER.install(model, MODEL_PATH, reload_supported=inference_pool is None and not reuse_port)
+    # Model artık sadece MODEL_HOLDER'da tutulur; yeniden yüklemede eski model serbest kalabilsin
+    model = None
+    
+    # Kaskad süreç içi çıkarımda kullanılır (çıkarım süreçlerinde webcam kareleri doğrudan tam modelden geçer)
+    global REALTIME_CASCADE
+    if CASCADE_DETECTOR_PATH and inference_pool is None:
+        REALTIME_CASCADE = load_detector_cascade(CASCADE_DETECTOR_PATH)
+        if REALTIME_CASCADE is not None:
+            print(f"Gerçek zamanlı kaskad etkin: {CASCADE_DETECTOR_PATH}")
+    
+    # Kamera kalibrasyonları önceden yüklenir, kayıtlar yazma iş parçacığına gider (event loop'ta SQLite yok)
+    await attach_async_store(DB)
+    
+    # Taşıma sınırı kabul sınırının altında olursa büyük mesajlar "busy" yerine 1009 ile bağlantıyı koparır
+    if WEBSOCKET_MAX_MESSAGE_BYTES <= ADMISSION_MAX_MESSAGE_BYTES:
+        raise ValueError("WEBSOCKET_MAX_MESSAGE_BYTES, ADMISSION_MAX_MESSAGE_BYTES değerinden büyük olmalı")
+    
     server = await websockets.serve(
-        lambda ws: websocket_handler(ws, model),
+        lambda ws: websocket_handler(ws, MODEL_HOLDER, inference_pool),
         HOST,
-        PORT
+        PORT,
+        reuse_port=reuse_port,
+        max_size=WEBSOCKET_MAX_MESSAGE_BYTES
     )
     
     print(f"WebSocket sunucusu başlatıldı: ws://{HOST}:{PORT}")
     
-    await server.wait_closed() 
\ No newline at end of file
+    health_server = None
+    if health_port:
+        health_server = await start_health_server(
+            HEALTH_HOST, health_port, lambda: health_report(MODEL_HOLDER, inference_pool))
+        print(f"Sağlık ucu: http://{HEALTH_HOST}:{health_port}/ready")
+    
+    install_signal_handlers(supervised)
+    LIFECYCLE.mark_ready()
+    
+    watcher_task = asyncio.create_task(watch_catalog_changes()) if watch_catalog else None
+    try:
+        await LIFECYCLE.wait_draining()
+        await drain_server(server)
+    finally:
+        LIFECYCLE.mark_stopped()
+        if watcher_task:
+            watcher_task.cancel()
+        for task in list(BACKGROUND_TASKS):
+            task.cancel()
+        if health_server:
+            health_server.close()
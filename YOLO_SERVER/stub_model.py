@@ -0,0 +1,202 @@
+import time
+import zlib
+import math
+import cv2
+import numpy as np
+from YOLO_SERVER.config import (
+    DEFAULT_IMAGE_SIZE, STUB_SEED, STUB_FOOD_COUNT, STUB_UTENSIL_COUNT,
+    STUB_LATENCY_MS, STUB_POLYGON_POINTS
+)
+
+# Stub modelin sınıf isimleri (gerçek modeldeki normalize edilmiş isimlerle aynı)
+STUB_UTENSIL_CLASSES = ["catal", "kasik"]
+STUB_FOOD_CLASSES = [
+    "pirinc_pilav", "bulgur_pilav", "makarna", "tavuk_sote", "tavuk_but",
+    "kuru_fasulye", "salata", "corba", "cig_kofte", "tavuk_kul_basti"
+]
+
+class StubBoxes:
+    """
+    Minimal stand-in for ultralytics Boxes (cls / conf / xyxy)
+    TR: Ultralytics Boxes nesnesinin sade karşılığı.
+    """
+    def __init__(self, cls, conf, xyxy):
+        self.cls = cls
+        self.conf = conf
+        self.xyxy = xyxy
+
+    def __len__(self):
+        return len(self.cls)
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            index = slice(index, index + 1)
+        return StubBoxes(self.cls[index], self.conf[index], self.xyxy[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+class StubMasks:
+    """
+    Minimal stand-in for ultralytics Masks (data / xy / orig_shape)
+    TR: Ultralytics Masks nesnesinin sade karşılığı.
+    """
+    def __init__(self, data, xy, orig_shape=None):
+        self.data = data
+        self.xy = xy
+        self.orig_shape = orig_shape if orig_shape is not None else data.shape[1:]
+
+    def __len__(self):
+        return len(self.xy)
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            index = slice(index, index + 1)
+        return StubMasks(self.data[index], self.xy[index], self.orig_shape)
+
+class StubResults:
+    """
+    Single image result with the same attributes process_image reads
+    TR: process_image'in okuduğu alanlara sahip tek görüntü sonucu.
+    """
+    def __init__(self, boxes, masks, names, orig_shape):
+        self.boxes = boxes
+        self.masks = masks
+        self.names = names
+        self.orig_shape = orig_shape
+
+class StubYOLOModel:
+    """
+    Deterministic fake segmentation model for benchmarks without weights
+    TR: Ağırlık dosyası olmadan benchmark yapabilmek için deterministik sahte model.
+    Aynı görüntü her zaman aynı sentetik tepsiyi üretir.
+    """
+    def __init__(self, food_count=STUB_FOOD_COUNT, utensil_count=STUB_UTENSIL_COUNT,
+                 latency_ms=STUB_LATENCY_MS, polygon_points=STUB_POLYGON_POINTS, seed=STUB_SEED):
+        self.food_count = int(food_count)
+        self.utensil_count = int(utensil_count)
+        self.latency_ms = float(latency_ms)
+        self.polygon_points = max(int(polygon_points), 8)
+        self.seed = int(seed)
+        self.names = {i: name for i, name in enumerate(STUB_UTENSIL_CLASSES + STUB_FOOD_CLASSES)}
+
+    def _image_seed(self, image):
+        """Görüntü içeriğinden deterministik tohum üret"""
+        if isinstance(image, np.ndarray) and image.size:
+            sample = np.ascontiguousarray(image[::16, ::16])
+            return (self.seed ^ zlib.crc32(sample.tobytes())) & 0xFFFFFFFF
+        return self.seed
+
+    def _ellipse_polygon(self, rng, cx, cy, rx, ry, angle):
+        """Hafif gürültülü, döndürülmüş elips poligonu"""
+        t = np.linspace(0, 2 * math.pi, self.polygon_points, endpoint=False)
+        jitter = 1.0 + rng.uniform(-0.04, 0.04, size=t.shape)
+        x = rx * np.cos(t) * jitter
+        y = ry * np.sin(t) * jitter
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        px = cx + x * cos_a - y * sin_a
+        py = cy + x * sin_a + y * cos_a
+        return np.stack([px, py], axis=1).astype(np.float32)
+
+    def _synthesize(self, image, conf, classes, max_det):
+        """Tek bir görüntü için sentetik tepsi oluştur"""
+        if isinstance(image, np.ndarray):
+            height, width = image.shape[:2]
+        else:
+            height = width = DEFAULT_IMAGE_SIZE
+        rng = np.random.default_rng(self._image_seed(image))
+        names = STUB_UTENSIL_CLASSES + STUB_FOOD_CLASSES
+
+        # Yemekleri ızgara hücrelerine yerleştir
+        items = []
+        cols = max(1, math.ceil(math.sqrt(max(self.food_count, 1))))
+        rows = max(1, math.ceil(self.food_count / cols))
+        cell_w, cell_h = width / cols, height / rows
+        for i in range(self.food_count):
+            row, col = divmod(i, cols)
+            cx = (col + 0.5) * cell_w
+            cy = (row + 0.5) * cell_h
+            rx = cell_w * rng.uniform(0.25, 0.42)
+            ry = cell_h * rng.uniform(0.25, 0.42)
+            class_id = len(STUB_UTENSIL_CLASSES) + int(rng.integers(len(STUB_FOOD_CLASSES)))
+            polygon = self._ellipse_polygon(rng, cx, cy, rx, ry, rng.uniform(0, math.pi))
+            items.append((class_id, polygon))
+
+        # Çatal/kaşık: uzun ince elipsler
+        for _ in range(self.utensil_count):
+            length = min(width, height) * rng.uniform(0.30, 0.40)
+            cx = rng.uniform(length / 2, max(width - length / 2, length / 2 + 1))
+            cy = rng.uniform(length / 2, max(height - length / 2, length / 2 + 1))
+            class_id = int(rng.integers(len(STUB_UTENSIL_CLASSES)))
+            polygon = self._ellipse_polygon(rng, cx, cy, length / 2, length / 16, rng.uniform(0, math.pi))
+            items.append((class_id, polygon))
+
+        confidences = rng.uniform(0.35, 0.98, size=len(items))
+
+        cls_list, conf_list, box_list, polygons = [], [], [], []
+        for (class_id, polygon), confidence in zip(items, confidences):
+            if confidence < conf:
+                continue
+            if classes is not None and class_id not in classes:
+                continue
+            polygon[:, 0] = np.clip(polygon[:, 0], 0, width - 1)
+            polygon[:, 1] = np.clip(polygon[:, 1], 0, height - 1)
+            x1, y1 = polygon.min(axis=0)
+            x2, y2 = polygon.max(axis=0)
+            cls_list.append(float(class_id))
+            conf_list.append(float(confidence))
+            box_list.append([x1, y1, x2, y2])
+            polygons.append(polygon)
+
+        # Gerçek model gibi güvene göre sırala ve max_det uygula
+        order = np.argsort(conf_list)[::-1][:max_det] if conf_list else []
+        cls_arr = np.array([cls_list[i] for i in order], dtype=np.float32)
+        conf_arr = np.array([conf_list[i] for i in order], dtype=np.float32)
+        xyxy_arr = np.array([box_list[i] for i in order], dtype=np.float32).reshape(-1, 4)
+        polygons = [polygons[i] for i in order]
+
+        if not polygons:
+            return StubResults(StubBoxes(cls_arr, conf_arr, xyxy_arr), None,
+                               dict(enumerate(names)), (height, width))
+
+        mask_data = np.zeros((len(polygons), height, width), dtype=np.uint8)
+        for i, polygon in enumerate(polygons):
+            cv2.fillPoly(mask_data[i], [polygon.astype(np.int32)], 1)
+
+        return StubResults(
+            StubBoxes(cls_arr, conf_arr, xyxy_arr),
+            StubMasks(mask_data, polygons, (height, width)),
+            dict(enumerate(names)),
+            (height, width)
+        )
+
+    def predict(self, source=None, conf=0.25, iou=0.7, retina_masks=False, imgsz=DEFAULT_IMAGE_SIZE,
+                classes=None, max_det=300, **kwargs):
+        """Ultralytics predict() imzasıyla uyumlu sentetik çıkarım"""
+        sources = source if isinstance(source, list) else [source]
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms * len(sources) / 1000.0)
+        return [self._synthesize(image, conf, classes, max_det) for image in sources]
+
+def parse_stub_spec(model_path):
+    """
+    Parse "stub" or "stub:foods=6,utensils=1,latency_ms=30" into model kwargs
+    TR: Stub model tanımını anahtar-değer parametrelerine dönüştürür.
+    """
+    aliases = {
+        'foods': 'food_count',
+        'utensils': 'utensil_count',
+        'latency_ms': 'latency_ms',
+        'points': 'polygon_points',
+        'seed': 'seed'
+    }
+    kwargs = {}
+    _, _, options = model_path.partition(':')
+    for option in filter(None, options.split(',')):
+        key, _, value = option.partition('=')
+        key = key.strip()
+        if key not in aliases:
+            raise ValueError(f"Bilinmeyen stub parametresi: {key}")
+        kwargs[aliases[key]] = float(value)
+    return kwargs
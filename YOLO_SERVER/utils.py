@@ -3,7 +3,7 @@ import cv2
 import numpy as np
 import statistics
 import math
-from YOLO_SERVER.config import REFERENCE_OBJECTS
+from YOLO_SERVER.config import REFERENCE_OBJECTS, DEFAULT_IMAGE_SIZE, REDUCED_DECODE_ENABLED
 
 def load_food_database():
     """
@@ -30,6 +30,99 @@ def base64_to_image(base64_string):
     img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
     return img
 
+# JPEG ölçekli çözme: libjpeg DCT ölçekleme ile 1/2, 1/4, 1/8 boyutunda çözer
+REDUCED_DECODE_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+# Boyut bilgisi taşıyan SOF işaretleri (C4 = DHT, C8 = JPG, CC = DAC hariç)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def read_jpeg_size(img_data):
+    """
+    Read (width, height) from the JPEG SOF header without decoding
+    TR: JPEG başlığından (SOF) görüntüyü çözmeden boyutu okur; JPEG değilse None döner.
+    """
+    if len(img_data) < 4 or img_data[0] != 0xFF or img_data[1] != 0xD8:
+        return None
+    position = 2
+    length = len(img_data)
+    while position + 4 <= length:
+        if img_data[position] != 0xFF:
+            return None
+        marker = img_data[position + 1]
+        if marker == 0xFF:
+            # Dolgu baytı
+            position += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            # Uzunluğu olmayan işaretler
+            position += 2
+            continue
+        if marker == 0xDA:
+            # Tarama verisi başladı, SOF bulunamadı
+            return None
+        segment_length = (img_data[position + 2] << 8) | img_data[position + 3]
+        if marker in JPEG_SOF_MARKERS:
+            if position + 9 > length:
+                return None
+            height = (img_data[position + 5] << 8) | img_data[position + 6]
+            width = (img_data[position + 7] << 8) | img_data[position + 8]
+            return (width, height) if width and height else None
+        position += 2 + segment_length
+    return None
+
+def reduced_decode_factor(width, height, target_size=DEFAULT_IMAGE_SIZE):
+    """Uzun kenarı target_size'dan küçük düşürmeyen en büyük ölçek (8, 4, 2 veya 1)"""
+    long_side = max(width, height)
+    for factor in sorted(REDUCED_DECODE_FLAGS, reverse=True):
+        if -(-long_side // factor) >= target_size:
+            return factor
+    return 1
+
+def decode_image_for_inference(img_data, target_size=DEFAULT_IMAGE_SIZE):
+    """
+    Decode image bytes at the smallest JPEG scale that is still at least target_size
+    TR: Görüntüyü, uzun kenarı çıkarım boyutundan küçük olmayan en ucuz JPEG ölçeğinde çözer.
+    Model zaten görüntüyü target_size'a küçülttüğü için tam çözünürlüklü çözme boşa gider.
+    Dönüş: (görüntü, coordinate_scale); coordinate_scale tespitleri orijinal koordinatlara
+    taşıyan (sx, sy) çarpanıdır, tam boyutta çözüldüyse None.
+    """
+    nparr = np.frombuffer(img_data, np.uint8)
+    size = read_jpeg_size(img_data) if REDUCED_DECODE_ENABLED else None
+    factor = reduced_decode_factor(*size, target_size) if size else 1
+    if factor == 1:
+        return cv2.imdecode(nparr, cv2.IMREAD_COLOR), None
+
+    image = cv2.imdecode(nparr, REDUCED_DECODE_FLAGS[factor])
+    if image is None:
+        return None, None
+    width, height = size
+    if (image.shape[1] > image.shape[0]) != (width > height) and width != height:
+        # EXIF yönlendirmesi 90° döndürdüyse orijinal boyutlar da yer değiştirir
+        width, height = height, width
+    return image, (width / image.shape[1], height / image.shape[0])
+
+def base64_to_inference_image(base64_string, target_size=DEFAULT_IMAGE_SIZE):
+    """base64_to_image gibi, fakat çıkarım boyutuna göre ölçekli çözer: (görüntü, coordinate_scale)"""
+    return decode_image_for_inference(base64.b64decode(base64_string), target_size)
+
+def apply_source_size(image, coordinate_scale, source_size):
+    """
+    Map detections to the client's source frame size
+    TR: İstemci kareyi capture_profile'a göre küçülterek gönderdiyse (config.sourceSize),
+    tespitlerin kaynak (ör. video) boyutuna taşınması için coordinate_scale'i döndürür.
+    """
+    try:
+        width, height = int(source_size['width']), int(source_size['height'])
+    except (TypeError, KeyError, ValueError):
+        return coordinate_scale
+    if width <= 0 or height <= 0:
+        return coordinate_scale
+    scale = (width / image.shape[1], height / image.shape[0])
+    return None if scale == (1.0, 1.0) else scale
+
 # Segmentasyon alanını hesapla (piksel cinsinden)
 def calculate_segment_area(segments):
     """
@@ -0,0 +1,84 @@
+import time
+import signal
+import socket
+import asyncio
+import multiprocessing
+from YOLO_SERVER.config import HOST, PORT, DRAIN_TIMEOUT, HEALTH_PORT
+
+# Çöken işçiyi yeniden başlatmadan önce beklenecek süre (s)
+WORKER_RESTART_DELAY = 2.0
+
+def _worker_main(worker_index, model_path, threads_per_worker):
+    """
+    Tek işçi süreç: iş parçacıklarını sabitle, kendi modelini yükle, paylaşılan portta dinle
+    """
+    # Ebeveyn süreç sinyalleri yönetir; işçi SIGINT'i yok sayar, SIGTERM ile süren isteklerini bitirip kapanır
+    # (tekrarlanan SIGTERM, ör. systemd + ebeveynin terminate() çağrısı, boşaltmayı kesmez)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Model/sunucu modülleri torch'u çekebilir; spawn sonrası içeri aktar
+    from YOLO_SERVER.model import load_yolo_model, configure_inference_threads
+    from YOLO_SERVER.server import start_websocket_server
+
+    configure_inference_threads(threads_per_worker)
+    model = load_yolo_model(model_path)
+    if model is None:
+        print(f"❌ İşçi {worker_index}: model yüklenemedi")
+        return
+
+    print(f"✅ İşçi {worker_index} hazır (pid={multiprocessing.current_process().pid}, {threads_per_worker} iş parçacığı)")
+    # Sağlık ucu paylaşılmaz: her işçi kendi portunu dinler (HEALTH_PORT + sıra)
+    health_port = HEALTH_PORT + worker_index if HEALTH_PORT else 0
+    asyncio.run(start_websocket_server(model, reuse_port=True, watch_catalog=True, health_port=health_port,
+                                       supervised=True))
+
+def run_server_workers(model_path, workers, threads_per_worker):
+    """
+    Start N server processes that share HOST:PORT through SO_REUSEPORT and supervise them
+    TR: Aynı portu SO_REUSEPORT ile paylaşan N işçi süreç başlatır ve çökenleri yeniden başlatır.
+    """
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        raise RuntimeError("Bu platform SO_REUSEPORT desteklemiyor - SERVER_WORKERS=1 kullanın")
+
+    # torch/CUDA fork sonrası güvenli değil, her işçi temiz süreçte başlar
+    context = multiprocessing.get_context('spawn')
+    processes = {}
+    stopping = False
+
+    def spawn(index):
+        process = context.Process(
+            target=_worker_main,
+            args=(index, model_path, threads_per_worker),
+            name=f"yolo-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        processes[index] = process
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    print(f"🧵 {workers} işçi süreç başlatılıyor: ws://{HOST}:{PORT} (SO_REUSEPORT)")
+    for index in range(workers):
+        spawn(index)
+
+    try:
+        while not stopping:
+            time.sleep(0.5)
+            for index, process in list(processes.items()):
+                if not process.is_alive() and not stopping:
+                    print(f"⚠️  İşçi {index} sonlandı (exit={process.exitcode}), yeniden başlatılıyor...")
+                    time.sleep(WORKER_RESTART_DELAY)
+                    spawn(index)
+    finally:
+        print("🛑 İşçiler durduruluyor...")
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        # terminate() SIGTERM gönderir; işçilere süren istekleri bitirmeleri için süre tanınır
+        for process in processes.values():
+            process.join(timeout=DRAIN_TIMEOUT + 5)
@@ -0,0 +1,238 @@
+"""
+Micro-benchmark suite for portion estimation and catalog operations
+TR: Porsiyon hesaplama ve katalog işlemleri için mikro benchmark seti.
+
+Kullanım (proje kök dizininden):
+    python benchmarks/run_benchmarks.py                  # Çalıştır ve baseline ile karşılaştır
+    python benchmarks/run_benchmarks.py --save-baseline  # Mevcut sonuçları baseline olarak kaydet
+    python benchmarks/run_benchmarks.py --quick          # 50k katalog olmadan hızlı tur
+    python benchmarks/run_benchmarks.py --require-baseline  # CI: baseline yoksa da başarısız ol
+
+Bir senaryo baseline süresinin --threshold katını aşarsa çıkış kodu 1 olur.
+--require-baseline verilirse baseline dosyası yoksa veya ölçülen bir senaryonun baseline değeri yoksa
+da çıkış kodu 1 olur (baseline makineye özgüdür, depoya eklenmez; CI önce --save-baseline çalıştırmalıdır).
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from YOLO_SERVER.utils import (
+    analyze_segment_geometry, estimate_dynamic_height, compute_advanced_volume,
+    calculate_scale_factor_from_bbox_area, scale_nutrition_values
+)
+from YOLO_SERVER.database import DatabaseManager
+from YOLO_SERVER.portion_engine import PortionEngine
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = 1.5
+
+POLYGON_SIZES = [50, 200, 500, 2000]
+CATALOG_SIZES = [20, 1000, 50000]
+FOOD_TYPES = ["corba", "makarna", "salata", "pirinc_pilav", "tavuk_but", "kuru_fasulye", "tavuk_sote", "ekmek"]
+
+def make_polygon(points, seed=0):
+    """Gürültülü elips şeklinde sentetik segment poligonu"""
+    rng = random.Random(seed)
+    polygon = []
+    for i in range(points):
+        t = 2 * math.pi * i / points
+        r = 1.0 + rng.uniform(-0.05, 0.05)
+        polygon.append([320 + 180 * r * math.cos(t), 240 + 120 * r * math.sin(t)])
+    return polygon
+
+def make_food(index, rng):
+    """Sentetik yemek kaydı"""
+    return {
+        'name': f'Yemek {index}',
+        'price': round(rng.uniform(5, 150), 2),
+        'calories': rng.randint(20, 900),
+        'portion_based': rng.random() < 0.6,
+        'food_category': rng.choice(['liquid', 'flat', 'dome', 'irregular', 'fixed']),
+        'base_height_cm': round(rng.uniform(1, 5), 2),
+        'density_g_per_cm3': round(rng.uniform(0.4, 1.2), 2),
+        'reference_mass_g': rng.choice([100, 150, 200, 250]),
+        'volume_method': None,
+        'nutrition': {'protein': f'{rng.randint(1, 40)}g', 'carbs': f'{rng.randint(1, 80)}g',
+                      'fat': f'{rng.randint(1, 30)}g', 'fiber': f'{rng.randint(0, 10)}g'},
+        'ingredients': [f'malzeme_{rng.randint(0, 200)}' for _ in range(3)],
+        'allergens': [f'alerjen_{rng.randint(0, 10)}' for _ in range(rng.randint(0, 2))]
+    }
+
+def build_catalog(db_path, size):
+    """Ölçüm dışı hızlı kurulum: sentetik kataloğu tek transaction ile yaz"""
+    rng = random.Random(size)
+    DatabaseManager(db_path)
+    conn = sqlite3.connect(db_path)
+    foods, nutrition, ingredients, allergens = [], [], [], []
+    for i in range(size):
+        food_id = f'food_{i:06d}'
+        food = make_food(i, rng)
+        foods.append((food_id, food['name'], food['price'], food['calories'], food['portion_based'],
+                      food['food_category'], food['base_height_cm'], food['density_g_per_cm3'],
+                      food['reference_mass_g'], food['volume_method']))
+        n = food['nutrition']
+        nutrition.append((food_id, n['protein'], n['carbs'], n['fat'], n['fiber']))
+        ingredients.extend((food_id, item) for item in food['ingredients'])
+        allergens.extend((food_id, item) for item in food['allergens'])
+    with conn:
+        conn.executemany('INSERT INTO foods (id, name, price, calories, portion_based, food_category, '
+                         'base_height_cm, density_g_per_cm3, reference_mass_g, volume_method) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', foods)
+        conn.executemany('INSERT INTO nutrition (food_id, protein, carbs, fat, fiber) VALUES (?, ?, ?, ?, ?)', nutrition)
+        conn.executemany('INSERT INTO ingredients (food_id, ingredient) VALUES (?, ?)', ingredients)
+        conn.executemany('INSERT INTO allergens (food_id, allergen) VALUES (?, ?)', allergens)
+    conn.close()
+    return DatabaseManager(db_path)
+
+def measure(func, min_time=0.2, max_calls=100000):
+    """Fonksiyonu tekrar tekrar çalıştırıp çağrı başına en iyi süreyi döndür (saniye)"""
+    # Isınma ve tekrar sayısı kalibrasyonu
+    start = time.perf_counter()
+    func()
+    single = time.perf_counter() - start
+    calls = max(1, min(max_calls, int(min_time / 5 / single) if single > 0 else max_calls))
+    best = single
+    # Yavaş senaryolarda (ör. 50k katalog) tekrar sayısını azalt
+    repeats = 5 if single < min_time else 2
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+def utils_cases():
+    """utils.py sıcak fonksiyonları"""
+    cases = {}
+    for points in POLYGON_SIZES:
+        polygon = make_polygon(points, seed=points)
+        cases[f'analyze_segment_geometry[{points}pts]'] = lambda p=polygon: analyze_segment_geometry(p)
+
+    geometry = {'area': 180.0, 'circularity': 0.72}
+    def height_all():
+        for food_type in FOOD_TYPES:
+            estimate_dynamic_height(food_type, geometry, 3.0)
+    cases['estimate_dynamic_height[all_types]'] = height_all
+
+    def volume_all():
+        for food_type in FOOD_TYPES:
+            compute_advanced_volume(food_type, 180.0, 2.5, geometry)
+    cases['compute_advanced_volume[all_types]'] = volume_all
+
+    engine = PortionEngine({})
+    frame = [(food_type, {'base_height_cm': 3.0}, {'area': 18000.0, 'circularity': 0.72}) for food_type in FOOD_TYPES]
+    cases['portion_engine.estimate[all_types]'] = lambda: engine.estimate(frame, 0.01)
+
+    references = [
+        {'class': 'catal', 'bbox': [100, 100, 140, 400]},
+        {'class': 'kasik', 'bbox': [300, 120, 360, 420]},
+        {'class': 'catal', 'bbox': [500, 90, 530, 380]},
+    ]
+    cases['calculate_scale_factor_from_bbox_area[3refs]'] = lambda: calculate_scale_factor_from_bbox_area(references)
+
+    nutrition = {'protein': '12g', 'carbs': '45.5g', 'fat': '8g', 'fiber': '3g'}
+    cases['scale_nutrition_values'] = lambda: scale_nutrition_values(nutrition, 1.5)
+    return cases
+
+def database_cases(workdir, sizes):
+    """DatabaseManager işlemleri, her katalog boyutu için"""
+    cases = {}
+    for size in sizes:
+        db = build_catalog(os.path.join(workdir, f'catalog_{size}.db'), size)
+        rng = random.Random(size + 1)
+        counter = {'n': 0}
+
+        def add_food(db=db, rng=rng, counter=counter):
+            counter['n'] += 1
+            db.add_food(f'bench_add_{counter["n"]}', make_food(counter['n'], rng))
+
+        def update_food(db=db, rng=rng, size=size):
+            db.update_food(f'food_{rng.randrange(size):06d}', make_food(0, rng))
+
+        cases[f'get_all_foods[{size}]'] = db.get_all_foods
+        cases[f'search_foods_by_name[{size}]'] = lambda db=db: db.search_foods_by_name('Yemek 1')
+        cases[f'add_food[{size}]'] = add_food
+        cases[f'update_food[{size}]'] = update_food
+        cases[f'get_database_stats[{size}]'] = db.get_database_stats
+    return cases
+
+def main():
+    parser = argparse.ArgumentParser(description="Porsiyon hesaplama ve katalog mikro benchmarkları")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON dosyası")
+    parser.add_argument('--save-baseline', action='store_true', help="Sonuçları baseline olarak kaydet")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="İzin verilen en yüksek süre oranı (sonuç / baseline)")
+    parser.add_argument('--quick', action='store_true', help="50k kataloğu atla")
+    parser.add_argument('--filter', default=None, help="Sadece adı bu metni içeren senaryolar")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Senaryo başına ölçüm süresi (s)")
+    parser.add_argument('--require-baseline', action='store_true',
+                        help="Baseline yoksa veya bir senaryo baseline'da yoksa başarısız ol (çıkış kodu 1)")
+    args = parser.parse_args()
+
+    sizes = [s for s in CATALOG_SIZES if not (args.quick and s > 1000)]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = utils_cases()
+        cases.update(database_cases(workdir, sizes))
+
+        print(f"{'Senaryo':<48} {'Süre':>12} {'Baseline':>12} {'Oran':>7}")
+        print("-" * 82)
+        for name, func in cases.items():
+            if args.filter and args.filter not in name:
+                continue
+            seconds = measure(func, min_time=args.min_time)
+            results[name] = seconds
+            reference = baseline.get(name)
+            ratio = seconds / reference if reference else None
+            flag = ""
+            if ratio is not None and ratio > args.threshold:
+                regressions.append((name, ratio))
+                flag = "  ❌"
+            print(f"{name:<48} {seconds * 1e6:>10.1f}µs "
+                  f"{(f'{reference * 1e6:.1f}µs' if reference else '-'):>12} "
+                  f"{(f'{ratio:.2f}' if ratio else '-'):>7}{flag}")
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline kaydedildi: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("\n⚠️  Baseline bulunamadı - karşılaştırma yapılmadı (--save-baseline ile oluşturun)")
+        return 1 if args.require_baseline else 0
+
+    missing = [name for name in results if name not in baseline]
+    if missing and args.require_baseline:
+        print(f"\n❌ {len(missing)} senaryonun baseline değeri yok (--save-baseline ile güncelleyin):")
+        for name in missing:
+            print(f"   • {name}")
+        return 1
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} senaryoda performans gerilemesi (eşik x{args.threshold}):")
+        for name, ratio in regressions:
+            print(f"   • {name}: x{ratio:.2f}")
+        return 1
+
+    print(f"\n✅ Gerileme yok (eşik x{args.threshold})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
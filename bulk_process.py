@@ -0,0 +1,229 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+from YOLO_SERVER.config import MODEL_PATH, DEFAULT_CONFIDENCE_THRESHOLD
+from YOLO_SERVER.model import load_yolo_model, predict_with_yolo, configure_inference_threads
+from YOLO_SERVER.food_processing import analyze_results
+from YOLO_SERVER.utils import load_food_database, decode_image_for_inference
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
+CSV_FIELDS = [
+    'source', 'frame', 'timestamp_ms', 'class', 'confidence', 'portion',
+    'price', 'calories', 'frame_total_price', 'frame_total_calories', 'error'
+]
+
+# İşçi süreç durumu (her süreç kendi modelini tutar)
+_WORKER_MODEL = None
+_WORKER_FOOD_DATABASE = None
+
+def _init_worker(model_path, threads_per_worker, verbose):
+    """İşçi süreci başlat: iş parçacıklarını sabitle, modeli ve kataloğu yükle"""
+    global _WORKER_MODEL, _WORKER_FOOD_DATABASE
+    if not verbose:
+        # Tespit başına debug çıktıları toplu işlemde gürültü oluşturur
+        sys.stdout = open(os.devnull, 'w')
+    configure_inference_threads(threads_per_worker)
+    _WORKER_MODEL = load_yolo_model(model_path)
+    if _WORKER_MODEL is None:
+        raise RuntimeError(f"Model yüklenemedi: {model_path}")
+    _WORKER_FOOD_DATABASE = load_food_database()
+
+def _process_task(task):
+    """Tek bir görüntü/kareyi işle ve yazılabilir kayda dönüştür"""
+    source, frame_index, timestamp_ms, payload, options = task
+    start_time = time.time()
+    record = {'source': source, 'frame': frame_index, 'timestamp_ms': timestamp_ms}
+
+    try:
+        # Dizin modunda görüntü işçide okunur (büyük dizilerin pickle edilmesini önler)
+        # Büyük JPEG'ler çıkarım boyutuna yakın ölçekte çözülür
+        coordinate_scale = None
+        if isinstance(payload, str):
+            with open(payload, 'rb') as f:
+                image, coordinate_scale = decode_image_for_inference(f.read())
+        else:
+            image = payload
+        if image is None:
+            raise ValueError("Görüntü okunamadı")
+
+        results = predict_with_yolo(_WORKER_MODEL, image, options['confidence'], filter_classes=options['classes'],
+                                    retina_masks=options['portions'])
+        response = analyze_results(
+            results, _WORKER_FOOD_DATABASE, options['classes'], options['portions'], options['camera_id'],
+            coordinate_scale
+        )
+    except Exception as e:
+        record.update({'success': False, 'error': str(e)})
+        return record
+
+    record.update({
+        'success': True,
+        'detections': [
+            {
+                'class': detection['class'],
+                'confidence': round(detection['confidence'], 4),
+                'bbox': detection['bbox'],
+                'portion': detection['food_info'].get('portion', 1.0),
+                'price': detection['food_info'].get('portion_price', detection['food_info']['price']),
+                'calories': detection['food_info']['calories']
+            }
+            for detection in response['data']
+        ],
+        'total_price': response['total_price'],
+        'total_calories': response['total_calories'],
+        'processing_time': time.time() - start_time
+    })
+    return record
+
+def iter_directory_frames(directory):
+    """Dizindeki görüntü dosyalarını sıralı olarak üret (okuma işçide yapılır)"""
+    names = sorted(
+        name for name in os.listdir(directory)
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+    )
+    for index, name in enumerate(names):
+        yield name, index, None, os.path.join(directory, name)
+
+def iter_video_frames(video_path, frame_skip):
+    """
+    Video karelerini üret; atlanan kareler çözülmeden geçilir (grab)
+    """
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise ValueError(f"Video açılamadı: {video_path}")
+
+    source = os.path.basename(video_path)
+    step = max(1, frame_skip + 1)
+    frame_index = 0
+    try:
+        while True:
+            if frame_index % step:
+                # Sadece demux, JPEG/H264 çözme yok
+                if not capture.grab():
+                    break
+            else:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                yield source, frame_index, int(capture.get(cv2.CAP_PROP_POS_MSEC)), frame
+            frame_index += 1
+    finally:
+        capture.release()
+
+class ResultWriter:
+    """JSONL veya CSV olarak akış halinde yaz (tüm sonuçlar bellekte tutulmaz)"""
+    def __init__(self, path, output_format):
+        self.format = output_format
+        self.file = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8', newline='')
+        self.csv_writer = None
+        if self.format == 'csv':
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, record):
+        if self.format == 'jsonl':
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            base = {
+                'source': record['source'],
+                'frame': record['frame'],
+                'timestamp_ms': record['timestamp_ms'],
+                'frame_total_price': record.get('total_price'),
+                'frame_total_calories': record.get('total_calories'),
+                'error': record.get('error')
+            }
+            detections = record.get('detections') or [{}]
+            for detection in detections:
+                self.csv_writer.writerow({
+                    **base,
+                    'class': detection.get('class'),
+                    'confidence': detection.get('confidence'),
+                    'portion': detection.get('portion'),
+                    'price': detection.get('price'),
+                    'calories': detection.get('calories')
+                })
+        self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+def run(args):
+    """Kareleri sınırlı bir pencere ile işçi havuzuna dağıt ve sonuçları sırayla yaz"""
+    if os.path.isdir(args.input):
+        frames = iter_directory_frames(args.input)
+    else:
+        frames = iter_video_frames(args.input, args.frame_skip)
+
+    output_format = args.format
+    if output_format == 'auto':
+        output_format = 'csv' if args.output.lower().endswith('.csv') else 'jsonl'
+
+    options = {
+        'confidence': args.confidence,
+        'classes': args.classes.split(',') if args.classes else None,
+        'portions': not args.no_portions,
+        'camera_id': args.camera_id
+    }
+
+    writer = ResultWriter(args.output, output_format)
+    max_pending = args.max_pending or args.workers * 2
+    pending = deque()
+    processed = 0
+    failed = 0
+    start_time = time.time()
+
+    def drain_one():
+        nonlocal processed, failed
+        record = pending.popleft().result()
+        writer.write(record)
+        processed += 1
+        if not record['success']:
+            failed += 1
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(args.model, args.threads_per_worker, args.verbose)
+        ) as pool:
+            for source, frame_index, timestamp_ms, payload in frames:
+                # Geri basınç: pencere doluysa en eski sonucu bekle
+                if len(pending) >= max_pending:
+                    drain_one()
+                pending.append(pool.submit(_process_task, (source, frame_index, timestamp_ms, payload, options)))
+            while pending:
+                drain_one()
+    finally:
+        writer.close()
+
+    elapsed = time.time() - start_time
+    print(f"✅ {processed} kare işlendi ({failed} hata) - {elapsed:.1f}s, "
+          f"{processed / elapsed if elapsed > 0 else 0:.2f} kare/s", file=sys.stderr)
+    return 0 if failed == 0 else 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Tepsi görüntüleri / video kayıtları için çevrimdışı toplu yemek tespiti")
+    parser.add_argument('input', help="Görüntü dizini veya video dosyası")
+    parser.add_argument('-o', '--output', default='-', help="Çıktı dosyası (.jsonl / .csv, '-' = stdout)")
+    parser.add_argument('--format', choices=['auto', 'jsonl', 'csv'], default='auto')
+    parser.add_argument('--model', default=MODEL_PATH, help="Model dosyası (veya 'stub')")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--threads-per-worker', type=int, default=2, help="İşçi başına torch/OpenCV iş parçacığı")
+    parser.add_argument('--max-pending', type=int, default=0, help="Aynı anda bekleyen en fazla kare (varsayılan: 2 x işçi)")
+    parser.add_argument('--frame-skip', type=int, default=0, help="Videoda işlenen her kareden sonra atlanacak kare sayısı")
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE_THRESHOLD)
+    parser.add_argument('--classes', default=None, help="Virgülle ayrılmış sınıf filtresi")
+    parser.add_argument('--no-portions', action='store_true', help="Porsiyon hesaplamayı kapat")
+    parser.add_argument('--camera-id', default=None, help="Sabit kamera kimliği (kayıtlı ölçek kalibrasyonu kullanılır)")
+    parser.add_argument('--verbose', action='store_true', help="İşçi debug çıktılarını göster")
+    return run(parser.parse_args())
+
+if __name__ == "__main__":
+    sys.exit(main())
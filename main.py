@@ -2,13 +2,10 @@ import asyncio
 from YOLO_SERVER.server import start_websocket_server
 from YOLO_SERVER.model import load_yolo_model
 from YOLO_SERVER.database import get_database_stats
+from YOLO_SERVER.config import MODEL_PATH, SERVER_WORKERS, WORKER_THREADS, INFERENCE_PROCESSES
 
-async def main():
-    """Ana uygulama başlatma fonksiyonu"""
-    print("🚀 YOLO Food Detection System Başlatılıyor...")
-    print("=" * 50)
-    
-    # Veritabanı durumu kontrolü
+def print_database_stats():
+    """Veritabanı durumunu yazdır"""
     try:
         stats = get_database_stats()
         print("📊 Veritabanı İstatistikleri:")
@@ -20,21 +17,54 @@ async def main():
         print()
     except Exception as e:
         print(f"⚠️  Veritabanı istatistikleri alınamadı: {e}")
+
+async def main_with_inference_pool():
+    """WebSocket süreci + paylaşımlı bellek üzerinden beslenen ayrı çıkarım süreçleri"""
+    from YOLO_SERVER.inference_pool import InferencePool
+    
+    print(f"🤖 {INFERENCE_PROCESSES} çıkarım süreci başlatılıyor...")
+    pool = InferencePool(MODEL_PATH, INFERENCE_PROCESSES, WORKER_THREADS)
+    pool.start()
     
+    print("=" * 50)
+    print("🌐 WebSocket sunucusu başlatılıyor...")
+    try:
+        await start_websocket_server(None, inference_pool=pool)
+    finally:
+        pool.close()
+
+async def main():
+    """Ana uygulama başlatma fonksiyonu"""
     # Load YOLO model
     print("🤖 YOLO modeli yükleniyor...")
-    model = load_yolo_model("my_yolo_model.pt")
+    model = load_yolo_model(MODEL_PATH)
     if model:
         print("✅ YOLO modeli başarıyla yüklendi")
     else:
         print("❌ YOLO modeli yüklenemedi!")
         return
-    
+
     print("=" * 50)
     print("🌐 WebSocket sunucusu başlatılıyor...")
-    
+
     # Start WebSocket server
-    await start_websocket_server(model)
+    # Model sunucudaki MODEL_HOLDER'a devredilir (reload_model eski modeli serbest bırakabilsin)
+    server = start_websocket_server(model)
+    model = None
+    await server
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    print("🚀 YOLO Food Detection System Başlatılıyor...")
+    print("=" * 50)
+
+    # Veritabanı durumu kontrolü
+    print_database_stats()
+
+    if SERVER_WORKERS > 1:
+        # Çok süreçli mod: her işçi kendi modelini yükler
+        from YOLO_SERVER.workers import run_server_workers
+        run_server_workers(MODEL_PATH, SERVER_WORKERS, WORKER_THREADS)
+    elif INFERENCE_PROCESSES > 0:
+        asyncio.run(main_with_inference_pool())
+    else:
+        asyncio.run(main())
@@ -129,6 +129,12 @@ document.addEventListener('DOMContentLoaded', async function() {
                 onChange: (value) => {
                     // AppConfig'i güncelle
                     AppConfig.setConfidenceThreshold(value / 100); // 70 -> 0.7
+                },
+                onCommit: () => {
+                    // Son fotoğrafın sonuçlarını yeni eşikle güncelle (sunucu çıkarımı tekrarlamaz)
+                    if (typeof CameraModule !== 'undefined') {
+                        CameraModule.refilterLastPhoto();
+                    }
                 }
             });
         }
@@ -92,6 +92,21 @@ class AdminManager {
             this.uiManager.onFoodDeleted(foodId);
         });
         
+        this.webSocketManager.onFoodsDeltaReceived((changed, deleted) => {
+            console.log('Katalog değişiklikleri alındı:', Object.keys(changed).length, 'değişen,', deleted.length, 'silinen');
+            this.uiManager.applyFoodsDelta(changed, deleted);
+        });
+        
+        this.webSocketManager.onFoodChanged((food) => {
+            console.log('Yemek değişikliği alındı:', food);
+            this.uiManager.onFoodChanged(food);
+        });
+        
+        this.webSocketManager.onCatalogResync(() => {
+            this.webSocketManager.requestFoodsList();
+            this.webSocketManager.requestStats();
+        });
+        
         this.webSocketManager.onStatsReceived((stats) => {
             console.log('İstatistikler alındı:', stats);
             this.updateStatsDisplay(stats);
@@ -392,6 +392,31 @@ class AdminUIManager {
         this.showNotification('Yemek başarıyla silindi', 'success');
     }
     
+    applyFoodsDelta(changed, deleted) {
+        // Yeniden bağlanınca gelen değişiklikleri mevcut listeye uygula
+        const deletedIds = new Set(deleted);
+        const changedIds = new Set(Object.keys(changed));
+        this.foodsList = this.foodsList
+            .filter(f => !deletedIds.has(f.id) && !changedIds.has(f.id))
+            .concat(Object.entries(changed).map(([id, data]) => ({ id: id, ...data })));
+        this.applyFilters();
+        this.renderFoodsList();
+        this.updateStats();
+    }
+    
+    onFoodChanged(food) {
+        // Başka bir yöneticinin eklediği/güncellediği yemek: sessizce ekle veya değiştir
+        const index = this.foodsList.findIndex(f => f.id === food.id);
+        if (index !== -1) {
+            this.foodsList[index] = food;
+        } else {
+            this.foodsList.push(food);
+        }
+        this.applyFilters();
+        this.renderFoodsList();
+        this.updateStats();
+    }
+    
     showNotification(message, type = 'info') {
         // Basit notification sistemi
         const notification = document.createElement('div');
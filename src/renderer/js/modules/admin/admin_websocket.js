@@ -12,13 +12,21 @@ class AdminWebSocketManager {
         this.reconnectAttempts = 0;
         this.maxReconnectAttempts = 5;
         this.reconnectDelay = 3000;
+        this.catalogVersion = null;
+        this.exportChunks = [];
         
         this.callbacks = {
             onFoodsListReceived: null,
             onFoodUpdated: null,
             onFoodAdded: null,
             onFoodDeleted: null,
+            onFoodsDeltaReceived: null,
+            onFoodChanged: null,
+            onCatalogResync: null,
+            onFoodsImported: null,
+            onFoodsExported: null,
             onStatsReceived: null,
+            onModelReload: null,
             onError: null
         };
         
@@ -58,8 +66,12 @@ class AdminWebSocketManager {
                 console.log('Admin WebSocket bağlantısı başarılı');
                 
                 // Başlangıçta yemek listesini ve istatistikleri yükle
-                this.requestFoodsList();
+                // (yeniden bağlanırken sadece son bilinen sürümden sonraki değişiklikler istenir)
+                this.requestFoodsList({}, this.catalogVersion);
                 this.requestStats();
+                
+                // Diğer yöneticilerin yaptığı değişiklikleri anlık almak için abone ol
+                this.subscribeCatalog();
             };
             
             this.websocket.onmessage = (event) => {
@@ -136,6 +148,11 @@ class AdminWebSocketManager {
         try {
             const message = JSON.parse(data);
             
+            // catalog_resync uygulanmış bir sürüm değildir, tam liste gelince güncellenir
+            if (message.version !== undefined && message.type !== 'catalog_resync') {
+                this.catalogVersion = message.version;
+            }
+            
             console.log('Admin WebSocket mesajı alındı:', message);
             
             switch (message.type) {
@@ -159,16 +176,72 @@ class AdminWebSocketManager {
                     
                 case 'food_deleted':
                     if (this.callbacks.onFoodDeleted) {
-                        this.callbacks.onFoodDeleted(message.data);
+                        this.callbacks.onFoodDeleted(message.data.food_id);
+                    }
+                    break;
+                    
+                // Sunucudan itilen katalog olayları (başka bir yönetici değişiklik yaptı)
+                case 'food_changed':
+                    if (this.callbacks.onFoodChanged) {
+                        this.callbacks.onFoodChanged(message.data);
+                    }
+                    break;
+                    
+                case 'catalog_resync':
+                    if (this.callbacks.onCatalogResync) {
+                        this.callbacks.onCatalogResync();
+                    } else {
+                        this.requestFoodsList();
+                    }
+                    break;
+                    
+                case 'foods_delta':
+                    if (this.callbacks.onFoodsDeltaReceived) {
+                        this.callbacks.onFoodsDeltaReceived(message.data, message.deleted);
+                    }
+                    break;
+                    
+                case 'foods_imported':
+                    if (this.callbacks.onFoodsImported) {
+                        this.callbacks.onFoodsImported(message.data);
                     }
                     break;
                     
+                case 'foods_export_chunk':
+                    this.exportChunks.push(message.data);
+                    break;
+                    
+                case 'foods_export_done': {
+                    // JSON parçaları tek sözlükte, CSV parçaları tek metinde birleştirilir
+                    const content = message.format === 'csv'
+                        ? this.exportChunks.join('')
+                        : Object.assign({}, ...this.exportChunks);
+                    this.exportChunks = [];
+                    if (this.callbacks.onFoodsExported) {
+                        this.callbacks.onFoodsExported(content, message.format);
+                    }
+                    break;
+                }
+                    
+                case 'foods_not_modified':
+                case 'catalog_subscribed':
+                    break;
+                    
                 case 'stats':
                     if (this.callbacks.onStatsReceived) {
                         this.callbacks.onStatsReceived(message.data);
                     }
                     break;
                     
+                // Model yeniden yükleme: önce başladı bildirimi, yükleme bitince sonuç gelir
+                case 'model_reload_started':
+                case 'model_reloaded':
+                case 'model_reload_failed':
+                    if (this.callbacks.onModelReload) {
+                        this.callbacks.onModelReload(message);
+                    }
+                    break;
+                    
                 case 'error':
                     console.error('Sunucu hatası:', message.message);
                     if (this.callbacks.onError) {
@@ -176,6 +249,10 @@ class AdminWebSocketManager {
                     }
                     break;
                     
+                case 'capture_profile':
+                    // Kamera istemcileri içindir, yönetim panelinde kullanılmaz
+                    break;
+                    
                 default:
                     console.warn('Bilinmeyen mesaj türü:', message.type);
             }
@@ -207,11 +284,15 @@ class AdminWebSocketManager {
     }
     
     // Admin API Metodları
-    requestFoodsList(filters = {}) {
-        return this.sendMessage({
+    requestFoodsList(filters = {}, sinceVersion = null) {
+        const message = {
             type: 'get_foods',
             filters: filters
-        });
+        };
+        if (sinceVersion !== null) {
+            message.since_version = sinceVersion;
+        }
+        return this.sendMessage(message);
     }
     
     addFood(foodData) {
@@ -249,6 +330,45 @@ class AdminWebSocketManager {
         });
     }
     
+    importFoods(content, format = 'json', deleteIds = []) {
+        return this.sendMessage({
+            type: 'import_foods',
+            format: format,
+            data: content,
+            delete: deleteIds
+        });
+    }
+    
+    exportFoods(format = 'json') {
+        this.exportChunks = [];
+        return this.sendMessage({
+            type: 'export_foods',
+            format: format
+        });
+    }
+    
+    /**
+     * Sunucuya yeni model ağırlıklarını arka planda yükletir; istekler yükleme bitene kadar eski modelle sürer
+     * @param {string|null} modelPath - Yeni model dosyası (null ise mevcut dosya yeniden yüklenir)
+     * @param {boolean} force - Katalogdaki bir yemeği tanımayan model de kabul edilsin mi?
+     */
+    reloadModel(modelPath = null, force = false) {
+        const message = {
+            type: 'reload_model',
+            force: force
+        };
+        if (modelPath) {
+            message.model_path = modelPath;
+        }
+        return this.sendMessage(message);
+    }
+    
+    subscribeCatalog() {
+        return this.sendMessage({
+            type: 'subscribe_catalog'
+        });
+    }
+    
     // Callback Metodları
     onFoodsListReceived(callback) {
         this.callbacks.onFoodsListReceived = callback;
@@ -266,10 +386,34 @@ class AdminWebSocketManager {
         this.callbacks.onFoodDeleted = callback;
     }
     
+    onFoodsDeltaReceived(callback) {
+        this.callbacks.onFoodsDeltaReceived = callback;
+    }
+    
+    onFoodChanged(callback) {
+        this.callbacks.onFoodChanged = callback;
+    }
+    
+    onCatalogResync(callback) {
+        this.callbacks.onCatalogResync = callback;
+    }
+    
+    onFoodsImported(callback) {
+        this.callbacks.onFoodsImported = callback;
+    }
+    
+    onFoodsExported(callback) {
+        this.callbacks.onFoodsExported = callback;
+    }
+    
     onStatsReceived(callback) {
         this.callbacks.onStatsReceived = callback;
     }
     
+    onModelReload(callback) {
+        this.callbacks.onModelReload = callback;
+    }
+    
     onError(callback) {
         this.callbacks.onError = callback;
     }
@@ -9,6 +9,9 @@ window.AppConfig = {
     // Porsiyon hesaplama mekanizması kontrolü
     portionCalculationEnabled: true,
     
+    // Seçili kamera kimliği (sunucu ölçek kalibrasyonunu kamera başına saklar)
+    cameraId: null,
+    
     // Config'i güncelleme fonksiyonu
     setConfidenceThreshold: function(value) {
         // Değeri sınırla (0-1)
@@ -17,11 +17,18 @@ const CameraModule = (function() {
     let currentConstraints = {}; // Kamera kısıtlamaları
     let websocketEnabled = false; // WebSocket entegrasyonu aktif mi?
     let realtimeProcessing = false; // Gerçek zamanlı işlem devam ediyor mu?
-    let realtimeAnalysisInterval = null; // Gerçek zamanlı analiz zamanlayıcısı
+    let realtimeAnalysisTimeout = null; // Gerçek zamanlı analiz zamanlayıcısı (sonraki kare)
+    let realtimeAnalysisActive = false; // WebSocket stream'i olmadan gerçek zamanlı analiz açık mı?
     let realtimeStreamController = null; // WebSocket stream controller
     let detectionFrozen = false; // Tespit kilitleme durumu
     let lastDetectionResult = null; // Son tespit sonucu (kilitleme için)
     let frozenFrameData = null; // Donmuş video karesi verisi
+    let lastPhotoAnalysis = null; // Son fotoğraf analizi (image_id, orijinal ve çizilmiş görüntü)
+    let refilterRunning = false; // Eşik güncellemesi devam ediyor mu?
+    let refilterQueued = false; // Güncelleme sırasında eşik yine değişti mi?
+    
+    // Sunucu sonraki kare gecikmesi önermezse beklenecek süre (ms)
+    const REALTIME_FALLBACK_DELAY_MS = 1500;
 
     /**
      * Modülü başlatır ve gerekli DOM elementlerini yapılandırır
@@ -200,6 +207,7 @@ const CameraModule = (function() {
                 },
                 audio: false 
             };
+            AppConfig.cameraId = deviceId;
             console.log('Kamera seçildi:', deviceId);
         } else {
             // Varsayılan kamera
@@ -210,6 +218,7 @@ const CameraModule = (function() {
                 }, 
                 audio: false 
             };
+            AppConfig.cameraId = null;
             console.log('Varsayılan kamera seçildi');
         }
     };
@@ -496,7 +505,9 @@ const CameraModule = (function() {
             const context = photoCanvas.getContext('2d');
             context.drawImage(photoVideo, 0, 0, width, height);
             
-            const dataUrl = photoCanvas.toDataURL('image/png');
+            // Fotoğraf orijinal boyutta saklanır; sunucuya gönderilirken profile göre küçültülür
+            const profile = websocketEnabled ? WebSocketManager.getCaptureProfile() : { encoding: 'image/jpeg', jpegQuality: 0.92 };
+            const dataUrl = photoCanvas.toDataURL(profile.encoding, profile.jpegQuality);
             
             // Kamerayı durdur
             stopPhotoMode();
@@ -753,11 +764,17 @@ const CameraModule = (function() {
                     confidence: AppConfig.confidenceThreshold,
                     enablePortionCalculation: AppConfig.portionCalculationEnabled 
                 };
+                
+                // Sunucunun kare profiline göre kodla; tespitler orijinal görüntü boyutunda döner
+                const encoded = WebSocketManager.encodeFrame(resultImage, resultImage.naturalWidth, resultImage.naturalHeight);
+                if (encoded.sourceSize) {
+                    configToSend.sourceSize = encoded.sourceSize;
+                }
                 console.log('📋 Camera Module - Gönderilecek config:', configToSend);
                 
                 // Resim verilerini WebSocket üzerinden gönder
                 const response = await WebSocketManager.sendImage(
-                    resultImage.src, 
+                    encoded.dataUrl, 
                     'image', 
                     configToSend
                 );
@@ -766,6 +783,13 @@ const CameraModule = (function() {
                     // Görüntünün üzerine tespitleri çiz - VisualizationModule kullan
                     await VisualizationModule.displayDetectionsOnImage(resultImage, response.data);
                     
+                    // Eşik değişince sunucu bu görüntünün tespitlerini çıkarım yapmadan yeniden süzebilir
+                    lastPhotoAnalysis = {
+                        imageId: response.image_id || null,
+                        originalSrc: originalImage,
+                        annotatedSrc: resultImage.src
+                    };
+                    
                     // Sonuçları callback'e aktar
                     if (imageAnalysisCallback) {
                         imageAnalysisCallback(response);
@@ -795,6 +819,76 @@ const CameraModule = (function() {
     
 
     
+    /**
+     * Sonuç görüntüsünü tespitler çizilmemiş haline döndürür
+     * @param {string} src - Orijinal görüntü
+     * @returns {Promise} - Görüntü yüklenince çözülür
+     */
+    const restoreResultImage = (src) => {
+        return new Promise((resolve) => {
+            resultImage.onload = () => {
+                resultImage.onload = null;
+                resolve();
+            };
+            resultImage.src = src;
+        });
+    };
+    
+    /**
+     * Güven eşiği değişince son fotoğrafın tespitlerini günceller
+     * Sunucu önbellekteki ham tespitleri yeniden süzer; görüntü önbellekte yoksa fotoğraf yeniden gönderilir
+     */
+    const refilterLastPhoto = async () => {
+        // Son analizden sonra yeni fotoğraf çekildiyse/yüklendiyse güncellenecek sonuç yok
+        if (!lastPhotoAnalysis || resultImage.src !== lastPhotoAnalysis.annotatedSrc) {
+            return;
+        }
+        if (!websocketEnabled || !WebSocketManager.isConnected()) {
+            return;
+        }
+        if (refilterRunning) {
+            refilterQueued = true;
+            return;
+        }
+        
+        refilterRunning = true;
+        try {
+            const analysis = lastPhotoAnalysis;
+            let response = null;
+            if (analysis.imageId) {
+                try {
+                    response = await WebSocketManager.refilter(analysis.imageId, {
+                        confidence: AppConfig.confidenceThreshold,
+                        enablePortionCalculation: AppConfig.portionCalculationEnabled
+                    });
+                } catch (error) {
+                    console.warn('Eşik güncellemesi başarısız:', error.message);
+                }
+            }
+            
+            await restoreResultImage(analysis.originalSrc);
+            
+            if (!response || !response.success) {
+                // Önbellekte yok (süresi dolmuş veya eşik çok düşük): görüntüyü yeniden analiz et
+                await analyzePhoto();
+                return;
+            }
+            
+            await VisualizationModule.displayDetectionsOnImage(resultImage, response.data);
+            analysis.annotatedSrc = resultImage.src;
+            
+            if (imageAnalysisCallback) {
+                imageAnalysisCallback(response);
+            }
+        } finally {
+            refilterRunning = false;
+            if (refilterQueued) {
+                refilterQueued = false;
+                refilterLastPhoto();
+            }
+        }
+    };
+    
     /**
      * Görüntüyü kaydet (Electron ortamı için)
      */
@@ -818,9 +912,9 @@ const CameraModule = (function() {
      * Gerçek zamanlı analizi başlatır
      */
     const startRealtimeAnalysis = () => {
-        if (realtimeAnalysisInterval) {
-            clearInterval(realtimeAnalysisInterval);
-            realtimeAnalysisInterval = null;
+        if (realtimeAnalysisTimeout) {
+            clearTimeout(realtimeAnalysisTimeout);
+            realtimeAnalysisTimeout = null;
         }
         
         // WebSocket bağlantısı var mı ve WebSocketManager kullanılabilir mi kontrol et
@@ -833,17 +927,10 @@ const CameraModule = (function() {
                 async () => {
                     if (!realtimeStreaming) return null;
                     
-                    // Geçici canvas oluştur
-                    const tempCanvas = document.createElement('canvas');
-                    tempCanvas.width = realtimeVideo.videoWidth;
-                    tempCanvas.height = realtimeVideo.videoHeight;
-                    
-                    const context = tempCanvas.getContext('2d');
-                    context.drawImage(realtimeVideo, 0, 0, tempCanvas.width, tempCanvas.height);
-                    
-                    return tempCanvas.toDataURL('image/jpeg');
+                    // Kareyi sunucunun yakalama profiline göre kodla (boyut ve JPEG kalitesi)
+                    return WebSocketManager.encodeFrame(realtimeVideo, realtimeVideo.videoWidth, realtimeVideo.videoHeight);
                 },
-                // Interval - ms cinsinden (daha akıcı olması için 200ms)
+                // Sunucu next_frame_delay_ms göndermezse kullanılacak aralık (ms)
                 200,
                 // Konfigürasyon
                 {
@@ -925,9 +1012,10 @@ const CameraModule = (function() {
                 realtimeStreamController.start();
             }
         } else {
-            // WebSocket yoksa eski yöntemi kullan (interval ile)
-            console.log('Interval ile gerçek zamanlı analiz başlatılıyor...');
-            realtimeAnalysisInterval = setInterval(captureAndAnalyzeRealtimeFrame, 1500); // 1.5 saniyede bir kare analiz et
+            // WebSocket yoksa eski yöntemi kullan: her kareden sonra bir sonrakini zamanla
+            console.log('Zamanlayıcı ile gerçek zamanlı analiz başlatılıyor...');
+            realtimeAnalysisActive = true;
+            scheduleRealtimeFrame(0);
         }
     };
     
@@ -941,47 +1029,64 @@ const CameraModule = (function() {
             realtimeStreamController = null;
         }
         
-        // Interval varsa onu temizle
-        if (realtimeAnalysisInterval) {
-            clearInterval(realtimeAnalysisInterval);
-            realtimeAnalysisInterval = null;
+        // Zamanlayıcı varsa onu temizle
+        realtimeAnalysisActive = false;
+        if (realtimeAnalysisTimeout) {
+            clearTimeout(realtimeAnalysisTimeout);
+            realtimeAnalysisTimeout = null;
         }
     };
     
+    /**
+     * Bir sonraki gerçek zamanlı kareyi zamanlar
+     * Gecikme, bir önceki yanıttaki sunucu önerisinden (next_frame_delay_ms) gelir
+     * @param {number} delay - Bekleme süresi (ms)
+     */
+    const scheduleRealtimeFrame = (delay) => {
+        if (!realtimeAnalysisActive) return;
+        realtimeAnalysisTimeout = setTimeout(async () => {
+            realtimeAnalysisTimeout = null;
+            const nextDelay = await captureAndAnalyzeRealtimeFrame();
+            scheduleRealtimeFrame(nextDelay);
+        }, delay);
+    };
+    
     /**
      * Gerçek zamanlı kare yakalar ve analiz eder
+     * @returns {Promise<number>} - Bir sonraki kare için önerilen bekleme süresi (ms)
      */
     const captureAndAnalyzeRealtimeFrame = async () => {
-        if (!realtimeStreaming || realtimeProcessing) return;
+        // Sunucudan ipucu gelmezse (bağlantı yok, hata) kullanılacak bekleme
+        let nextDelay = REALTIME_FALLBACK_DELAY_MS;
+        
+        if (!realtimeStreaming || realtimeProcessing) return nextDelay;
         
         // Tespit kilitlenmişse yeni analiz yapma
-        if (detectionFrozen) return;
+        if (detectionFrozen) return nextDelay;
         
         realtimeProcessing = true;
         
         try {
-            // Geçici canvas oluştur
-            const tempCanvas = document.createElement('canvas');
-            tempCanvas.width = realtimeVideo.videoWidth;
-            tempCanvas.height = realtimeVideo.videoHeight;
-            
-            const context = tempCanvas.getContext('2d');
-            context.drawImage(realtimeVideo, 0, 0, tempCanvas.width, tempCanvas.height);
-            
-            const frameData = tempCanvas.toDataURL('image/jpeg');
-            
             // WebSocket bağlantısı var mı kontrol et
             if (websocketEnabled && WebSocketManager.isConnected()) {
                 try {
+                    // Kareyi sunucunun yakalama profiline göre kodla
+                    const frame = WebSocketManager.encodeFrame(realtimeVideo, realtimeVideo.videoWidth, realtimeVideo.videoHeight);
+                    const frameConfig = {
+                        confidence: AppConfig.confidenceThreshold,
+                        enablePortionCalculation: AppConfig.portionCalculationEnabled
+                    };
+                    if (frame.sourceSize) {
+                        frameConfig.sourceSize = frame.sourceSize;
+                    }
+                    
                     // Kare verilerini WebSocket üzerinden gönder
                     const response = await WebSocketManager.sendImage(
-                        frameData, 
+                        frame.dataUrl, 
                         'webcam', 
-                        { 
-                            confidence: AppConfig.confidenceThreshold,
-                            enablePortionCalculation: AppConfig.portionCalculationEnabled 
-                        }
+                        frameConfig
                     );
+                    nextDelay = WebSocketManager.nextFrameDelay(response, nextDelay);
                     
                     // Tespit sonuç canvas'ını güncelle
                     const detectionResultCanvas = document.getElementById('detectionResultCanvas');
@@ -1031,6 +1136,8 @@ const CameraModule = (function() {
         } finally {
             realtimeProcessing = false;
         }
+        
+        return nextDelay;
     };
     
     // Public API
@@ -1039,6 +1146,7 @@ const CameraModule = (function() {
         capturePhoto,
         handleFiles,
         analyzePhoto,
+        refilterLastPhoto,
         saveImage,
         selectCamera,
         toggleDetectionFreeze
@@ -10,6 +10,7 @@ const ConfidenceSliderModule = (function() {
         confidenceThreshold: 50 // Default value (%)
     };
     let onChangeCallback = null;
+    let onCommitCallback = null;
 
     /**
      * Modülü belirtilen elementler ve callback ile başlatır
@@ -18,21 +19,24 @@ const ConfidenceSliderModule = (function() {
      * @param {string} config.valueId - Değer gösteren elementin ID'si
      * @param {number} config.initialValue - Başlangıç değeri (%)
      * @param {Function} config.onChange - Değişim callback fonksiyonu
+     * @param {Function} config.onCommit - Kullanıcı slider'ı bıraktığında çağrılır (son değerle)
      */
     const init = (config = {}) => {
         const { 
             sliderId = 'confidenceSlider', 
             valueId = 'thresholdValue',
             initialValue = 50,
-            onChange = null
+            onChange = null,
+            onCommit = null
         } = config;
 
         // HTML elementlerini al
         sliderElement = document.getElementById(sliderId);
         valueElement = document.getElementById(valueId);
         
-        // Callback fonksiyonunu kaydet
+        // Callback fonksiyonlarını kaydet
         onChangeCallback = onChange;
+        onCommitCallback = onCommit;
 
         if (!sliderElement || !valueElement) {
             console.error('Confidence slider: HTML elements not found!');
@@ -46,6 +50,7 @@ const ConfidenceSliderModule = (function() {
 
         // Event listener ekle
         sliderElement.addEventListener('input', handleSliderChange);
+        sliderElement.addEventListener('change', handleSliderCommit);
 
         console.log('Confidence slider initialized with value:', initialValue);
     };
@@ -68,6 +73,15 @@ const ConfidenceSliderModule = (function() {
         }
     };
 
+    /**
+     * Slider bırakıldığında çağrılır (sürükleme sırasında her adımda değil)
+     */
+    const handleSliderCommit = () => {
+        if (typeof onCommitCallback === 'function') {
+            onCommitCallback(settings.confidenceThreshold);
+        }
+    };
+
     /**
      * Görüntülenen değeri günceller
      * @param {number} value - Gösterilecek değer (%)
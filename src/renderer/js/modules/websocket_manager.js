@@ -24,6 +24,20 @@ const WebSocketManager = (function() {
     // Bağlantı durumu göstergesi
     let connectionStatusElement = null;
     
+    // İstek kimliği sayacı (sunucu yanıtları paralel işlediği için eşleştirme gerekli)
+    let requestCounter = 0;
+    
+    // Sunucu yeniden başlatılırken ("draining" yanıtı) ödeme görüntüsünün en fazla kaç kez yeniden gönderileceği
+    const DRAIN_MAX_RETRIES = 30;
+    
+    // Sunucunun bağlantıda bildirdiği kare yakalama profili (capture_profile mesajı)
+    let captureProfile = {
+        maxDimension: null,       // null: orijinal boyut
+        encoding: 'image/jpeg',
+        jpegQuality: 0.92,
+        minFrameIntervalMs: 200
+    };
+    
 
     
     /**
@@ -256,6 +270,11 @@ const WebSocketManager = (function() {
         try {
             const data = JSON.parse(event.data);
             
+            // Kare yakalama profilini güncelle
+            if (data.type === 'capture_profile' && data.success && data.data) {
+                applyCaptureProfile(data.data);
+            }
+            
             // Mesaj callback'i varsa çağır
             if (onMessageCallback) {
                 onMessageCallback(data);
@@ -270,14 +289,54 @@ const WebSocketManager = (function() {
     };
     
     
+    /**
+     * Sunucunun kare yakalama profilini uygular
+     * @param {Object} profile - max_dimension, encoding, jpeg_quality, min_frame_interval_ms
+     */
+    const applyCaptureProfile = (profile) => {
+        captureProfile = {
+            maxDimension: profile.max_dimension || null,
+            encoding: profile.encoding || 'image/jpeg',
+            jpegQuality: profile.jpeg_quality !== undefined ? profile.jpeg_quality : captureProfile.jpegQuality,
+            minFrameIntervalMs: profile.min_frame_interval_ms || captureProfile.minFrameIntervalMs
+        };
+        console.log('🎞️ Kare yakalama profili:', captureProfile);
+    };
+    
+    /**
+     * Görüntü/video karesini yakalama profiline göre kodlar
+     * Kare küçültüldüyse sourceSize, sunucunun tespitleri orijinal boyuta taşıması için config'e eklenmeli
+     * @param {HTMLVideoElement|HTMLImageElement|HTMLCanvasElement} source - Kaynak
+     * @param {number} sourceWidth - Kaynak genişliği (ör. videoWidth / naturalWidth)
+     * @param {number} sourceHeight - Kaynak yüksekliği
+     * @returns {Object} - { dataUrl, sourceSize } (sourceSize küçültme yoksa null)
+     */
+    const encodeFrame = (source, sourceWidth, sourceHeight) => {
+        const longSide = Math.max(sourceWidth, sourceHeight);
+        const scale = captureProfile.maxDimension && longSide > captureProfile.maxDimension
+            ? captureProfile.maxDimension / longSide
+            : 1;
+        
+        const canvas = document.createElement('canvas');
+        canvas.width = Math.round(sourceWidth * scale);
+        canvas.height = Math.round(sourceHeight * scale);
+        canvas.getContext('2d').drawImage(source, 0, 0, canvas.width, canvas.height);
+        
+        return {
+            dataUrl: canvas.toDataURL(captureProfile.encoding, captureProfile.jpegQuality),
+            sourceSize: scale < 1 ? { width: sourceWidth, height: sourceHeight } : null
+        };
+    };
+    
     /**
      * Görüntü verilerini WebSocket üzerinden gönderir ve cevap bekler
      * @param {string} imageData - Base64 formatında görüntü verisi
      * @param {string} type - Görüntü tipi ('image', 'webcam')
      * @param {Object} config - İşlem yapılandırmaları (confidence vb.)
+     * @param {number} drainRetry - Sunucu kapanırken yapılan yeniden gönderim sayısı (dahili)
      * @returns {Promise} - Sunucu cevabı
      */
-    const sendImage = async (imageData, type = 'image', config = {}) => {
+    const sendImage = async (imageData, type = 'image', config = {}, drainRetry = 0) => {
         // Bağlantı yoksa hata döndür
         if (!isConnected || !socket) {
             return Promise.reject(new Error('WebSocket bağlantısı yok'));
@@ -310,10 +369,18 @@ const WebSocketManager = (function() {
                     ...config
                 };
                 
+                // Sabit kamerada ölçek kalibrasyonu kamera başına tutulur
+                if (finalConfig.cameraId === undefined && window.AppConfig && window.AppConfig.cameraId) {
+                    finalConfig.cameraId = window.AppConfig.cameraId;
+                }
+                
                 console.log("📦 WebSocket Manager - Gönderilecek final config:", finalConfig);
                 
+                const requestId = `req-${Date.now()}-${++requestCounter}`;
+                
                 const message = {
                     type: type,
+                    request_id: requestId,
                     data: processedImageData,
                     config: finalConfig
                 };
@@ -323,9 +390,23 @@ const WebSocketManager = (function() {
                     try {
                         const response = JSON.parse(event.data);
                         
+                        // Başka bir isteğin yanıtıysa veya profil bildirimi ise bekle
+                        if (response.request_id !== undefined && response.request_id !== requestId) {
+                            return;
+                        }
+                        if (response.type === 'capture_profile') {
+                            return;
+                        }
+                        
                         // İşlem tamamlandığında listener'ı kaldır
                         socket.removeEventListener('message', messageHandler);
                         
+                        // Sunucu yeniden başlatılıyor: ödeme görüntüsü kaybolmasın, yeni sunucuya tekrar gönder
+                        if (response.type === 'draining' && type === 'image' && drainRetry < DRAIN_MAX_RETRIES) {
+                            resolve(resendAfterDrain(imageData, type, config, drainRetry + 1, response.retry_after_ms));
+                            return;
+                        }
+                        
                         resolve(response);
                     } catch (error) {
                         console.error('Cevap işleme hatası:', error);
@@ -360,73 +441,158 @@ const WebSocketManager = (function() {
         });
     };
     
+    /**
+     * Kapanan sunucunun önerdiği süre kadar bekleyip (bağlantı kopmuşsa yeniden kurulmasını da bekleyerek) görüntüyü tekrar gönderir
+     */
+    const resendAfterDrain = async (imageData, type, config, drainRetry, retryAfterMs) => {
+        await new Promise(resolve => setTimeout(resolve, retryAfterMs || reconnectInterval));
+        // Yeniden bağlanma denemeleri bitene kadar bekle; bağlanılamazsa sendImage bağlantı hatası döndürür
+        const deadline = Date.now() + (maxReconnectAttempts + 1) * reconnectInterval;
+        while (!isConnected && Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, 200));
+        }
+        return sendImage(imageData, type, config, drainRetry);
+    };
+    
+    /**
+     * Daha önce analiz edilen görüntünün tespitlerini yeni güven eşiğiyle yeniden süzdürür
+     * Sunucu çıkarımı tekrarlamaz; görüntü önbellekte yoksa 'refilter_miss' döner
+     * @param {string} imageId - 'image' yanıtındaki image_id
+     * @param {Object} config - Yeni ayarlar (confidence, enablePortionCalculation)
+     * @returns {Promise<Object>} - 'image' yanıtıyla aynı biçimde sonuç
+     */
+    const refilter = (imageId, config = {}) => {
+        if (!isConnected || !socket) {
+            return Promise.reject(new Error('WebSocket bağlantısı yok'));
+        }
+        
+        return new Promise((resolve, reject) => {
+            const requestId = `req-${Date.now()}-${++requestCounter}`;
+            
+            const messageHandler = (event) => {
+                try {
+                    const response = JSON.parse(event.data);
+                    if (response.request_id !== requestId) {
+                        return;
+                    }
+                    socket.removeEventListener('message', messageHandler);
+                    resolve(response);
+                } catch (error) {
+                    socket.removeEventListener('message', messageHandler);
+                    reject(error);
+                }
+            };
+            
+            socket.addEventListener('message', messageHandler);
+            socket.send(JSON.stringify({
+                type: 'refilter',
+                request_id: requestId,
+                image_id: imageId,
+                config: config
+            }));
+        });
+    };
+    
+    /**
+     * Sunucu yanıtından bir sonraki kare için beklenecek süreyi belirler
+     * Webcam yanıtları next_frame_delay_ms, meşgul yanıtları retry_after_ms taşır
+     * @param {Object} response - Sunucu yanıtı (yoksa null)
+     * @param {number} fallbackDelay - İpucu yoksa kullanılacak süre (ms)
+     * @returns {number} - Bekleme süresi (ms)
+     */
+    const nextFrameDelay = (response, fallbackDelay) => {
+        if (response && typeof response.next_frame_delay_ms === 'number') {
+            return response.next_frame_delay_ms;
+        }
+        if (response && typeof response.retry_after_ms === 'number') {
+            return response.retry_after_ms;
+        }
+        return fallbackDelay;
+    };
+    
     /**
      * Gerçek zamanlı webcam modu için olan stream fonksiyonu
+     * Kareler sabit aralıkla değil, her yanıttan sonra sunucunun önerdiği gecikmeyle istenir
      * @param {Function} onFrameProcess - Her frame işlendiğinde çağrılacak callback
-     * @param {number} interval - Kaç ms'de bir frame işleneceği (default: 200ms)
+     *                                    (base64 string veya encodeFrame sonucu döndürür)
+     * @param {number} interval - Sunucu gecikme önermezse kullanılacak aralık (default: 200ms)
      * @param {Object} config - Yapılandırma ayarları
      * @returns {Object} - Stream kontrolü için fonksiyonlar
      */
     const startWebcamStream = (onFrameProcess, interval = 200, config = {}) => {
         let isActive = false;
         let processingFrame = false;
-        let streamIntervalId = null;
+        let streamTimeoutId = null;
         
-        // Webcam stream'i başlat
-        const start = () => {
-            if (isActive) return false;
+        // Bir sonraki kareyi zamanla
+        const scheduleNextFrame = (delay) => {
+            if (!isActive) return;
+            streamTimeoutId = setTimeout(processFrame, delay);
+        };
+        
+        // Tek bir kareyi yakala, gönder ve sonraki kareyi yanıta göre zamanla
+        const processFrame = async () => {
+            streamTimeoutId = null;
+            if (!isActive) return;
             
-            // WebSocket bağlantısı kontrolü
-            if (!isConnected) {
-                console.error('WebSocket bağlantısı yok');
-                return false;
-            }
+            // Sunucu ipucu yoksa profildeki en kısa aralık kullanılır
+            const fallbackDelay = Math.max(interval, captureProfile.minFrameIntervalMs);
+            let response = null;
             
-            isActive = true;
+            // Frame işleme durumunu güncelle
+            processingFrame = true;
             
-            // Frame işleme döngüsünü başlat
-            streamIntervalId = setInterval(async () => {
-                // Zaten bir frame işleniyorsa bekle
-                if (processingFrame) return;
-                
-                // Frame işleme durumunu güncelle
-                processingFrame = true;
+            try {
+                // Callback'den frame al
+                const frameData = await onFrameProcess();
                 
-                try {
-                    // Callback'den frame al
-                    const frameData = await onFrameProcess();
-                    
-                    // Frame yoksa, işlem yapma
-                    if (!frameData) {
-                        processingFrame = false;
-                        return;
+                // Frame yoksa, işlem yapma
+                if (frameData) {
+                    // Frame'i sunucuya gönder (encodeFrame sonucu ise kaynak boyutu da gönderilir)
+                    const frameConfig = { confidence: config.confidence || 0.5, ...config };
+                    if (frameData.sourceSize) {
+                        frameConfig.sourceSize = frameData.sourceSize;
                     }
-                    
-                    // Frame'i sunucuya gönder
-                    const response = await sendImage(
-                        frameData,
+                    response = await sendImage(
+                        frameData.dataUrl || frameData,
                         'webcam',
-                        { confidence: config.confidence || 0.5, ...config }
+                        frameConfig
                     );
                     
-                    // Frame işleme durumunu güncelle
-                    processingFrame = false;
-                    
                     // Callback aracılığıyla sonucu bildir
                     if (config.onResult) {
                         config.onResult(response);
                     }
-                    
-                } catch (error) {
-                    console.error('Webcam frame işleme hatası:', error);
-                    processingFrame = false;
-                    
-                    // Hata callback'ini çağır
-                    if (config.onError) {
-                        config.onError(error);
-                    }
                 }
-            }, interval);
+            } catch (error) {
+                console.error('Webcam frame işleme hatası:', error);
+                
+                // Hata callback'ini çağır
+                if (config.onError) {
+                    config.onError(error);
+                }
+            } finally {
+                // Frame işleme durumunu güncelle
+                processingFrame = false;
+            }
+            
+            scheduleNextFrame(nextFrameDelay(response, fallbackDelay));
+        };
+        
+        // Webcam stream'i başlat
+        const start = () => {
+            if (isActive) return false;
+            
+            // WebSocket bağlantısı kontrolü
+            if (!isConnected) {
+                console.error('WebSocket bağlantısı yok');
+                return false;
+            }
+            
+            isActive = true;
+            
+            // İlk kareyi hemen iste
+            scheduleNextFrame(0);
             
             return true;
         };
@@ -438,10 +604,10 @@ const WebSocketManager = (function() {
             isActive = false;
             processingFrame = false;
             
-            // Interval'i temizle
-            if (streamIntervalId) {
-                clearInterval(streamIntervalId);
-                streamIntervalId = null;
+            // Bekleyen kare zamanlayıcısını temizle
+            if (streamTimeoutId) {
+                clearTimeout(streamTimeoutId);
+                streamTimeoutId = null;
             }
             
             return true;
@@ -486,6 +652,10 @@ const WebSocketManager = (function() {
         connect,
         disconnect,
         sendImage,
+        refilter,
+        encodeFrame,
+        nextFrameDelay,
+        getCaptureProfile: () => ({ ...captureProfile }),
         startWebcamStream,
         isConnected: checkConnection
     };
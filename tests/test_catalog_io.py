@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from YOLO_SERVER.catalog_io import ImportFormatError, parse_foods_json
+from YOLO_SERVER.database import DatabaseManager
+
+# foodsDB.json ile aynı biçim: besin değerleri metin, portion_based bool
+FOODS_DB_JSON = {
+    'pilav': {
+        'name': 'Pirinç Pilavı',
+        'price': 25.0,
+        'calories': 350,
+        'portion_based': True,
+        'food_category': 'rice',
+        'base_height_cm': 3.0,
+        'density_g_per_cm3': 0.8,
+        'nutrition': {'protein': '6g', 'carbs': '70g', 'fat': '5g', 'fiber': '1g'},
+        'ingredients': ['pirinç', 'tereyağı'],
+        'allergens': ['süt']
+    },
+    'ayran': {
+        'name': 'Ayran',
+        'price': 10,
+        'calories': 60,
+        'portion_based': False,
+        'nutrition': {'protein': 3, 'carbs': 4.5},
+        'ingredients': ['yoğurt', 'su', 'tuz'],
+        'allergens': []
+    }
+}
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseManager(str(tmp_path / 'foods.db'))
+
+def test_migrate_from_foods_db_json(db, tmp_path):
+    json_path = tmp_path / 'foodsDB.json'
+    json_path.write_text(json.dumps(FOODS_DB_JSON, ensure_ascii=False), encoding='utf-8')
+
+    assert db.migrate_from_json(str(json_path))
+
+    foods = db.get_all_foods()
+    assert sorted(foods) == ['ayran', 'pilav']
+    assert foods['pilav']['nutrition']['protein'] == '6g'
+    assert foods['pilav']['ingredients'] == ['pirinç', 'tereyağı']
+    assert bool(foods['pilav']['portion_based'])
+
+def test_export_page_round_trips_through_import(db):
+    db.bulk_upsert_foods(parse_foods_json(FOODS_DB_JSON))
+    before = db.get_all_foods()
+
+    # export_foods sayfası (portion_based 0/1, 'id' alanı dahil) WebSocket üzerinden geri gönderilir
+    pages = [json.loads(json.dumps(page)) for page in db.iter_food_pages()]
+    for page in pages:
+        assert db.bulk_import_foods(parse_foods_json(page), []) == (len(page), 0)
+
+    assert db.get_all_foods() == before
+
+@pytest.mark.parametrize('food', [
+    {'ingredients': 'pirinç'},
+    {'nutrition': ['6g']},
+    {'nutrition': {'protein': [6]}},
+    {'price': '25'},
+    {'portion_based': 2},
+    {'portion_based': 'evet'}
+])
+def test_wrong_types_are_rejected(food):
+    with pytest.raises(ImportFormatError, match='pilav'):
+        parse_foods_json({'pilav': food})